@@ -0,0 +1,282 @@
+"""Benchmarks of the hot paths of GraphQLView.
+
+Requests are sent to the view through Sanic's in-process ASGI test client, so
+no sockets are involved and the numbers reflect the time spent in Sanic and
+the view. Run them from the root of the repository:
+
+    python -m benchmarks.run --output before.json
+    python -m benchmarks.run --output after.json --compare before.json
+
+Every scenario reports requests per second and the p50 and p99 latencies of
+the fastest of several rounds, which keeps the noise of busy machines out of
+the comparison. With `--compare`, scenarios that got slower than `--max-regression` are
+reported and make the run fail.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+from io import BytesIO
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+from urllib.parse import urlencode
+
+import sanic
+from sanic import Sanic
+from sanic.testing import SanicASGITestClient
+
+import graphql
+from graphql.utilities import get_introspection_query
+from sanic_graphql import GraphQLView
+from tests.schema import AsyncSchema, Schema
+
+from .schema import LargeSchema
+
+Send = Callable[[SanicASGITestClient], Awaitable[Any]]
+
+
+class Scenario(NamedTuple):
+    name: str
+    view_options: Dict[str, Any]
+    send: Send
+    # Fraction of the requests sent, for slow scenarios
+    scale: float = 1.0
+
+
+def url(**params) -> str:
+    return "/graphql?" + urlencode(params) if params else "/graphql"
+
+
+def get(query: str, **headers) -> Send:
+    return lambda client: client.get(url(query=query), headers=headers)
+
+
+def post_json(data: Any) -> Send:
+    body = json.dumps(data)
+    headers = {"content-type": "application/json"}
+    return lambda client: client.post(url(), data=body, headers=headers)
+
+
+def post_form(data: Dict[str, str]) -> Send:
+    return lambda client: client.post(url(), data=data)
+
+
+def post_upload(size: int) -> Send:
+    operations = json.dumps(
+        {
+            "query": "mutation($file: Upload!) { upload(file: $file) }",
+            "variables": {"file": None},
+        }
+    )
+    data = {"operations": operations, "map": json.dumps({"0": ["variables.file"]})}
+    content = b"x" * size
+
+    def send(client):
+        files = {"0": ("upload.bin", BytesIO(content), "application/octet-stream")}
+        return client.post(url(), data=data, files=files)
+
+    return send
+
+
+# About 10000 fields and 400 KB of JSON
+LARGE_QUERY = "{ users(first: 200) { id name email posts { id title likes } } }"
+
+scenarios = [
+    Scenario("get", {}, get("{ test }")),
+    Scenario("get_async", {"schema": AsyncSchema, "enable_async": True}, get("{ c }")),
+    Scenario(
+        "post_json",
+        {},
+        post_json(
+            {
+                "query": "query Q($who: String) { test(who: $who) }",
+                "variables": {"who": "Dolly"},
+            }
+        ),
+    ),
+    Scenario("post_form", {}, post_form({"query": "{ test }"})),
+    Scenario(
+        "post_multipart",
+        {"schema": LargeSchema, "enable_async": True},
+        post_upload(64 * 1024),
+    ),
+    Scenario(
+        "batch",
+        {"batch": True},
+        post_json([{"query": f'{{ test(who: "{i}") }}'} for i in range(10)]),
+    ),
+    Scenario("graphiql", {"graphiql": True}, get("{ test }", accept="text/html")),
+    Scenario(
+        "introspection", {}, post_json({"query": get_introspection_query()}), 0.1
+    ),
+    Scenario(
+        "introspection_cached",
+        {"introspection_cache_size": 10},
+        post_json({"query": get_introspection_query()}),
+    ),
+    Scenario("large_result", {"schema": LargeSchema}, get(LARGE_QUERY), 0.1),
+    Scenario(
+        "large_result_async",
+        {"schema": LargeSchema, "enable_async": True},
+        get(LARGE_QUERY),
+        0.1,
+    ),
+]
+
+
+def create_client(view_options: Dict[str, Any]) -> SanicASGITestClient:
+    app = Sanic("benchmark")
+    options = dict(view_options)
+    schema = options.pop("schema", Schema)
+    app.add_route(GraphQLView.as_view(schema=schema, **options), "/graphql")
+    return SanicASGITestClient(app)
+
+
+def percentile(latencies: List[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of the sorted latencies."""
+    index = max(0, min(len(latencies) - 1, int(len(latencies) * fraction + 0.5) - 1))
+    return latencies[index]
+
+
+async def run_scenario(
+    scenario: Scenario, requests: int, warmup: int, concurrency: int, rounds: int
+) -> Dict[str, float]:
+    client = create_client(scenario.view_options)
+    requests = max(concurrency, int(requests * scenario.scale))
+    warmup = int(warmup * scenario.scale)
+
+    async def send() -> float:
+        start = perf_counter()
+        _, response = await scenario.send(client)
+        latency = perf_counter() - start
+        if response.status != 200:
+            raise RuntimeError(
+                f"{scenario.name} got status {response.status}: {response.body!r}"
+            )
+        return latency
+
+    for _ in range(warmup):
+        await send()
+
+    async def worker(count: int) -> List[float]:
+        return [await send() for _ in range(count)]
+
+    counts = [requests // concurrency] * concurrency
+    counts[0] += requests - sum(counts)
+    best = None
+    for _ in range(rounds):
+        start = perf_counter()
+        results = await asyncio.gather(*map(worker, counts))
+        duration = perf_counter() - start
+        if best is None or duration < best[0]:
+            best = duration, results
+    duration, results = best
+
+    latencies = sorted(latency for result in results for latency in result)
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "rounds": rounds,
+        "rps": requests / duration,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def get_commit() -> Optional[str]:
+    try:
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit.decode().strip()
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    max_regression: float,
+) -> List[str]:
+    """Print the change of every scenario and return the regressed ones."""
+    regressed = []
+    print(f"\n{'scenario':<20} {'rps':>10} {'baseline':>10} {'change':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["rps"]
+        change = result["rps"] / before - 1
+        print(f"{name:<20} {result['rps']:>10.1f} {before:>10.1f} {change:>+8.1%}")
+        if change < -max_regression:
+            regressed.append(name)
+    return regressed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", "--requests", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("-c", "--concurrency", type=int, default=1)
+    parser.add_argument("-r", "--rounds", type=int, default=3)
+    parser.add_argument(
+        "-k", "--scenario", action="append", help="run only the given scenarios"
+    )
+    parser.add_argument("-o", "--output", help="save the results to a JSON file")
+    parser.add_argument("--compare", help="compare with the results in a JSON file")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.1,
+        help="fail if the requests per second drop by more than this fraction",
+    )
+    args = parser.parse_args(argv)
+
+    selected = [
+        scenario
+        for scenario in scenarios
+        if not args.scenario or scenario.name in args.scenario
+    ]
+    loop = asyncio.get_event_loop()
+    results = {}
+    print(f"{'scenario':<20} {'rps':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for scenario in selected:
+        result = loop.run_until_complete(
+            run_scenario(
+                scenario, args.requests, args.warmup, args.concurrency, args.rounds
+            )
+        )
+        results[scenario.name] = result
+        print(
+            f"{scenario.name:<20} {result['rps']:>10.1f}"
+            f" {result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f}"
+        )
+
+    if args.output:
+        report = {
+            "commit": get_commit(),
+            "python": platform.python_version(),
+            "sanic": sanic.__version__,
+            "graphql-core": graphql.__version__,
+            "results": results,
+        }
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        regressed = compare(results, baseline, args.max_regression)
+        if regressed:
+            print(
+                f"\nRegressed by more than {args.max_regression:.0%}: "
+                + ", ".join(regressed)
+            )
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
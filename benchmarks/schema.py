@@ -0,0 +1,75 @@
+"""A synthetic schema producing large results for the benchmarks."""
+from graphql.type import (GraphQLArgument, GraphQLField, GraphQLID, GraphQLInt,
+                          GraphQLList, GraphQLNonNull, GraphQLObjectType,
+                          GraphQLSchema, GraphQLString)
+from sanic_graphql import GraphQLUpload
+
+USERS = [
+    {
+        "id": str(user_id),
+        "name": f"User {user_id}",
+        "email": f"user{user_id}@example.com",
+        "posts": [
+            {
+                "id": f"{user_id}-{post_id}",
+                "title": f"Post {post_id} of user {user_id}",
+                "likes": user_id * post_id,
+            }
+            for post_id in range(10)
+        ],
+    }
+    for user_id in range(1000)
+]
+
+
+def resolve_key(obj, info):
+    return obj[info.field_name]
+
+
+PostType = GraphQLObjectType(
+    name="Post",
+    fields={
+        "id": GraphQLField(GraphQLNonNull(GraphQLID), resolve=resolve_key),
+        "title": GraphQLField(GraphQLString, resolve=resolve_key),
+        "likes": GraphQLField(GraphQLInt, resolve=resolve_key),
+    },
+)
+
+UserType = GraphQLObjectType(
+    name="User",
+    fields={
+        "id": GraphQLField(GraphQLNonNull(GraphQLID), resolve=resolve_key),
+        "name": GraphQLField(GraphQLString, resolve=resolve_key),
+        "email": GraphQLField(GraphQLString, resolve=resolve_key),
+        "posts": GraphQLField(GraphQLList(PostType), resolve=resolve_key),
+    },
+)
+
+QueryType = GraphQLObjectType(
+    name="Query",
+    fields={
+        "users": GraphQLField(
+            GraphQLList(UserType),
+            args={"first": GraphQLArgument(GraphQLInt)},
+            resolve=lambda _obj, _info, first=10: USERS[:first],
+        ),
+    },
+)
+
+
+async def resolve_upload(_obj, _info, file):
+    return len(await file.read())
+
+
+MutationType = GraphQLObjectType(
+    name="Mutation",
+    fields={
+        "upload": GraphQLField(
+            GraphQLInt,
+            args={"file": GraphQLArgument(GraphQLNonNull(GraphQLUpload))},
+            resolve=resolve_upload,
+        ),
+    },
+)
+
+LargeSchema = GraphQLSchema(QueryType, MutationType)
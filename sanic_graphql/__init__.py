@@ -1,3 +1,32 @@
-from graphql_server.sanic import GraphQLView
+from .cache import DocumentCache
+from .dataloader import DataLoader
+from .graphqlview import GraphQLView
+from .json_codec import JSONCodec
+from .persisted_queries import MemoryPersistedQueryStore, PersistedQueryStore
+from .rate_limit import MemoryRateLimitStore, RateLimitStore, operation_cost
+from .response_cache import MemoryResponseCache, ResponseCache
+from .subscriptions import GraphQLWSView
+from .timing import RequestTimings
+from .tracing import TracingMiddleware
+from .uploads import GraphQLUpload, Upload
+from .validation import query_limits_rule
 
-__all__ = ['GraphQLView']
+__all__ = [
+    'GraphQLView',
+    'GraphQLWSView',
+    'DocumentCache',
+    'DataLoader',
+    'JSONCodec',
+    'PersistedQueryStore',
+    'MemoryPersistedQueryStore',
+    'ResponseCache',
+    'MemoryResponseCache',
+    'RateLimitStore',
+    'MemoryRateLimitStore',
+    'RequestTimings',
+    'TracingMiddleware',
+    'Upload',
+    'GraphQLUpload',
+    'query_limits_rule',
+    'operation_cost',
+]
@@ -0,0 +1,120 @@
+from collections import OrderedDict
+from threading import Lock
+from time import perf_counter
+from typing import Any, Collection, Hashable, List, Optional, Tuple, Type
+
+from graphql.error import GraphQLError
+from graphql.language import DocumentNode, parse
+from graphql.type import GraphQLSchema
+from graphql.validation import ASTValidationRule, validate
+
+from .timing import RequestTimings
+
+__all__ = ["LRUCache", "DocumentCache", "parse_and_validate"]
+
+
+class LRUCache:
+    """A size-bounded mapping that evicts the least recently used entries.
+
+    Lookups through `get` are counted, so that the `hits` and `misses`
+    attributes can be used to judge whether the cache is sized correctly.
+    Caches are thread-safe, as operations may run in an executor.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        if maxsize < 1:
+            raise ValueError(f"Cache size must be a positive integer, got {maxsize!r}.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def parse_and_validate(
+    schema: GraphQLSchema,
+    query: str,
+    validation_rules: Optional[Collection[Type[ASTValidationRule]]] = None,
+    max_errors: Optional[int] = None,
+    timings: Optional[RequestTimings] = None,
+) -> Tuple[Optional[DocumentNode], List[GraphQLError]]:
+    """Parse and validate the given query against the schema.
+
+    Returns the parsed document and the list of errors. If the query could not
+    be parsed, the document will be None and the errors contain the syntax error.
+    """
+    start = perf_counter()
+    try:
+        document = parse(query)
+    except GraphQLError as e:
+        return None, [e]
+    except Exception as e:
+        return None, [GraphQLError(str(e), original_error=e)]
+    finally:
+        if timings is not None:
+            timings.add("parse", perf_counter() - start)
+
+    start = perf_counter()
+    errors = validate(schema, document, rules=validation_rules, max_errors=max_errors)
+    if timings is not None:
+        timings.add("validate", perf_counter() - start)
+    return document, errors
+
+
+class DocumentCache(LRUCache):
+    """LRU cache of parsed and validated GraphQL documents.
+
+    Entries are keyed on the schema, the query text and the validation options,
+    so that one cache can safely be shared by several views.
+    """
+
+    def parse_and_validate(
+        self,
+        schema: GraphQLSchema,
+        query: str,
+        validation_rules: Optional[Collection[Type[ASTValidationRule]]] = None,
+        max_errors: Optional[int] = None,
+        timings: Optional[RequestTimings] = None,
+    ) -> Tuple[Optional[DocumentNode], List[GraphQLError]]:
+        rules = tuple(validation_rules) if validation_rules is not None else None
+        key = (schema, query, rules, max_errors)
+        entry = self.get(key)
+        if entry is None:
+            entry = parse_and_validate(
+                schema, query, validation_rules, max_errors, timings
+            )
+            self.set(key, entry)
+        return entry
@@ -0,0 +1,111 @@
+"""Coalescing of identical queries that are executed at the same time.
+
+Queries arriving while an identical query (same document, variables,
+operation name and vary key) is still executing do not start an execution of
+their own, but wait for the result of the running one. Only queries are
+coalesced, mutations and subscriptions always run by themselves.
+"""
+from asyncio import CancelledError, Future, ensure_future, shield
+from inspect import isawaitable
+from typing import Any, Callable, Collection, Dict, Optional, Type
+
+from graphql.error import GraphQLError
+from graphql.language import OperationType, parse
+from graphql.type import GraphQLSchema
+from graphql.utilities import get_operation_ast
+from graphql.validation import ASTValidationRule
+
+from .cache import DocumentCache
+
+__all__ = ["InFlightOperations", "is_query"]
+
+
+class _InFlight:
+    __slots__ = ("future", "waiters")
+
+    def __init__(self, future: Future):
+        self.future = future
+        self.waiters = 0
+
+
+class InFlightOperations:
+    """Registry of the executions that are running, by key.
+
+    `coalesced` counts the executions that were saved by waiting for an
+    execution that was already running.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._in_flight: Dict[str, _InFlight] = {}
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    async def run(self, key: str, execute: Callable[[], Any]) -> Any:
+        """Return the result of `execute`, sharing it with identical calls.
+
+        If an execution with the same key is running, its result is returned
+        instead of calling `execute`. An execution is cancelled when all of its
+        waiters have been cancelled.
+        """
+        in_flight = self._in_flight.get(key)
+        if in_flight is None:
+            in_flight = _InFlight(ensure_future(_await_result(execute)))
+            self._in_flight[key] = in_flight
+            in_flight.future.add_done_callback(
+                lambda _future: self._remove(key, in_flight)
+            )
+        else:
+            self.coalesced += 1
+
+        in_flight.waiters += 1
+        try:
+            return await shield(in_flight.future)
+        except CancelledError:
+            if in_flight.waiters == 1:
+                in_flight.future.cancel()
+            raise
+        finally:
+            in_flight.waiters -= 1
+
+    def _remove(self, key: str, in_flight: _InFlight) -> None:
+        if self._in_flight.get(key) is in_flight:
+            del self._in_flight[key]
+
+
+async def _await_result(execute: Callable[[], Any]) -> Any:
+    result = execute()
+    if isawaitable(result):
+        return await result
+    return result
+
+
+def is_query(
+    schema: GraphQLSchema,
+    query: Optional[str],
+    operation_name: Optional[str],
+    validation_rules: Optional[Collection[Type[ASTValidationRule]]] = None,
+    document_cache: Optional[DocumentCache] = None,
+) -> bool:
+    """Whether the operation is a query.
+
+    With a document cache, the document is parsed and validated through the
+    cache, so that the execution finds it there. Invalid documents are no
+    queries.
+    """
+    if not query:
+        return False
+    if document_cache is not None:
+        document, errors = document_cache.parse_and_validate(
+            schema, query, validation_rules
+        )
+        if document is None or errors:
+            return False
+    else:
+        try:
+            document = parse(query)
+        except GraphQLError:
+            return False
+    operation = get_operation_ast(document, operation_name)
+    return operation is not None and operation.operation == OperationType.QUERY
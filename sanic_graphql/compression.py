@@ -0,0 +1,116 @@
+"""Compression of response bodies negotiated with `Accept-Encoding`.
+
+gzip is always available, brotli if the `brotli` package is installed and
+zstd if the `zstandard` package is installed.
+"""
+import zlib
+from typing import Callable, Dict, Iterable, Optional
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+__all__ = [
+    "compressors",
+    "compress",
+    "gzip_compress",
+    "choose_encoding",
+    "StreamCompressor",
+]
+
+# Levels suited for compressing responses on the fly, and the highest levels
+default_levels = {"br": 4, "zstd": 3, "gzip": 6}
+max_levels = {"br": 11, "zstd": 22, "gzip": 9}
+
+
+def gzip_compress(body: bytes, level: int = 6) -> bytes:
+    """Compress the body with gzip, without a timestamp in the header."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+def _brotli_compress(body: bytes, level: int = 4) -> bytes:
+    return brotli.compress(body, quality=level)
+
+
+def _zstd_compress(body: bytes, level: int = 3) -> bytes:
+    return zstandard.ZstdCompressor(level=level).compress(body)
+
+
+# The available compressors by content coding, in order of preference
+compressors: Dict[str, Callable[[bytes, int], bytes]] = {}
+if brotli is not None:
+    compressors["br"] = _brotli_compress
+if zstandard is not None:
+    compressors["zstd"] = _zstd_compress
+compressors["gzip"] = gzip_compress
+
+
+def get_level(encoding: str, level: Optional[int] = None) -> int:
+    """Return the given level capped to the levels of the encoding."""
+    if level is None:
+        return default_levels[encoding]
+    return max(1, min(level, max_levels[encoding]))
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Compress the body with the given content coding."""
+    return compressors[encoding](body, get_level(encoding, level))
+
+
+class StreamCompressor:
+    """Compressor for bodies that are written in pieces."""
+
+    def __init__(self, encoding: str, level: Optional[int] = None):
+        self.encoding = encoding
+        level = get_level(encoding, level)
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=level)
+            self.compress, self.flush = compressor.process, compressor.finish
+        elif encoding == "zstd":
+            compressor = zstandard.ZstdCompressor(level=level).compressobj()
+            self.compress, self.flush = compressor.compress, compressor.flush
+        elif encoding == "gzip":
+            compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+            self.compress, self.flush = compressor.compress, compressor.flush
+        else:
+            raise ValueError(f"Unknown content coding {encoding!r}.")
+
+
+def choose_encoding(
+    accept_encoding: Optional[str], encodings: Iterable[str]
+) -> Optional[str]:
+    """Return the encoding the client prefers, if it accepts any of them.
+
+    Encodings are accepted if listed in the `Accept-Encoding` header or matched
+    by `*`, unless their quality value is 0. The one with the highest quality
+    value is chosen, and the first of them on a tie. None is returned if the
+    client gives `identity` a higher quality value.
+    """
+    if not accept_encoding:
+        return None
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    if accepted.get("identity", 0.0) > best_quality:
+        return None
+    return best
@@ -0,0 +1,135 @@
+"""DataLoaders batching and caching the loading of data per request.
+
+All keys requested from a loader during one tick of the event loop are
+collected and passed to its batch load function at once, so that resolvers
+of sibling fields end up in a single query to the backend. Every key is only
+loaded once per loader, and loaders are created per request, so that nothing
+is cached beyond the request.
+"""
+from asyncio import Future, ensure_future, gather, get_event_loop, shield
+from typing import (Any, Awaitable, Callable, Dict, Hashable, Iterable, List,
+                    Mapping, Optional, Tuple, Type, Union)
+
+__all__ = ["DataLoader", "DataLoaderRegistry"]
+
+BatchLoadFn = Callable[[List[Hashable]], Awaitable[List[Any]]]
+
+
+class DataLoader:
+    """Batching and caching loader for the given batch load function.
+
+    The batch load function is a coroutine function that gets a list of keys and
+    must return a list of values of the same length and order. Values that are
+    exceptions are raised by the `load` calls of their keys.
+    """
+
+    batch_load_fn: Optional[BatchLoadFn] = None
+
+    def __init__(
+        self,
+        batch_load_fn: Optional[BatchLoadFn] = None,
+        max_batch_size: Optional[int] = None,
+        cache: bool = True,
+    ):
+        if batch_load_fn is not None:
+            self.batch_load_fn = batch_load_fn
+        if self.batch_load_fn is None:
+            raise TypeError("DataLoader requires a batch load function.")
+        self.max_batch_size = max_batch_size
+        self.cache = cache
+        self._futures: Dict[Hashable, Future] = {}
+        self._queue: List[Tuple[Hashable, Future]] = []
+
+    def load(self, key: Hashable) -> "Future[Any]":
+        """Load the value for the given key.
+
+        Cancelling the returned future does not cancel other loads of the key.
+        """
+        if self.cache:
+            future = self._futures.get(key)
+            if future is not None:
+                return shield(future)
+
+        loop = get_event_loop()
+        future = loop.create_future()
+        if self.cache:
+            self._futures[key] = future
+        self._queue.append((key, future))
+        if len(self._queue) == 1:
+            loop.call_soon(self._dispatch)
+        return shield(future)
+
+    def load_many(self, keys: Iterable[Hashable]) -> "Future[List[Any]]":
+        """Load the values for the given keys."""
+        return gather(*map(self.load, keys))
+
+    def prime(self, key: Hashable, value: Any) -> None:
+        """Put the given value for the given key into the cache."""
+        if self.cache and key not in self._futures:
+            future = get_event_loop().create_future()
+            future.set_result(value)
+            self._futures[key] = future
+
+    def clear(self, key: Hashable) -> None:
+        """Remove the given key from the cache."""
+        self._futures.pop(key, None)
+
+    def clear_all(self) -> None:
+        """Remove all keys from the cache."""
+        self._futures.clear()
+
+    def _dispatch(self) -> None:
+        queue, self._queue = self._queue, []
+        size = self.max_batch_size or len(queue)
+        for start in range(0, len(queue), size):
+            ensure_future(self._load_batch(queue[start:start + size]))
+
+    async def _load_batch(self, batch: List[Tuple[Hashable, Future]]) -> None:
+        keys = [key for key, _future in batch]
+        try:
+            values = await self.batch_load_fn(keys)  # type: ignore
+            if len(values) != len(keys):
+                raise TypeError(
+                    "The batch load function must return a list of the same length"
+                    f" as the list of keys, got {len(values)} values"
+                    f" for {len(keys)} keys."
+                )
+        except Exception as error:
+            values = [error] * len(keys)
+
+        for (key, future), value in zip(batch, values):
+            if future.done():
+                continue
+            if isinstance(value, Exception):
+                self.clear(key)
+                future.set_exception(value)
+            else:
+                future.set_result(value)
+
+
+class DataLoaderRegistry:
+    """DataLoaders of a single request, accessible by name.
+
+    The loaders are created on first use, either from a batch load function or
+    from a DataLoader subclass.
+    """
+
+    def __init__(
+        self, loaders: Mapping[str, Union[BatchLoadFn, Type[DataLoader]]]
+    ):
+        self._factories = loaders
+        self._loaders: Dict[str, DataLoader] = {}
+
+    def __getitem__(self, name: str) -> DataLoader:
+        loader = self._loaders.get(name)
+        if loader is None:
+            factory = self._factories[name]
+            if isinstance(factory, type) and issubclass(factory, DataLoader):
+                loader = factory()
+            else:
+                loader = DataLoader(factory)
+            self._loaders[name] = loader
+        return loader
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._factories
@@ -0,0 +1,226 @@
+"""Execution plans reused between executions of the same query document.
+
+graphql-core's `ExecutionContext` works out anew on every execution which
+fields to resolve for every selection set (following fragments, checking type
+conditions and evaluating `@skip` and `@include`), looks up the definition of
+every field in the schema and coerces its arguments. For a cached document
+most of this does not depend on the request, so an `ExecutionPlan` keeps the
+outcome and hands it to every execution context created for the document:
+
+* the collected fields, per value of the variables used in `@skip` and
+  `@include`,
+* the definition of every field, and
+* the arguments of fields that only have constant scalar arguments.
+"""
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple, Type
+
+from graphql.error import located_error
+from graphql.execution import ExecutionContext
+from graphql.execution.execute import get_field_def
+from graphql.execution.values import get_argument_values
+from graphql.language import (BooleanValueNode, DirectiveNode, DocumentNode,
+                              EnumValueNode, FieldNode, FloatValueNode,
+                              IntValueNode, NullValueNode, SelectionSetNode,
+                              StringValueNode, VariableNode, Visitor, visit)
+from graphql.pyutils import AwaitableOrValue, Path, Undefined
+from graphql.type import GraphQLField, GraphQLObjectType, GraphQLSchema
+
+from .cache import LRUCache
+
+__all__ = ["ExecutionPlan", "ExecutionPlanCache", "PlannedExecutionContext"]
+
+FieldsCache = Dict[Tuple, Dict[str, List[FieldNode]]]
+FieldPlan = Tuple[GraphQLField, Optional[Dict[str, Any]]]
+
+_constant_value_nodes = (
+    BooleanValueNode,
+    EnumValueNode,
+    FloatValueNode,
+    IntValueNode,
+    NullValueNode,
+    StringValueNode,
+)
+
+
+class ExecutionPlan:
+    """The collected fields and field definitions of a document.
+
+    `derived` keeps documents derived from this one, like the parts of
+    incrementally delivered operations, so that they get plans of their own.
+    """
+
+    def __init__(self, document: DocumentNode):
+        self.document = document
+        self.directive_variables = get_directive_variables(document)
+        self.fields: Dict[Tuple, FieldsCache] = {}
+        self.field_plans: Dict[Tuple[GraphQLObjectType, int], FieldPlan] = {}
+        self.derived: Dict[Hashable, Any] = {}
+        self.context_class: Type[ExecutionContext] = type(
+            "PlannedExecutionContext", (PlannedExecutionContext,), {"plan": self}
+        )
+
+    def get_fields_cache(self, variable_values: Dict[str, Any]) -> FieldsCache:
+        """Return the fields cache for the given variable values."""
+        key = tuple(variable_values.get(name) for name in self.directive_variables)
+        return self.fields.setdefault(key, {})
+
+    def get_field_plan(
+        self,
+        schema: GraphQLSchema,
+        parent_type: GraphQLObjectType,
+        field_node: FieldNode,
+    ) -> Optional[FieldPlan]:
+        """Return the definition and the constant arguments of a field, if any."""
+        key = (parent_type, id(field_node))
+        field_plan = self.field_plans.get(key)
+        if field_plan is None:
+            field_def = get_field_def(schema, parent_type, field_node.name.value)
+            if not field_def:
+                return None
+            args = None
+            if all(
+                isinstance(argument.value, _constant_value_nodes)
+                for argument in field_node.arguments or ()
+            ):
+                try:
+                    args = get_argument_values(field_def, field_node)
+                except Exception:
+                    # Reported by every execution instead
+                    pass
+            field_plan = self.field_plans[key] = (field_def, args)
+        return field_plan
+
+
+class PlannedExecutionContext(ExecutionContext):
+    """Execution context looking up the fields to execute in its plan."""
+
+    plan: ExecutionPlan
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._subfields_cache = self.plan.get_fields_cache(self.variable_values)
+
+    def collect_fields(
+        self,
+        runtime_type: GraphQLObjectType,
+        selection_set: SelectionSetNode,
+        fields: Dict[str, List[FieldNode]],
+        visited_fragment_names: Set[str],
+    ) -> Dict[str, List[FieldNode]]:
+        # Only the root fields are cached here, sub-fields are collected into
+        # a shared dict by collect_subfields, which caches them already.
+        if selection_set is not self.operation.selection_set:
+            return super().collect_fields(
+                runtime_type, selection_set, fields, visited_fragment_names
+            )
+        key = (runtime_type, id(selection_set))
+        root_fields = self._subfields_cache.get(key)
+        if root_fields is None:
+            root_fields = super().collect_fields(
+                runtime_type, selection_set, fields, visited_fragment_names
+            )
+            self._subfields_cache[key] = root_fields
+        return root_fields
+
+    def resolve_field(
+        self,
+        parent_type: GraphQLObjectType,
+        source: Any,
+        field_nodes: List[FieldNode],
+        path: Path,
+    ) -> AwaitableOrValue[Any]:
+        """Resolve the field on the given source object.
+
+        This is `ExecutionContext.resolve_field`, taking the field definition
+        and constant arguments from the plan.
+        """
+        field_plan = self.plan.get_field_plan(self.schema, parent_type, field_nodes[0])
+        if field_plan is None:
+            return Undefined
+        field_def, args = field_plan
+
+        return_type = field_def.type
+        resolve_fn = field_def.resolve or self.field_resolver
+
+        if self.middleware_manager:
+            resolve_fn = self.middleware_manager.get_field_resolver(resolve_fn)
+
+        info = self.build_resolve_info(field_def, field_nodes, parent_type, path)
+
+        try:
+            if args is None:
+                args = get_argument_values(
+                    field_def, field_nodes[0], self.variable_values
+                )
+
+            result = resolve_fn(source, info, **args)
+
+            completed: AwaitableOrValue[Any]
+            if self.is_awaitable(result):
+
+                async def await_result() -> Any:
+                    try:
+                        completed = self.complete_value(
+                            return_type, field_nodes, info, path, await result
+                        )
+                        if self.is_awaitable(completed):
+                            return await completed
+                        return completed
+                    except Exception as raw_error:
+                        error = located_error(raw_error, field_nodes, path.as_list())
+                        self.handle_field_error(error, return_type)
+                        return None
+
+                return await_result()
+
+            completed = self.complete_value(
+                return_type, field_nodes, info, path, result
+            )
+            if self.is_awaitable(completed):
+
+                async def await_completed() -> Any:
+                    try:
+                        return await completed
+                    except Exception as raw_error:
+                        error = located_error(raw_error, field_nodes, path.as_list())
+                        self.handle_field_error(error, return_type)
+                        return None
+
+                return await_completed()
+
+            return completed
+        except Exception as raw_error:
+            error = located_error(raw_error, field_nodes, path.as_list())
+            self.handle_field_error(error, return_type)
+            return None
+
+
+class ExecutionPlanCache(LRUCache):
+    """LRU cache of the execution plans of the most recently executed documents.
+
+    Plans are keyed on the identity of their document, which they keep a
+    reference to, so this is only useful with documents from a `DocumentCache`.
+    """
+
+    def get_plan(self, document: DocumentNode) -> ExecutionPlan:
+        key = id(document)
+        plan = self.get(key)
+        if plan is None or plan.document is not document:
+            plan = ExecutionPlan(document)
+            self.set(key, plan)
+        return plan
+
+
+def get_directive_variables(document: DocumentNode) -> Tuple[str, ...]:
+    """Return the names of the variables used by `@skip` and `@include`."""
+    names: Set[str] = set()
+
+    class DirectiveVariables(Visitor):
+        def enter_directive(self, node: DirectiveNode, *_args):
+            if node.name.value in ("skip", "include"):
+                for argument in node.arguments or ():
+                    if isinstance(argument.value, VariableNode):
+                        names.add(argument.value.name.value)
+
+    visit(document, DirectiveVariables())
+    return tuple(sorted(names))
@@ -0,0 +1,54 @@
+"""Cache of rendered GraphiQL pages.
+
+The GraphiQL page only depends on the options of the view, which are the same
+for every request, and on the query, variables, operation name and result it
+shows. Pages are cached by the latter, together with an `ETag` and their
+bodies compressed with the content codings clients asked for, so that repeated
+hits neither render the template again nor compress the page.
+"""
+import json
+from typing import Dict, Hashable, NamedTuple, Optional
+
+from graphql_server.render_graphiql import GraphiQLData
+
+from .cache import LRUCache
+from .response_cache import get_etag
+
+__all__ = ["GraphiQLPage", "GraphiQLPageCache", "get_graphiql_page_key"]
+
+
+class GraphiQLPage(NamedTuple):
+    body: bytes
+    etag: str
+    # Compressed bodies by content coding, filled in on first use
+    encoded: Dict[str, bytes]
+
+    @classmethod
+    def from_source(cls, source: str) -> "GraphiQLPage":
+        body = source.encode("utf8")
+        return cls(body, get_etag(body), {})
+
+
+class GraphiQLPageCache(LRUCache):
+    """LRU cache of the rendered GraphiQL pages of a view."""
+
+    def get_page(self, key: Hashable) -> Optional[GraphiQLPage]:
+        return self.get(key)
+
+    def set_page(self, key: Hashable, source: str) -> GraphiQLPage:
+        page = GraphiQLPage.from_source(source)
+        self.set(key, page)
+        return page
+
+
+def get_graphiql_page_key(data: GraphiQLData) -> Hashable:
+    """Return the cache key of the GraphiQL page showing the given data."""
+    variables = data.get("variables")
+    return (
+        data.get("query"),
+        json.dumps(variables, sort_keys=True, default=str) if variables else None,
+        data.get("operation_name"),
+        data.get("result"),
+        data.get("subscription_url"),
+        data.get("headers"),
+    )
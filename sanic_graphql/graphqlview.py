@@ -0,0 +1,928 @@
+from asyncio import get_event_loop
+from collections.abc import Mapping
+from functools import partial
+from inspect import isawaitable
+from random import random
+from time import perf_counter
+from typing import List
+
+from graphql_server import GraphQLParams, HttpQueryError, json_encode
+from graphql_server.render_graphiql import (GraphiQLConfig, GraphiQLData,
+                                            GraphiQLOptions,
+                                            render_graphiql_async)
+from graphql_server.sanic import GraphQLView as BaseGraphQLView
+from sanic.response import HTTPResponse, StreamingHTTPResponse, html, raw
+
+from graphql import GraphQLError
+from graphql.execution import MiddlewareManager
+from graphql.language import parse
+from graphql.type import GraphQLSchema, validate_schema
+from graphql.validation import NoSchemaIntrospectionCustomRule, specified_rules
+
+from .cache import DocumentCache, parse_and_validate
+from .coalescing import InFlightOperations, is_query
+from .compression import (StreamCompressor, choose_encoding, compress,
+                          compressors, max_levels)
+from .dataloader import DataLoaderRegistry
+from .execution import ExecutionPlanCache
+from .graphiql import GraphiQLPageCache, get_graphiql_page_key
+from .incremental import (add_incremental_directives, execute_incrementally,
+                          multipart_response, split_deferred_fragments)
+from .introspection import (IntrospectionCache, is_introspection_query,
+                            may_be_introspection)
+from .json_codec import get_default_json_codec
+from .limits import (check_body_size, check_content_length,
+                     check_request_limits, parse_multipart_form,
+                     read_streamed_body, spool_streamed_body)
+from .offload import CancellationMiddleware, ExecutorQueue
+from .persisted_queries import MemoryPersistedQueryStore, load_persisted_query
+from .rate_limit import MemoryRateLimitStore, RateLimitExceeded
+from .response_cache import (CachedResponse, MemoryResponseCache, etag_matches,
+                             get_etag, get_response_cache_key)
+from .runtime import (_NoException, encode_execution_results,
+                      gather_execution_results, get_all_params,
+                      get_query_string_params, get_response,
+                      parse_query_string)
+from .streaming import stream_execution_results
+from .timeouts import TimeoutMiddleware
+from .timing import RequestTimings
+from .tracing import TracingMiddleware
+from .uploads import get_uploads, parse_multipart_request
+
+default_json_codec = get_default_json_codec()
+
+
+class GraphQLView(BaseGraphQLView):
+    document_cache_size = None
+    document_cache = None
+    persisted_queries = False
+    persisted_query_store = None
+    batch_concurrency_limit = None
+    validation_rules = None
+    loaders = None
+    json_codec = None
+    stream_response = False
+    stream_chunk_size = 65536
+    server_timing = False
+    timing_callback = None
+    tracing = False
+    tracing_sample_rate = 1.0
+    tracing_sink = None
+    response_cache = False
+    response_cache_store = None
+    response_cache_ttl = 60
+    response_cache_vary = None
+    cache_control = None
+    incremental_delivery = False
+    execution_plan_cache_size = None
+    execution_plan_cache = None
+    max_body_size = None
+    max_batch_size = None
+    max_query_length = None
+    max_variables_size = None
+    multipart_spool_size = 1024 * 1024
+    multipart_max_fields = 1000
+    executor = None
+    executor_max_pending = None
+    executor_queue = None
+    execution_timeout = None
+    graphiql_cache_size = None
+    graphiql_cache = None
+    graphiql_max_age = 86400
+    compress_responses = False
+    compression_min_size = 1024
+    compression_level = None
+    compression_executor_min_size = 256 * 1024
+    coalesce_queries = False
+    coalesce_vary = None
+    in_flight_operations = None
+    introspection = True
+    introspection_cache_size = None
+    introspection_cache = None
+    rate_limit = None
+    rate_limit_burst = None
+    rate_limit_key = None
+    rate_limit_cost = None
+    rate_limit_store = None
+
+    @classmethod
+    def as_view(cls, *class_args, **class_kwargs):
+        """Return the Sanic view function for the given view options.
+
+        Sanic instantiates the view class on every request, so state that has
+        to outlive a request (like caches) is created here once and handed to
+        every instance. It is also exposed as an attribute of the view function.
+        """
+        document_cache_size = class_kwargs.get(
+            "document_cache_size", cls.document_cache_size
+        )
+        execution_plan_cache_size = class_kwargs.get(
+            "execution_plan_cache_size", cls.execution_plan_cache_size
+        )
+        if (
+            execution_plan_cache_size
+            and class_kwargs.get("execution_plan_cache") is None
+        ):
+            class_kwargs["execution_plan_cache"] = ExecutionPlanCache(
+                execution_plan_cache_size
+            )
+        if class_kwargs.get("execution_plan_cache") is not None:
+            # Plans are only reused for documents taken from a document cache
+            document_cache_size = document_cache_size or execution_plan_cache_size
+        if document_cache_size and class_kwargs.get("document_cache") is None:
+            class_kwargs["document_cache"] = DocumentCache(document_cache_size)
+        persisted_queries = class_kwargs.get(
+            "persisted_queries", cls.persisted_queries
+        )
+        if persisted_queries and class_kwargs.get("persisted_query_store") is None:
+            class_kwargs["persisted_query_store"] = MemoryPersistedQueryStore()
+        response_cache = class_kwargs.get("response_cache", cls.response_cache)
+        if response_cache and class_kwargs.get("response_cache_store") is None:
+            class_kwargs["response_cache_store"] = MemoryResponseCache()
+
+        coalesce_queries = class_kwargs.get("coalesce_queries", cls.coalesce_queries)
+        if coalesce_queries and class_kwargs.get("in_flight_operations") is None:
+            class_kwargs["in_flight_operations"] = InFlightOperations()
+
+        rate_limit = class_kwargs.get("rate_limit", cls.rate_limit)
+        if rate_limit and class_kwargs.get("rate_limit_store") is None:
+            class_kwargs["rate_limit_store"] = MemoryRateLimitStore()
+
+        introspection_cache_size = class_kwargs.get(
+            "introspection_cache_size", cls.introspection_cache_size
+        )
+        if introspection_cache_size and class_kwargs.get("introspection_cache") is None:
+            class_kwargs["introspection_cache"] = IntrospectionCache(
+                introspection_cache_size
+            )
+
+        graphiql_cache_size = class_kwargs.get(
+            "graphiql_cache_size", cls.graphiql_cache_size
+        )
+        if graphiql_cache_size and class_kwargs.get("graphiql_cache") is None:
+            class_kwargs["graphiql_cache"] = GraphiQLPageCache(graphiql_cache_size)
+
+        if class_kwargs.get("json_codec", cls.json_codec) is None:
+            class_kwargs["json_codec"] = default_json_codec
+
+        executor = class_kwargs.get("executor", cls.executor)
+        if executor is not None and class_kwargs.get("executor_queue") is None:
+            class_kwargs["executor_queue"] = ExecutorQueue(
+                executor,
+                class_kwargs.get("executor_max_pending", cls.executor_max_pending),
+            )
+
+        schema = class_kwargs.get("schema", cls.schema)
+        if class_kwargs.get(
+            "incremental_delivery", cls.incremental_delivery
+        ) and isinstance(schema, GraphQLSchema):
+            class_kwargs["schema"] = add_incremental_directives(schema)
+
+        view = super().as_view(*class_args, **class_kwargs)
+        view.document_cache = class_kwargs.get("document_cache")
+        view.execution_plan_cache = class_kwargs.get("execution_plan_cache")
+        view.persisted_query_store = class_kwargs.get("persisted_query_store")
+        view.response_cache_store = class_kwargs.get("response_cache_store")
+        view.executor_queue = class_kwargs.get("executor_queue")
+        view.graphiql_cache = class_kwargs.get("graphiql_cache")
+        view.in_flight_operations = class_kwargs.get("in_flight_operations")
+        view.introspection_cache = class_kwargs.get("introspection_cache")
+        view.rate_limit_store = class_kwargs.get("rate_limit_store")
+        return view
+
+    def get_context(self, request):
+        context = super().get_context(request)
+        if self.loaders and "loaders" not in context:
+            context["loaders"] = DataLoaderRegistry(self.loaders)
+        return context
+
+    def get_middleware(self, *operation_middleware):
+        """Return the middleware of the view after the given per-operation ones."""
+        added = [middleware for middleware in operation_middleware if middleware]
+        if not added:
+            return self.middleware
+        if isinstance(self.middleware, MiddlewareManager):
+            return MiddlewareManager(*added, *self.middleware.middlewares)
+        return [*added, *(self.middleware or ())]
+
+    def get_execution_timeout(self, request, params):
+        """Return the execution timeout of an operation in seconds, if any.
+
+        Override this to give operations different timeouts, e.g. depending on
+        their operation name or the user.
+        """
+        return self.execution_timeout
+
+    def get_timeout_middleware(self, request, params):
+        timeout = self.get_execution_timeout(request, params)
+        if timeout is None:
+            return None
+        return TimeoutMiddleware(timeout)
+
+    def get_tracer(self):
+        """Return a tracing middleware for an operation, if it should be traced."""
+        if not (self.tracing or self.tracing_sink):
+            return None
+        if self.tracing_sample_rate < 1 and random() >= self.tracing_sample_rate:
+            return None
+        return TracingMiddleware()
+
+    def report_traces(self, execution_results, tracers):
+        """Add the traces to the results and pass them on to the tracing sink."""
+        for execution_result, tracer in zip(execution_results, tracers):
+            if tracer is None:
+                continue
+            tracer.finish()
+            trace = tracer.to_dict()
+            if self.tracing_sink:
+                self.tracing_sink(trace)
+            if self.tracing and execution_result is not None:
+                execution_result.extensions = dict(
+                    execution_result.extensions or (), tracing=trace
+                )
+
+    def get_validation_rules(self):
+        """Return the validation rules, including the additional ones of the view.
+
+        Without `introspection`, introspection fields other than `__typename`
+        are rejected.
+        """
+        validation_rules = list(self.validation_rules or ())
+        if not self.introspection:
+            validation_rules.append(NoSchemaIntrospectionCustomRule)
+        if not validation_rules:
+            return None
+        return [*specified_rules, *validation_rules]
+
+    async def dispatch_request(self, request, *args, **kwargs):
+        timings = (
+            RequestTimings() if self.server_timing or self.timing_callback else None
+        )
+        response = await self.dispatch_graphql_request(request, timings)
+
+        if timings is not None:
+            if self.server_timing:
+                # Phases that end after the headers are sent are left out
+                response.headers["Server-Timing"] = timings.server_timing_header()
+            if self.timing_callback:
+                if isinstance(response, StreamingHTTPResponse):
+                    # Deferred fragments only run while the body is streamed
+                    response.streaming_fn = self.report_timings_after(
+                        response.streaming_fn, request, timings
+                    )
+                else:
+                    self.timing_callback(request, timings)
+        return response
+
+    def report_timings_after(self, streaming_fn, request, timings):
+        """Wrap the streaming function to report the timings once it is done."""
+
+        async def streaming_fn_with_timings(response):
+            try:
+                await streaming_fn(response)
+            finally:
+                self.timing_callback(request, timings)
+
+        return streaming_fn_with_timings
+
+    async def dispatch_graphql_request(self, request, timings=None):
+        try:
+            request_method = request.method.lower()
+            start = perf_counter()
+            if request_method == "get":
+                # GET requests only take params from the query string, which
+                # is parsed once here instead of going through `request.args`
+                data = {}
+                query_data = parse_query_string(request.query_string)
+            else:
+                form = await self.load_body(request)
+                data = form if form is not None else self.parse_body(request)
+                if self.get_mime_type(request) == "multipart/form-data":
+                    files = request.files if form is None else None
+                    data = parse_multipart_request(data, get_uploads(data, files))
+                query_data = request.args
+            if timings is not None:
+                timings.add("body", perf_counter() - start)
+            check_request_limits(
+                data,
+                query_data,
+                max_batch_size=self.max_batch_size,
+                max_query_length=self.max_query_length,
+                max_variables_size=self.max_variables_size,
+                dumps=self.json_codec.dumps,
+            )
+            if self.persisted_query_store is not None:
+                data = await self.load_persisted_queries(data, query_data)
+
+            show_graphiql = request_method == "get" and self.should_display_graphiql(
+                request, query_data
+            )
+            catch = show_graphiql
+
+            pretty = self.pretty or show_graphiql or query_data.get("pretty")
+
+            if request_method != "options":
+                all_params: List[GraphQLParams]
+                if request_method == "get" and not data:
+                    all_params = [
+                        get_query_string_params(query_data, self.json_codec.loads)
+                    ]
+                else:
+                    all_params = get_all_params(
+                        request_method,
+                        data,
+                        query_data=query_data,
+                        batch_enabled=self.batch,
+                    )
+                rate_limit_key = await self.check_rate_limit(request, all_params)
+                split = None
+                if (
+                    self.incremental_delivery
+                    and not show_graphiql
+                    and not isinstance(data, list)
+                    and "multipart/mixed" in request.headers.get("accept", "")
+                ):
+                    split = self.split_incremental_operation(all_params[0], timings)
+
+                cache_key = None
+                if split is None:
+                    cache_key = self.get_response_cache_key(
+                        request, data, all_params, show_graphiql, pretty
+                    )
+                if cache_key is not None:
+                    cached = await self.response_cache_store.get(cache_key)
+                    if cached is not None:
+                        return await self.cached_response(request, cached)
+
+                cache_introspection = split is None and self.should_cache_introspection(
+                    data, all_params, show_graphiql
+                )
+                if cache_introspection:
+                    body = self.introspection_cache.get_result(
+                        self.schema, all_params[0], pretty
+                    )
+                    if body is not None:
+                        return await self.json_response(request, body)
+
+                if rate_limit_key is not None and self.rate_limit_cost is not None:
+                    await self.charge_operation_costs(rate_limit_key, all_params)
+
+                catch_exc = HttpQueryError if catch else _NoException
+                context_value = self.get_context(request)
+                if split is not None:
+                    return self.dispatch_incremental_request(
+                        request, all_params[0], split, context_value, timings
+                    )
+                tracers = [self.get_tracer() for _params in all_params]
+                timeouts = [
+                    self.get_timeout_middleware(request, params)
+                    for params in all_params
+                ]
+                offload = self.executor_queue is not None and not self.enable_async
+                cancellations = [
+                    CancellationMiddleware() if offload else None
+                    for _params in all_params
+                ]
+
+                operations = [
+                    self.get_operation(
+                        params,
+                        catch_exc,
+                        allow_only_query=request_method == "get",
+                        context_value=context_value,
+                        middleware=self.get_middleware(
+                            timeout, cancellation, tracer
+                        ),
+                        timings=timings,
+                    )
+                    for params, timeout, cancellation, tracer in zip(
+                        all_params, timeouts, cancellations, tracers
+                    )
+                ]
+                if offload:
+                    exec_res = await self.executor_queue.run(
+                        list(zip(operations, cancellations))
+                    )
+                elif self.enable_async:
+                    execution_results = [
+                        self.coalesce(request, params, operation)
+                        if tracer is None
+                        else operation()
+                        for params, operation, tracer in zip(
+                            all_params, operations, tracers
+                        )
+                    ]
+                    start = perf_counter()
+                    exec_res = await gather_execution_results(
+                        execution_results, self.batch_concurrency_limit
+                    )
+                    if timings is not None:
+                        timings.add("execute", perf_counter() - start)
+                else:
+                    exec_res = [operation() for operation in operations]
+                self.report_traces(exec_res, tracers)
+                if timings is not None:
+                    timings.timeouts += sum(
+                        1 for timeout in timeouts if timeout and timeout.timed_out
+                    )
+                if (
+                    cache_key is None
+                    and not cache_introspection
+                    and self.should_stream_response(show_graphiql, pretty)
+                ):
+                    encoding = self.get_response_encoding(request)
+                    compressor = None
+                    if encoding is not None:
+                        compressor = StreamCompressor(encoding, self.compression_level)
+                    response = stream_execution_results(
+                        exec_res,
+                        format_error=self.format_error,
+                        dumps=self.json_codec.dumps,
+                        is_batch=isinstance(data, list),
+                        chunk_size=self.stream_chunk_size,
+                        compressor=compressor,
+                    )
+                    if self.compress_responses:
+                        response.headers["Vary"] = "Accept-Encoding"
+                    return response
+
+                start = perf_counter()
+                result, status_code = encode_execution_results(
+                    exec_res,
+                    is_batch=isinstance(data, list),
+                    format_error=self.format_error,
+                    encode=partial(self.encode_json, pretty=pretty),
+                )
+                if timings is not None:
+                    timings.add("encode", perf_counter() - start)
+
+                if show_graphiql:
+                    graphiql_data = GraphiQLData(
+                        result=result.decode("utf8"),
+                        query=getattr(all_params[0], "query"),
+                        variables=getattr(all_params[0], "variables"),
+                        operation_name=getattr(all_params[0], "operation_name"),
+                        subscription_url=self.subscriptions,
+                        headers=self.headers,
+                    )
+                    return await self.render_graphiql(request, graphiql_data, timings)
+
+                if (
+                    cache_introspection
+                    and status_code == 200
+                    and tracers[0] is None
+                    and is_introspection_query(
+                        parse(all_params[0].query), all_params[0].operation_name
+                    )
+                ):
+                    self.introspection_cache.set_result(
+                        self.schema, all_params[0], pretty, result
+                    )
+
+                if (
+                    cache_key is not None
+                    and status_code == 200
+                    and not any(
+                        execution_result is not None and execution_result.errors
+                        for execution_result in exec_res
+                    )
+                ):
+                    cached = CachedResponse(result, get_etag(result), {})
+                    await self.response_cache_store.set(
+                        cache_key, cached, self.response_cache_ttl
+                    )
+                    return await self.cached_response(request, cached)
+
+                return await self.json_response(request, result, status_code)
+
+            else:
+                return self.process_preflight(request)
+
+        except HttpQueryError as e:
+            parsed_error = GraphQLError(
+                e.message, extensions=getattr(e, "extensions", None)
+            )
+            return raw(
+                self.encode_json(dict(errors=[self.format_error(parsed_error)])),
+                status=e.status_code,
+                headers=e.headers,
+                content_type="application/json",
+            )
+
+    async def render_graphiql(self, request, graphiql_data, timings=None):
+        """Return the GraphiQL page, from the GraphiQL cache if possible."""
+        if self.graphiql_cache is not None:
+            key = get_graphiql_page_key(graphiql_data)
+            page = self.graphiql_cache.get_page(key)
+            if page is None:
+                source = await self.render_graphiql_source(graphiql_data, timings)
+                page = self.graphiql_cache.set_page(key, source)
+            return await self.graphiql_page_response(request, page, graphiql_data)
+        return html(await self.render_graphiql_source(graphiql_data, timings))
+
+    async def render_graphiql_source(self, graphiql_data, timings=None):
+        graphiql_config = GraphiQLConfig(
+            graphiql_version=self.graphiql_version,
+            graphiql_template=self.graphiql_template,
+            graphiql_html_title=self.graphiql_html_title,
+            jinja_env=self.jinja_env,
+        )
+        graphiql_options = GraphiQLOptions(
+            default_query=self.default_query,
+            header_editor_enabled=self.header_editor_enabled,
+            should_persist_headers=self.should_persist_headers,
+        )
+        start = perf_counter()
+        source = await render_graphiql_async(
+            data=graphiql_data, config=graphiql_config, options=graphiql_options,
+        )
+        if timings is not None:
+            timings.add("render", perf_counter() - start)
+        return source
+
+    async def graphiql_page_response(self, request, page, graphiql_data):
+        """Return a cached GraphiQL page, compressed if the client accepts it.
+
+        The page without a query can be cached by clients for
+        `graphiql_max_age`, pages showing the result of a query are revalidated.
+        Pages are compressed on first use of a content coding. The page without
+        a query is the same for every request, so it gets the highest level.
+        """
+        static = not graphiql_data.get("query")
+        if static:
+            cache_control = f"max-age={int(self.graphiql_max_age)}"
+        else:
+            cache_control = "no-cache"
+        headers = {
+            "ETag": page.etag,
+            "Cache-Control": cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(request.headers.get("If-None-Match"), page.etag):
+            return HTTPResponse(status=304, headers=headers)
+        encoding = choose_encoding(request.headers.get("Accept-Encoding"), compressors)
+        body = page.body
+        if encoding is not None:
+            body = page.encoded.get(encoding)
+            if body is None:
+                body = await self.compress(
+                    page.body,
+                    encoding,
+                    max_levels[encoding] if static else None,
+                    offload=static,
+                )
+                page.encoded[encoding] = body
+            headers["Content-Encoding"] = encoding
+        return raw(body, headers=headers, content_type="text/html; charset=utf-8")
+
+    async def check_rate_limit(self, request, all_params):
+        """Take a token per operation from the bucket of the client.
+
+        This happens before the operations are parsed. Returns the rate limit
+        key of the client, None for clients that are not rate limited.
+        """
+        if not self.rate_limit:
+            return None
+        key = self.rate_limit_key(request) if self.rate_limit_key else request.ip
+        if key is not None:
+            await self.consume_tokens(key, len(all_params))
+        return key
+
+    async def charge_operation_costs(self, key, all_params):
+        """Take the cost of the operations beyond their first token."""
+        cost = sum(max(1, self.get_operation_cost(params)) for params in all_params)
+        if cost > len(all_params):
+            await self.consume_tokens(key, cost - len(all_params))
+
+    def get_operation_cost(self, params):
+        """Return the cost of an operation, 1 if it cannot be parsed."""
+        if not params.query:
+            return 1
+        if self.document_cache is not None:
+            document, _errors = self.document_cache.parse_and_validate(
+                self.schema, params.query, self.get_validation_rules()
+            )
+        else:
+            try:
+                document = parse(params.query)
+            except GraphQLError:
+                document = None
+        if document is None:
+            return 1
+        return self.rate_limit_cost(
+            self.schema, document, params.operation_name, params.variables
+        )
+
+    async def consume_tokens(self, key, tokens):
+        rate = self.rate_limit
+        capacity = self.rate_limit_burst or max(1, rate)
+        retry_after = await self.rate_limit_store.consume(key, tokens, rate, capacity)
+        if retry_after:
+            raise RateLimitExceeded(retry_after)
+
+    def should_cache_introspection(self, data, all_params, show_graphiql):
+        """Whether the operation may be an introspection query to cache."""
+        return (
+            self.introspection_cache is not None
+            and not show_graphiql
+            and not isinstance(data, list)
+            and may_be_introspection(all_params[0].query)
+        )
+
+    def coalesce(self, request, params, operation):
+        """Run the operation, sharing its execution with identical queries.
+
+        Without `coalesce_queries`, or for operations that are no queries,
+        the operation is just run. Coalesced queries are executed with the
+        context of the request that came first, so everything the result
+        depends on besides the query and variables has to be part of the key
+        returned by `coalesce_vary`.
+        """
+        if self.in_flight_operations is None or not is_query(
+            self.schema,
+            params.query,
+            params.operation_name,
+            self.get_validation_rules(),
+            self.document_cache,
+        ):
+            return operation()
+        vary = self.coalesce_vary(request) if self.coalesce_vary else None
+        key = get_response_cache_key(params, False, vary)
+        return self.in_flight_operations.run(key, operation)
+
+    def get_operation(self, params, catch_exc, **kwargs):
+        """Return a function executing the operation with the options of the view.
+
+        The keyword arguments are passed on to `get_response`.
+        """
+        return partial(
+            get_response,
+            self.schema,
+            params,
+            catch_exc,
+            run_sync=not self.enable_async,
+            root_value=self.get_root_value(),
+            validation_rules=self.get_validation_rules(),
+            document_cache=self.document_cache,
+            execution_plans=self.execution_plan_cache,
+            **kwargs,
+        )
+
+    def split_incremental_operation(self, params, timings=None):
+        """Split the deferred fragments off the operation.
+
+        Returns the initial document and the deferred ones, or None for
+        operations without deferred fragments and for invalid ones, so that
+        they are answered with a regular response.
+        """
+        if not params.query or "@defer" not in params.query:
+            return None
+        if validate_schema(self.schema):
+            return None
+        if self.document_cache is not None:
+            document, errors = self.document_cache.parse_and_validate(
+                self.schema, params.query, self.get_validation_rules(), None, timings
+            )
+        else:
+            document, errors = parse_and_validate(
+                self.schema, params.query, self.get_validation_rules(), None, timings
+            )
+        if document is None or errors:
+            return None
+        cache = None
+        if self.execution_plan_cache is not None and self.document_cache is not None:
+            cache = self.execution_plan_cache.get_plan(document).derived
+        try:
+            document, deferred = split_deferred_fragments(
+                self.schema, document, params.operation_name, params.variables, cache
+            )
+        except GraphQLError:
+            return None
+        if not deferred:
+            return None
+        return document, deferred
+
+    def dispatch_incremental_request(
+        self, request, params, split, context_value, timings=None
+    ):
+        """Return a multipart response delivering the deferred fragments last.
+
+        The initial and the deferred documents are executed like any other
+        operation, each with its own tracer and timeout.
+        """
+        offload = self.executor_queue is not None and not self.enable_async
+
+        async def run(document):
+            tracer = self.get_tracer()
+            timeout = self.get_timeout_middleware(request, params)
+            cancellation = CancellationMiddleware() if offload else None
+            operation = self.get_operation(
+                params,
+                _NoException,
+                context_value=context_value,
+                middleware=self.get_middleware(timeout, cancellation, tracer),
+                timings=timings,
+                document=document,
+            )
+            if offload:
+                (result,) = await self.executor_queue.run([(operation, cancellation)])
+            else:
+                result = operation()
+                if isawaitable(result):
+                    start = perf_counter()
+                    result = await result
+                    if timings is not None:
+                        timings.add("execute", perf_counter() - start)
+            self.report_traces([result], [tracer])
+            if timings is not None and timeout and timeout.timed_out:
+                timings.timeouts += 1
+            return result
+
+        document, deferred = split
+        payloads = execute_incrementally(
+            run(document),
+            [(label, run(deferred_document)) for label, deferred_document in deferred],
+            self.format_error,
+        )
+        return multipart_response(payloads, self.json_codec.dumps)
+
+    def should_display_graphiql(self, request, query_data=None):
+        if query_data is None:
+            query_data = request.args
+        if not self.graphiql or "raw" in query_data:
+            return False
+
+        return self.request_wants_html(request)
+
+    async def load_persisted_queries(self, data, query_data):
+        """Replace persisted query hashes in the params with their queries."""
+        store = self.persisted_query_store
+        if isinstance(data, list):
+            return [
+                await load_persisted_query(store, entry)
+                if isinstance(entry, Mapping)
+                else entry
+                for entry in data
+            ]
+        if isinstance(data, Mapping):
+            data = await load_persisted_query(store, data, query_data)
+        return data
+
+    async def load_body(self, request):
+        """Receive the request body, rejecting bodies larger than `max_body_size`.
+
+        Bodies of streamed routes are read here chunk by chunk. Multipart bodies
+        are spooled to a temporary file and returned parsed, other bodies are
+        left in `request.body` for `parse_body`.
+        """
+        check_content_length(request, self.max_body_size)
+        if request.stream is None:
+            check_body_size(len(request.body), self.max_body_size)
+            return None
+
+        if self.get_mime_type(request) == "multipart/form-data":
+            body = await spool_streamed_body(
+                request, self.max_body_size, self.multipart_spool_size, self.executor
+            )
+            try:
+                return await get_event_loop().run_in_executor(
+                    self.executor,
+                    parse_multipart_form,
+                    body,
+                    request.content_type,
+                    self.multipart_max_fields,
+                )
+            finally:
+                body.close()
+        request.body = await read_streamed_body(request, self.max_body_size)
+        return None
+
+    # noinspection PyBroadException
+    def parse_body(self, request):
+        content_type = self.get_mime_type(request)
+        if content_type == "application/graphql":
+            return {"query": request.body.decode("utf8")}
+
+        elif content_type == "application/json":
+            try:
+                return self.json_codec.loads(request.body)
+            except Exception:
+                raise HttpQueryError(400, "POST body sent invalid JSON.")
+
+        elif content_type in (
+            "application/x-www-form-urlencoded",
+            "multipart/form-data",
+        ):
+            return request.form
+
+        return {}
+
+    def encode_json(self, data, pretty=False):
+        """Serialize the response data to bytes using the JSON codec.
+
+        A custom `encode` function given to the view takes precedence.
+        """
+        if self.encode is not json_encode:
+            return self.encode(data, pretty=pretty).encode("utf8")
+        return self.json_codec.dumps(data, pretty=pretty)
+
+    def get_response_cache_key(self, request, data, all_params, show_graphiql, pretty):
+        """Return the response cache key for cacheable requests, None otherwise.
+
+        Only responses to single GET queries are cached, as GET requests
+        cannot run mutations.
+        """
+        if (
+            self.response_cache_store is None
+            or request.method != "GET"
+            or show_graphiql
+            or isinstance(data, list)
+            or not all_params[0].query
+        ):
+            return None
+        vary = self.response_cache_vary(request) if self.response_cache_vary else None
+        return get_response_cache_key(all_params[0], pretty, vary)
+
+    async def cached_response(self, request, cached):
+        """Return the cached response, or 304 if the client has it already.
+
+        Compressed bodies are kept with the cached response, so that they are
+        only compressed once (for caches keeping the response in memory).
+        Every content coding gets its own `ETag`.
+        """
+        encoding = self.get_response_encoding(request, len(cached.body))
+        etag = cached.etag
+        if encoding is not None:
+            etag = f'{etag[:-1]}-{encoding}"'
+        cache_control = self.cache_control
+        if cache_control is None:
+            cache_control = f"max-age={int(self.response_cache_ttl)}"
+            if self.response_cache_vary is not None:
+                # Responses for one user must not be shared by proxies
+                cache_control = f"private, {cache_control}"
+        headers = {"ETag": etag, "Cache-Control": cache_control}
+        if self.compress_responses:
+            headers["Vary"] = "Accept-Encoding"
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return HTTPResponse(status=304, headers=headers)
+        body = cached.body
+        if encoding is not None:
+            if cached.encoded and encoding in cached.encoded:
+                body = cached.encoded[encoding]
+            else:
+                body = await self.compress(body, encoding)
+                if cached.encoded is not None:
+                    cached.encoded[encoding] = body
+            headers["Content-Encoding"] = encoding
+        return raw(body, headers=headers, content_type="application/json")
+
+    def get_response_encoding(self, request, size=None):
+        """Return the content coding for a response of the given size, if any.
+
+        Responses are only compressed with `compress_responses` enabled, if they
+        are at least `compression_min_size` bytes large (streamed responses of
+        unknown size always are) and if the client accepts a content coding.
+        """
+        if not self.compress_responses or (
+            size is not None and size < self.compression_min_size
+        ):
+            return None
+        return choose_encoding(request.headers.get("Accept-Encoding"), compressors)
+
+    async def compress(self, body, encoding, level=None, offload=False):
+        """Compress the body, in the executor if it is large or `offload` is set.
+
+        The level defaults to `compression_level`.
+        """
+        if level is None:
+            level = self.compression_level
+        if not offload and len(body) < self.compression_executor_min_size:
+            return compress(body, encoding, level)
+        return await get_event_loop().run_in_executor(
+            self.executor, compress, body, encoding, level
+        )
+
+    async def json_response(self, request, body, status=200):
+        """Return a JSON response, compressed if the client accepts it."""
+        headers = {}
+        if self.compress_responses:
+            headers["Vary"] = "Accept-Encoding"
+        encoding = self.get_response_encoding(request, len(body))
+        if encoding is not None:
+            body = await self.compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+        return raw(
+            body, status=status, headers=headers, content_type="application/json"
+        )
+
+    def should_stream_response(self, show_graphiql, pretty):
+        """Whether the response is streamed instead of encoded in one piece.
+
+        Pretty printed responses and custom encoders are never streamed.
+        """
+        return (
+            self.stream_response
+            and not show_graphiql
+            and not pretty
+            and self.encode is json_encode
+        )
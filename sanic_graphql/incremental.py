@@ -0,0 +1,219 @@
+"""Incremental delivery of query results with the `@defer` directive.
+
+graphql-core 3.1 has no incremental execution, so deferred fragments are
+delivered by splitting the operation: fragments on the root query type marked
+with `@defer` are removed from the initial operation and executed as operations
+of their own, concurrently with it. Their results are sent as further parts of
+a `multipart/mixed` response as soon as they are ready.
+
+`@defer` on nested fragments and `@stream` are accepted, but their data is
+delivered with the initial payload, which the specification allows.
+"""
+from asyncio import as_completed, ensure_future
+from copy import copy
+from inspect import isawaitable
+from typing import (Any, AsyncIterator, Callable, Dict, Hashable, List,
+                    Optional, Tuple)
+
+from sanic.response import StreamingHTTPResponse, stream
+
+from graphql.error import GraphQLError
+from graphql.execution import ExecutionResult
+from graphql.execution.values import get_directive_values, get_variable_values
+from graphql.language import (DirectiveLocation, DocumentNode,
+                              FragmentDefinitionNode, OperationType,
+                              SelectionNode, SelectionSetNode)
+from graphql.pyutils import AwaitableOrValue
+from graphql.type import (GraphQLArgument, GraphQLBoolean, GraphQLDirective,
+                          GraphQLInt, GraphQLNonNull, GraphQLSchema,
+                          GraphQLString)
+from graphql.utilities import get_operation_ast
+
+from .runtime import format_execution_result
+
+__all__ = [
+    "GraphQLDeferDirective",
+    "GraphQLStreamDirective",
+    "add_incremental_directives",
+    "split_deferred_fragments",
+    "execute_incrementally",
+    "multipart_response",
+]
+
+GraphQLDeferDirective = GraphQLDirective(
+    name="defer",
+    locations=[DirectiveLocation.FRAGMENT_SPREAD, DirectiveLocation.INLINE_FRAGMENT],
+    args={
+        "if": GraphQLArgument(GraphQLNonNull(GraphQLBoolean), default_value=True),
+        "label": GraphQLArgument(GraphQLString),
+    },
+    description="Directs the executor to defer this fragment.",
+)
+
+GraphQLStreamDirective = GraphQLDirective(
+    name="stream",
+    locations=[DirectiveLocation.FIELD],
+    args={
+        "if": GraphQLArgument(GraphQLNonNull(GraphQLBoolean), default_value=True),
+        "label": GraphQLArgument(GraphQLString),
+        "initialCount": GraphQLArgument(GraphQLInt, default_value=0),
+    },
+    description="Directs the executor to stream the items of this list field.",
+)
+
+DeferredDocument = Tuple[Optional[str], DocumentNode]
+
+
+def add_incremental_directives(schema: GraphQLSchema) -> GraphQLSchema:
+    """Return a copy of the schema that knows the `@defer` and `@stream` directives.
+
+    The schema is returned unchanged if it defines the directives already.
+    """
+    names = {directive.name for directive in schema.directives}
+    missing = [
+        directive
+        for directive in (GraphQLDeferDirective, GraphQLStreamDirective)
+        if directive.name not in names
+    ]
+    if not missing:
+        return schema
+    kwargs = schema.to_kwargs()
+    kwargs["directives"] = [*schema.directives, *missing]
+    return GraphQLSchema(**kwargs)
+
+
+def split_deferred_fragments(
+    schema: GraphQLSchema,
+    document: DocumentNode,
+    operation_name: Optional[str] = None,
+    variables: Optional[Dict[str, Any]] = None,
+    cache: Optional[Dict[Hashable, Any]] = None,
+) -> Tuple[DocumentNode, List[DeferredDocument]]:
+    """Split the deferred root fragments of a query off into documents of their own.
+
+    Returns the document of the initial operation and the label and document
+    of every deferred fragment. The list is empty if nothing can be deferred.
+    With a `cache` for the document, the same split returns the same documents,
+    so that they can get execution plans. Nothing is deferred if the variables
+    are invalid, so that the errors are reported by the execution.
+    """
+    operation = get_operation_ast(document, operation_name)
+    if operation is None or operation.operation != OperationType.QUERY:
+        return document, []
+    # Apply the defaults of the variables, which `@defer(if:)` may refer to
+    coerced_variables = get_variable_values(
+        schema, operation.variable_definitions or [], variables or {}
+    )
+    if isinstance(coerced_variables, list):
+        return document, []
+
+    fragments = [
+        definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    ]
+
+    def with_selections(selections: List[SelectionNode]) -> DocumentNode:
+        new_operation = copy(operation)
+        new_operation.selection_set = SelectionSetNode(selections=selections)
+        return DocumentNode(definitions=[new_operation, *fragments])
+
+    labels: List[Tuple[int, Optional[str]]] = []
+    for index, selection in enumerate(operation.selection_set.selections):
+        defer = (
+            get_directive_values(GraphQLDeferDirective, selection, coerced_variables)
+            if selection.kind in ("fragment_spread", "inline_fragment")
+            else None
+        )
+        if defer and defer["if"]:
+            labels.append((index, defer.get("label")))
+    if not labels:
+        return document, []
+
+    key = (operation_name, tuple(labels))
+    if cache is not None and key in cache:
+        return cache[key]
+
+    initial: List[SelectionNode] = list(operation.selection_set.selections)
+    deferred: List[DeferredDocument] = []
+    for index, label in reversed(labels):
+        selection = copy(initial.pop(index))
+        selection.directives = [
+            directive
+            for directive in selection.directives
+            if directive.name.value != GraphQLDeferDirective.name
+        ]
+        deferred.insert(0, (label, with_selections([selection])))
+
+    split = with_selections(initial), deferred
+    if cache is not None:
+        cache[key] = split
+    return split
+
+
+async def _await_result(
+    result: Optional[AwaitableOrValue[ExecutionResult]],
+) -> Optional[ExecutionResult]:
+    if not isawaitable(result):
+        return result  # type: ignore
+    try:
+        return await result  # type: ignore
+    except Exception as error:
+        return ExecutionResult(
+            data=None, errors=[GraphQLError(str(error), original_error=error)]
+        )
+
+
+async def execute_incrementally(
+    initial: Optional[AwaitableOrValue[ExecutionResult]],
+    deferred: List[Tuple[Optional[str], AwaitableOrValue[ExecutionResult]]],
+    format_error: Callable[[GraphQLError], Dict],
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the payloads of an incrementally delivered response.
+
+    The deferred operations run concurrently with the initial one. The initial
+    payload is always yielded first, the deferred ones in order of completion.
+    """
+
+    async def execute_deferred(label, result):
+        return label, await _await_result(result)
+
+    pending = [ensure_future(execute_deferred(*entry)) for entry in deferred]
+    try:
+        payload, _status_code = format_execution_result(
+            await _await_result(initial), format_error
+        )
+        payload = dict(payload or (), hasNext=bool(pending))
+        yield payload
+
+        remaining = len(pending)
+        for next_result in as_completed(pending):
+            label, result = await next_result
+            remaining -= 1
+            incremental: Dict[str, Any] = {"data": result.data, "path": []}
+            if label is not None:
+                incremental["label"] = label
+            if result.errors:
+                incremental["errors"] = [format_error(e) for e in result.errors]
+            yield {"incremental": [incremental], "hasNext": remaining > 0}
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def multipart_response(
+    payloads: AsyncIterator[Dict[str, Any]], dumps: Callable[[Any], bytes]
+) -> StreamingHTTPResponse:
+    """Write the payloads as the parts of a streaming `multipart/mixed` response."""
+
+    async def write_parts(response):
+        await response.write(b"\r\n---")
+        async for payload in payloads:
+            await response.write(
+                b"\r\nContent-Type: application/json; charset=utf-8\r\n\r\n"
+                + dumps(payload)
+                + b"\r\n---"
+            )
+        await response.write(b"--\r\n")
+
+    return stream(write_parts, content_type='multipart/mixed; boundary="-"')
@@ -0,0 +1,109 @@
+"""Caching of the encoded results of introspection queries.
+
+Introspection queries, like the large one sent by GraphiQL and code
+generators, only depend on the schema. Their encoded results are cached per
+schema, keyed on a hash of the query text, so that repeated introspection
+queries are answered without parsing, validating or executing them.
+"""
+from hashlib import sha256
+from typing import Any, Hashable, Optional
+
+from graphql_server import GraphQLParams
+
+from graphql.language import (DocumentNode, FieldNode, FragmentSpreadNode,
+                              InlineFragmentNode, OperationDefinitionNode,
+                              OperationType, SelectionSetNode)
+from graphql.type import GraphQLSchema
+
+from .cache import LRUCache
+
+__all__ = ["IntrospectionCache", "is_introspection_query", "may_be_introspection"]
+
+_introspection_fields = frozenset(("__schema", "__type", "__typename"))
+
+
+class IntrospectionCache(LRUCache):
+    """LRU cache of the encoded results of introspection queries.
+
+    Results are keyed on the identity of their schema, which they keep a
+    reference to, so that a view getting a new schema object does not get
+    results for the old one.
+    """
+
+    def get_result(
+        self, schema: GraphQLSchema, params: GraphQLParams, pretty: Any
+    ) -> Optional[bytes]:
+        entry = self.get(get_introspection_key(schema, params, pretty))
+        if entry is None or entry[0] is not schema:
+            return None
+        return entry[1]
+
+    def set_result(
+        self, schema: GraphQLSchema, params: GraphQLParams, pretty: Any, body: bytes
+    ) -> None:
+        self.set(get_introspection_key(schema, params, pretty), (schema, body))
+
+
+def get_introspection_key(
+    schema: GraphQLSchema, params: GraphQLParams, pretty: Any
+) -> Hashable:
+    return (
+        id(schema),
+        sha256(params.query.encode("utf8")).digest(),
+        params.operation_name,
+        repr(sorted(params.variables.items())) if params.variables else None,
+        bool(pretty),
+    )
+
+
+def may_be_introspection(query: Optional[str]) -> bool:
+    """Whether the query text could be an introspection query at all."""
+    return bool(query) and ("__schema" in query or "__type(" in query)
+
+
+def is_introspection_query(
+    document: DocumentNode, operation_name: Optional[str] = None
+) -> bool:
+    """Whether the operation only selects introspection fields at its root.
+
+    Such operations only depend on the schema. Operations without any
+    `__schema` or `__type` field are not considered introspection queries.
+    """
+    fragments = {}
+    operations = []
+    for definition in document.definitions:
+        if isinstance(definition, OperationDefinitionNode):
+            if operation_name is None or (
+                definition.name and definition.name.value == operation_name
+            ):
+                operations.append(definition)
+        else:
+            fragments[definition.name.value] = definition  # type: ignore
+    if len(operations) != 1 or operations[0].operation != OperationType.QUERY:
+        return False
+
+    root_fields = set()
+
+    def collect(selection_set: SelectionSetNode, visited: set) -> bool:
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                if selection.name.value not in _introspection_fields:
+                    return False
+                root_fields.add(selection.name.value)
+            elif isinstance(selection, InlineFragmentNode):
+                if not collect(selection.selection_set, visited):
+                    return False
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                if name in visited:
+                    continue
+                fragment = fragments.get(name)
+                if fragment is None or not collect(
+                    fragment.selection_set, visited | {name}
+                ):
+                    return False
+        return True
+
+    return collect(operations[0].selection_set, set()) and bool(
+        root_fields - {"__typename"}
+    )
@@ -0,0 +1,92 @@
+"""JSON codecs used to decode request bodies and encode responses.
+
+Codecs work on bytes, so that request bodies can be decoded without building
+an intermediate string and responses can be written to Sanic as they are.
+The fastest available codec is used by default: orjson or ujson if installed,
+falling back to the json module of the standard library.
+"""
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Union
+
+__all__ = [
+    "JSONCodec",
+    "StdlibJSONCodec",
+    "UJSONCodec",
+    "OrjsonCodec",
+    "get_default_json_codec",
+]
+
+
+class JSONCodec(ABC):
+    """Interface for JSON codecs."""
+
+    @abstractmethod
+    def loads(self, data: Union[bytes, str]) -> Any:
+        ...
+
+    @abstractmethod
+    def dumps(self, data: Any, pretty: bool = False) -> bytes:
+        ...
+
+
+class StdlibJSONCodec(JSONCodec):
+    """Codec using the json module of the standard library.
+
+    `json.dumps` creates a new encoder on every call with non-default options,
+    so the encoders are created once here instead.
+    """
+
+    def __init__(self):
+        self.encode = json.JSONEncoder(separators=(",", ":")).encode
+        self.encode_pretty = json.JSONEncoder(indent=2, separators=(",", ": ")).encode
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, data: Any, pretty: bool = False) -> bytes:
+        if not pretty:
+            return self.encode(data).encode("utf8")
+        return self.encode_pretty(data).encode("utf8")
+
+
+class UJSONCodec(JSONCodec):
+    """Codec using ujson."""
+
+    def __init__(self):
+        import ujson
+
+        self.ujson = ujson
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self.ujson.loads(data)
+
+    def dumps(self, data: Any, pretty: bool = False) -> bytes:
+        return self.ujson.dumps(
+            data, indent=2 if pretty else 0, escape_forward_slashes=False
+        ).encode("utf8")
+
+
+class OrjsonCodec(JSONCodec):
+    """Codec using orjson."""
+
+    def __init__(self):
+        import orjson
+
+        self.orjson = orjson
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self.orjson.loads(data)
+
+    def dumps(self, data: Any, pretty: bool = False) -> bytes:
+        return self.orjson.dumps(data, option=self.orjson.OPT_INDENT_2 if pretty else 0)
+
+
+def get_default_json_codec() -> JSONCodec:
+    """Return the fastest JSON codec that can be used."""
+    for codec_class in (OrjsonCodec, UJSONCodec):
+        try:
+            return codec_class()
+        except ImportError:
+            pass
+    return StdlibJSONCodec()
@@ -0,0 +1,198 @@
+"""Limits on the size of GraphQL requests.
+
+The body of a request is checked against the limit while it is received if
+the view is added to a route with `stream=True`, so oversized requests are
+rejected before they are read into memory. Streamed multipart bodies are
+spooled to a temporary file and parsed from there in an executor.
+"""
+import cgi
+from asyncio import get_event_loop
+from collections.abc import Mapping
+from concurrent.futures import Executor
+from tempfile import SpooledTemporaryFile
+from typing import (IO, Any, AsyncIterator, Callable, Dict, List, Optional,
+                    Union)
+
+from graphql_server import HttpQueryError, json_encode
+
+from .uploads import Upload
+
+__all__ = [
+    "RequestTooLarge",
+    "check_body_size",
+    "check_content_length",
+    "read_streamed_body",
+    "spool_streamed_body",
+    "parse_multipart_form",
+    "check_request_limits",
+]
+
+
+class RequestTooLarge(HttpQueryError):
+    """Error for requests exceeding one of the limits of the view."""
+
+    def __init__(self, message: str):
+        super().__init__(413, message)
+
+
+def check_body_size(size: int, max_size: Optional[int]) -> None:
+    """Reject bodies larger than the limit."""
+    if max_size is not None and size > max_size:
+        raise RequestTooLarge(f"Request body is larger than {max_size} bytes.")
+
+
+def check_content_length(request, max_size: Optional[int]) -> None:
+    """Reject requests announcing a body larger than the limit."""
+    if max_size is None:
+        return
+    try:
+        content_length = int(request.headers.get("content-length", 0))
+    except ValueError:
+        raise HttpQueryError(400, "Invalid Content-Length header.")
+    check_body_size(content_length, max_size)
+
+
+async def _iter_chunks(request, max_size: Optional[int]) -> AsyncIterator[bytes]:
+    size = 0
+    while True:
+        chunk = await request.stream.read()
+        if chunk is None:
+            return
+        size += len(chunk)
+        check_body_size(size, max_size)
+        yield chunk
+
+
+async def read_streamed_body(request, max_size: Optional[int] = None) -> bytes:
+    """Read the body of a streamed request, checking its size on the way."""
+    chunks: List[bytes] = [chunk async for chunk in _iter_chunks(request, max_size)]
+    return b"".join(chunks)
+
+
+async def spool_streamed_body(
+    request,
+    max_size: Optional[int] = None,
+    spool_size: int = 1024 * 1024,
+    executor: Optional[Executor] = None,
+) -> IO[bytes]:
+    """Write the body of a streamed request to a spooled temporary file.
+
+    The file is kept in memory up to `spool_size` bytes and rolled over to
+    disk beyond that, in writes of `spool_size` bytes run in the `executor`.
+    It is returned rewound to its start.
+    """
+    loop = get_event_loop()
+    file = SpooledTemporaryFile(max_size=spool_size)
+    buffer = bytearray()
+    try:
+        async for chunk in _iter_chunks(request, max_size):
+            buffer += chunk
+            if len(buffer) >= spool_size:
+                await loop.run_in_executor(executor, file.write, bytes(buffer))
+                buffer.clear()
+        if file.tell() + len(buffer) <= spool_size:
+            file.write(buffer)
+        elif buffer:
+            await loop.run_in_executor(executor, file.write, bytes(buffer))
+    except BaseException:
+        file.close()
+        raise
+    file.seek(0)
+    return file  # type: ignore
+
+
+def parse_multipart_form(
+    file: IO[bytes], content_type: str, max_fields: Optional[int] = None
+) -> Dict[str, Any]:
+    """Parse a multipart/form-data body from a file.
+
+    Returns the first value of every field, as a string for regular fields
+    and as a `cgi.FieldStorage` for files, whose contents are kept in
+    temporary files. Bodies with more than `max_fields` fields are rejected.
+    This blocks while the body is read, so run it in an executor.
+    """
+    file.seek(0, 2)
+    content_length = file.tell()
+    file.seek(0)
+    try:
+        storage = cgi.FieldStorage(
+            fp=file,  # type: ignore
+            headers={
+                "content-type": content_type,
+                "content-length": str(content_length),
+            },
+            environ={"REQUEST_METHOD": "POST"},
+            keep_blank_values=True,
+            max_num_fields=max_fields,
+        )
+    except ValueError as error:
+        if str(error) != "Max number of fields exceeded":
+            raise
+        raise RequestTooLarge(f"Form contains more than {max_fields} fields.")
+    form: Dict[str, Any] = {}
+    for item in storage.list or ():
+        if item.name not in form:
+            form[item.name] = item if item.filename is not None else item.value
+    return form
+
+
+def check_request_limits(
+    data: Union[Mapping, List, Any],
+    query_data: Optional[Mapping] = None,
+    max_batch_size: Optional[int] = None,
+    max_query_length: Optional[int] = None,
+    max_variables_size: Optional[int] = None,
+    dumps: Callable[[Any], Union[str, bytes]] = json_encode,
+) -> None:
+    """Reject requests with too many operations, too long queries or variables.
+
+    The size of variables given as strings is their length, the size of
+    decoded variables is the length of their encoding with `dumps`.
+    """
+    if isinstance(data, list):
+        if max_batch_size is not None and len(data) > max_batch_size:
+            raise RequestTooLarge(
+                f"Batch request contains more than {max_batch_size} operations."
+            )
+        entries = data
+    else:
+        # Operations that are not batched can be passed in the query string
+        entries = [data, query_data or {}]
+
+    for entry in entries:
+        if not isinstance(entry, Mapping):
+            continue
+        query = entry.get("query")
+        if (
+            max_query_length is not None
+            and isinstance(query, str)
+            and len(query) > max_query_length
+        ):
+            raise RequestTooLarge(
+                f"Query is longer than {max_query_length} characters."
+            )
+        variables = entry.get("variables")
+        if max_variables_size is not None and variables is not None:
+            if isinstance(variables, (str, bytes)):
+                size = len(variables)
+            else:
+                try:
+                    size = len(dumps(variables))
+                except TypeError:
+                    # Uploaded files are only limited by the body size
+                    size = len(dumps(_without_uploads(variables)))
+            if size > max_variables_size:
+                raise RequestTooLarge(
+                    f"Variables are larger than {max_variables_size} bytes."
+                )
+
+
+def _without_uploads(value: Any) -> Any:
+    """Replace the uploaded files in the variables with null."""
+    if isinstance(value, Upload):
+        return None
+    if isinstance(value, Mapping):
+        return {key: _without_uploads(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_without_uploads(item) for item in value]
+    return value
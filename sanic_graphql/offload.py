@@ -0,0 +1,99 @@
+"""Running synchronous operations off the event loop.
+
+Operations of views with `enable_async=False` are parsed, validated and
+executed synchronously, which blocks the event loop and with it every other
+request of the worker. An `ExecutorQueue` runs them in an executor instead,
+limiting the number of operations waiting for or running in the executor.
+
+Threads cannot be interrupted, so operations that are cancelled while they
+are running (e.g. because they timed out) are stopped by a middleware that
+fails every field resolved after the cancellation.
+"""
+from asyncio import CancelledError, gather, wrap_future
+from concurrent.futures import Executor, ProcessPoolExecutor
+from threading import Event, Lock
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from graphql_server import HttpQueryError
+
+__all__ = ["ExecutorQueue", "CancellationMiddleware", "OperationCancelled"]
+
+
+class OperationCancelled(Exception):
+    """Error of the fields resolved after the operation has been cancelled."""
+
+
+class CancellationMiddleware:
+    """Middleware stopping an operation running in an executor once cancelled."""
+
+    def __init__(self):
+        self.cancelled = Event()
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+    def resolve(self, next_, root, info, **args):
+        if self.cancelled.is_set():
+            raise OperationCancelled("Operation was cancelled.")
+        return next_(root, info, **args)
+
+
+class ExecutorQueue:
+    """Run operations in an executor, with a bound on the pending operations.
+
+    Operations submitted while `max_pending` operations are waiting for or
+    running in the executor are rejected with a `503` error.
+    """
+
+    def __init__(self, executor: Executor, max_pending: Optional[int] = None):
+        if isinstance(executor, ProcessPoolExecutor):
+            raise TypeError(
+                "Operations cannot be run in a process pool, as the schema,"
+                " the context and the results are not picklable."
+            )
+        self.executor = executor
+        self.max_pending = max_pending
+        self.pending = 0
+        self._lock = Lock()
+
+    def _reserve(self, count: int) -> None:
+        with self._lock:
+            if self.max_pending is not None and self.pending + count > self.max_pending:
+                raise HttpQueryError(
+                    503,
+                    "Too many operations waiting for execution.",
+                    headers={"Retry-After": "1"},
+                )
+            self.pending += count
+
+    def _release(self, _future: Any = None) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    async def run(
+        self, operations: Sequence[Tuple[Callable[[], Any], CancellationMiddleware]]
+    ) -> List[Any]:
+        """Run the functions concurrently in the executor and return their results.
+
+        All functions are rejected if they do not fit into the queue. Cancelling
+        the returned coroutine cancels the functions that have not started yet
+        and their `CancellationMiddleware` otherwise.
+        """
+        self._reserve(len(operations))
+        futures = []
+        for index, (fn, _cancellation) in enumerate(operations):
+            try:
+                future = self.executor.submit(fn)
+            except BaseException:
+                for _index in range(index, len(operations)):
+                    self._release()
+                raise
+            # The slot is released when the function has actually finished
+            future.add_done_callback(self._release)
+            futures.append(wrap_future(future))
+        try:
+            return list(await gather(*futures))
+        except CancelledError:
+            for _fn, cancellation in operations:
+                cancellation.cancel()
+            raise
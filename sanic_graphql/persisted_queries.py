@@ -0,0 +1,120 @@
+"""Support for Apollo automatic persisted queries (APQ).
+
+Clients send the SHA-256 hash of a query in the `persistedQuery` extension
+instead of the whole query string. Unknown hashes are answered with a
+`PersistedQueryNotFound` error, after which the client retries with both the
+hash and the query, so that the query can be registered in the store.
+"""
+import json
+from abc import ABC, abstractmethod
+from hashlib import sha256
+from typing import Dict, Mapping, Optional
+
+from graphql_server import HttpQueryError
+
+from .cache import LRUCache
+
+__all__ = [
+    "PersistedQueryStore",
+    "MemoryPersistedQueryStore",
+    "PersistedQueryNotFound",
+    "load_persisted_query",
+]
+
+
+class PersistedQueryNotFound(HttpQueryError):
+    """Error for hashes that are not in the persisted query store.
+
+    Apollo clients disable persisted queries on 400 responses, so this
+    error is sent with a status code of 200.
+    """
+
+    extensions = {"code": "PERSISTED_QUERY_NOT_FOUND"}
+
+    def __init__(self):
+        super().__init__(200, "PersistedQueryNotFound")
+
+
+class PersistedQueryStore(ABC):
+    """Interface for stores of persisted queries keyed by their SHA-256 hash."""
+
+    @abstractmethod
+    async def get(self, sha256_hash: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def set(self, sha256_hash: str, query: str) -> None:
+        ...
+
+
+class MemoryPersistedQueryStore(PersistedQueryStore):
+    """Persisted query store keeping the most recently used queries in memory."""
+
+    def __init__(self, maxsize: int = 1000):
+        self.cache = LRUCache(maxsize)
+
+    async def get(self, sha256_hash: str) -> Optional[str]:
+        return self.cache.get(sha256_hash)
+
+    async def set(self, sha256_hash: str, query: str) -> None:
+        self.cache.set(sha256_hash, query)
+
+
+def get_persisted_query_hash(
+    data: Mapping, query_data: Optional[Mapping] = None
+) -> Optional[str]:
+    """Return the hash of the persisted query extension of the given params."""
+    extensions = data.get("extensions") or (query_data or {}).get("extensions")
+    if not extensions:
+        return None
+
+    if isinstance(extensions, str):
+        try:
+            extensions = json.loads(extensions)
+        except Exception:
+            raise HttpQueryError(400, "Extensions are invalid JSON.")
+    if not isinstance(extensions, dict):
+        raise HttpQueryError(400, "Extensions should be a dict.")
+
+    persisted_query = extensions.get("persistedQuery")
+    if not persisted_query:
+        return None
+    if not isinstance(persisted_query, dict) or persisted_query.get("version") != 1:
+        raise HttpQueryError(400, "Unsupported persisted query version.")
+
+    sha256_hash = persisted_query.get("sha256Hash")
+    if not sha256_hash or not isinstance(sha256_hash, str):
+        raise HttpQueryError(400, "Persisted query is missing its sha256Hash.")
+    return sha256_hash.lower()
+
+
+async def load_persisted_query(
+    store: PersistedQueryStore, data: Mapping, query_data: Optional[Mapping] = None
+) -> Mapping:
+    """Resolve the persisted query of the given params.
+
+    Returns params with the query that belongs to the hash in the extensions,
+    registering the query if it has been sent along with the hash. Params
+    without a persisted query extension are returned unchanged.
+    """
+    sha256_hash = get_persisted_query_hash(data, query_data)
+    if not sha256_hash:
+        return data
+
+    query = data.get("query") or (query_data or {}).get("query")
+    if query:
+        if sha256(query.encode("utf8")).hexdigest() != sha256_hash:
+            raise HttpQueryError(400, "Provided sha256Hash does not match query.")
+        await store.set(sha256_hash, query)
+        return data
+
+    query = await store.get(sha256_hash)
+    if query is None:
+        raise PersistedQueryNotFound()
+
+    params: Dict = {
+        "query": query,
+        "variables": data.get("variables"),
+        "operationName": data.get("operationName"),
+    }
+    return params
@@ -0,0 +1,133 @@
+"""Rate limiting of clients with token buckets.
+
+Every client (as identified by the view's `rate_limit_key` function) has a
+bucket that is refilled with `rate` tokens per second up to its capacity.
+Every operation takes one token before it is parsed, and with a cost function
+the rest of its cost once it has been parsed. Requests that find too few
+tokens in the bucket are rejected with a `429` error and a `Retry-After`
+header.
+"""
+from abc import ABC, abstractmethod
+from math import ceil
+from time import monotonic
+from typing import Any, Callable, Collection, Dict, Optional
+
+from graphql_server import HttpQueryError
+
+from graphql.language import DocumentNode, FragmentDefinitionNode
+from graphql.type import GraphQLSchema
+from graphql.utilities import get_operation_ast
+
+from .cache import LRUCache
+from .validation import measure_operation
+
+__all__ = [
+    "RateLimitExceeded",
+    "RateLimitStore",
+    "MemoryRateLimitStore",
+    "operation_cost",
+]
+
+CostFunction = Callable[
+    [GraphQLSchema, DocumentNode, Optional[str], Optional[Dict[str, Any]]], int
+]
+
+
+class RateLimitExceeded(HttpQueryError):
+    """Error for requests of clients that ran out of tokens."""
+
+    extensions = {"code": "RATE_LIMITED"}
+
+    def __init__(self, retry_after: float):
+        seconds = max(1, ceil(retry_after))
+        super().__init__(
+            429,
+            f"Rate limit exceeded, retry in {seconds} seconds.",
+            headers={"Retry-After": str(seconds)},
+        )
+
+
+class RateLimitStore(ABC):
+    """Interface for stores of the token buckets of clients."""
+
+    @abstractmethod
+    async def consume(
+        self, key: str, tokens: float, rate: float, capacity: float
+    ) -> float:
+        """Take tokens from the bucket of the key, if it has enough of them.
+
+        Buckets are refilled with `rate` tokens per second up to `capacity`,
+        and start full. Returns 0 if the tokens were taken, and otherwise the
+        number of seconds until the bucket has enough tokens.
+        """
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Store keeping the buckets of the most recently seen clients in memory.
+
+    Clients whose buckets have been evicted start with a full bucket again.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.cache = LRUCache(maxsize)
+
+    async def consume(
+        self, key: str, tokens: float, rate: float, capacity: float
+    ) -> float:
+        now = monotonic()
+        bucket = self.cache.get(key)
+        if bucket is None:
+            available = capacity
+        else:
+            level, updated = bucket
+            available = min(capacity, level + (now - updated) * rate)
+        # Operations costing more than the capacity need a full bucket
+        tokens = min(tokens, capacity)
+        if available < tokens:
+            self.cache.set(key, (available, now))
+            return (tokens - available) / rate
+        self.cache.set(key, (available - tokens, now))
+        return 0.0
+
+
+def operation_cost(
+    field_costs: Optional[Dict[str, int]] = None,
+    default_field_cost: int = 1,
+    list_size_arguments: Collection[str] = ("first", "last", "limit"),
+    default_list_size: int = 1,
+    max_list_size: Optional[int] = None,
+) -> CostFunction:
+    """Create a cost function for the `rate_limit_cost` option of the view.
+
+    The cost is computed by `measure_operation`, with the given cost hints and
+    the variables of the operation. The time this takes only grows with the
+    size of the document, which may not have been validated yet.
+    """
+
+    def get_cost(
+        schema: GraphQLSchema,
+        document: DocumentNode,
+        operation_name: Optional[str],
+        variables: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        operation = get_operation_ast(document, operation_name)
+        if operation is None:
+            return 1
+        fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        }
+        return measure_operation(
+            schema,
+            operation,
+            fragments,
+            field_costs,
+            default_field_cost,
+            list_size_arguments,
+            default_list_size,
+            max_list_size,
+            variables,
+        ).cost
+
+    return get_cost
@@ -0,0 +1,93 @@
+"""Caching of encoded responses to GET queries.
+
+Responses are keyed on a hash of the query, variables, operation name and a
+user supplied vary key, and are served with an `ETag` header, so that clients
+sending `If-None-Match` get a `304 Not Modified` without a body.
+"""
+import json
+from abc import ABC, abstractmethod
+from hashlib import sha256
+from time import monotonic
+from typing import Any, Dict, NamedTuple, Optional
+
+from graphql_server import GraphQLParams
+
+from .cache import LRUCache
+
+__all__ = [
+    "CachedResponse",
+    "ResponseCache",
+    "MemoryResponseCache",
+    "get_response_cache_key",
+    "get_etag",
+    "etag_matches",
+]
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    # Compressed bodies by content coding, filled in as they are requested
+    encoded: Optional[Dict[str, bytes]] = None
+
+
+class ResponseCache(ABC):
+    """Interface for caches of encoded responses."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, response: CachedResponse, ttl: float) -> None:
+        ...
+
+
+class MemoryResponseCache(ResponseCache):
+    """Response cache keeping the most recently used responses in memory."""
+
+    def __init__(self, maxsize: int = 1000):
+        self.cache = LRUCache(maxsize)
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        expires, response = entry
+        if expires <= monotonic():
+            self.cache.pop(key)
+            return None
+        return response
+
+    async def set(self, key: str, response: CachedResponse, ttl: float) -> None:
+        self.cache.set(key, (monotonic() + ttl, response))
+
+
+def get_response_cache_key(params: GraphQLParams, pretty: bool, vary: Any) -> str:
+    """Return the cache key for the response to the given params."""
+    key = json.dumps(
+        [
+            sha256(params.query.encode("utf8")).hexdigest(),
+            params.variables,
+            params.operation_name,
+            bool(pretty),
+            vary,
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return sha256(key.encode("utf8")).hexdigest()
+
+
+def get_etag(body: bytes) -> str:
+    """Return a strong entity tag for the given response body."""
+    return '"' + sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an `If-None-Match` header matches the given entity tag."""
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in (
+        tag.strip().replace("W/", "", 1) for tag in if_none_match.split(",")
+    )
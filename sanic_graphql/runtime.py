@@ -0,0 +1,261 @@
+import json
+from asyncio import Semaphore, gather
+from collections.abc import Mapping, MutableMapping
+from inspect import isawaitable
+from time import perf_counter
+from typing import Any, Callable, Collection, Dict, List, Optional, Type, Union
+from urllib.parse import parse_qsl
+
+from graphql_server import (FormattedResult, GraphQLParams, HttpQueryError,
+                            ServerResponse, assume_not_awaitable,
+                            format_error_default)
+from graphql_server import \
+    format_execution_result as format_execution_result_default
+from graphql_server import get_graphql_params, json_encode
+
+from graphql.error import GraphQLError
+from graphql.execution import ExecutionResult, execute
+from graphql.language import DocumentNode, OperationType
+from graphql.pyutils import AwaitableOrValue
+from graphql.type import GraphQLSchema, validate_schema
+from graphql.utilities import get_operation_ast
+from graphql.validation import ASTValidationRule
+
+from .cache import DocumentCache, parse_and_validate
+from .execution import ExecutionPlanCache
+from .timeouts import is_timed_out
+from .timing import RequestTimings
+
+__all__ = [
+    "parse_query_string",
+    "get_query_string_params",
+    "get_all_params",
+    "get_response",
+    "gather_execution_results",
+    "format_execution_result",
+    "encode_execution_results",
+]
+
+
+class _NoException(Exception):
+    """Private exception used when we don't want to catch any real exception."""
+
+
+def parse_query_string(query_string: str) -> Dict[str, str]:
+    """Parse a query string into the first value of every parameter.
+
+    Gives the same values as `request.args.get`, without building Sanic's
+    lists of values for every parameter.
+    """
+    query_data: Dict[str, str] = {}
+    for name, value in parse_qsl(query_string, errors="replace"):
+        query_data.setdefault(name, value)
+    return query_data
+
+
+def get_query_string_params(
+    query_data: Mapping, loads: Callable[[str], Any] = json.loads
+) -> GraphQLParams:
+    """Get the GraphQL parameters of a GET request from its query string.
+
+    Variables are only decoded when they are not empty.
+    """
+    variables = query_data.get("variables") or None
+    if variables is not None:
+        try:
+            variables = loads(variables)
+        except Exception:
+            raise HttpQueryError(400, "Variables are invalid JSON.")
+    return GraphQLParams(
+        query_data.get("query") or None,
+        variables,
+        query_data.get("operationName") or None,
+    )
+
+
+def get_all_params(
+    request_method: str,
+    data: Union[Dict, List[Dict]],
+    query_data: Optional[Dict] = None,
+    batch_enabled: bool = False,
+) -> List[GraphQLParams]:
+    """Collect the GraphQL parameters of every operation in an HTTP query.
+
+    This performs the same request checks as `graphql_server.run_http_query`,
+    but leaves the execution of the operations to the caller, so that every
+    operation can be executed with its own options.
+    """
+    if request_method not in ("get", "post"):
+        raise HttpQueryError(
+            405,
+            "GraphQL only supports GET and POST requests.",
+            headers={"Allow": "GET, POST"},
+        )
+    is_batch = isinstance(data, list)
+
+    if not is_batch:
+        if not isinstance(data, (dict, MutableMapping)):
+            raise HttpQueryError(
+                400, f"GraphQL params should be a dict. Received {data!r}."
+            )
+        data = [data]
+    elif not batch_enabled:
+        raise HttpQueryError(400, "Batch GraphQL requests are not enabled.")
+
+    if not data:
+        raise HttpQueryError(400, "Received an empty list in the batch request.")
+
+    # If is a batch request, we don't consume the data from the query
+    extra_data: Dict[str, Any] = {} if is_batch else query_data or {}
+
+    return [get_graphql_params(entry, extra_data) for entry in data]
+
+
+def get_response(
+    schema: GraphQLSchema,
+    params: GraphQLParams,
+    catch_exc: Type[BaseException],
+    allow_only_query: bool = False,
+    run_sync: bool = True,
+    validation_rules: Optional[Collection[Type[ASTValidationRule]]] = None,
+    max_errors: Optional[int] = None,
+    document_cache: Optional[DocumentCache] = None,
+    timings: Optional[RequestTimings] = None,
+    execution_plans: Optional[ExecutionPlanCache] = None,
+    document: Optional[DocumentNode] = None,
+    **kwargs,
+) -> Optional[AwaitableOrValue[ExecutionResult]]:
+    """Get an individual execution result as response, with option to catch errors.
+
+    Parsing and validation results are looked up in the `document_cache` first,
+    if one has been given. Documents from the cache are executed with their
+    plan from `execution_plans`, if given. A `document` that has been derived
+    from the validated query is executed instead of the query. The time spent
+    in parsing, validation and execution is added to the given `timings`.
+    """
+    # noinspection PyBroadException
+    try:
+        if not params.query:
+            raise HttpQueryError(400, "Must provide query string.")
+
+        schema_validation_errors = validate_schema(schema)
+        if schema_validation_errors:
+            return ExecutionResult(data=None, errors=schema_validation_errors)
+
+        errors: List[GraphQLError] = []
+        if document is None:
+            if document_cache is not None:
+                document, errors = document_cache.parse_and_validate(
+                    schema, params.query, validation_rules, max_errors, timings
+                )
+            else:
+                document, errors = parse_and_validate(
+                    schema, params.query, validation_rules, max_errors, timings
+                )
+            if document is None:
+                return ExecutionResult(data=None, errors=errors)
+
+        if allow_only_query:
+            operation_ast = get_operation_ast(document, params.operation_name)
+            if operation_ast:
+                operation = operation_ast.operation.value
+                if operation != OperationType.QUERY.value:
+                    raise HttpQueryError(
+                        405,
+                        f"Can only perform a {operation} operation"
+                        " from a POST request.",
+                        headers={"Allow": "POST"},
+                    )
+
+        if errors:
+            return ExecutionResult(data=None, errors=errors)
+
+        if execution_plans is not None and document_cache is not None:
+            kwargs["execution_context_class"] = execution_plans.get_plan(
+                document
+            ).context_class
+
+        start = perf_counter()
+        execution_result = execute(
+            schema,
+            document,
+            variable_values=params.variables,
+            operation_name=params.operation_name,
+            is_awaitable=assume_not_awaitable if run_sync else None,
+            **kwargs,
+        )
+        if timings is not None:
+            timings.add("execute", perf_counter() - start)
+
+    except catch_exc:
+        return None
+
+    return execution_result
+
+
+async def gather_execution_results(
+    execution_results: List[Optional[AwaitableOrValue[ExecutionResult]]],
+    concurrency_limit: Optional[int] = None,
+) -> List[Optional[ExecutionResult]]:
+    """Await the given execution results concurrently.
+
+    At most `concurrency_limit` operations are awaited at the same time, if set.
+    The results are returned in the original order, and an operation raising an
+    exception does not cancel the others, but gets an error result instead.
+    """
+    semaphore = Semaphore(concurrency_limit) if concurrency_limit else None
+
+    async def await_result(result):
+        if not isawaitable(result):
+            return result
+        try:
+            if semaphore is None:
+                return await result
+            async with semaphore:
+                return await result
+        except Exception as error:
+            return ExecutionResult(
+                data=None, errors=[GraphQLError(str(error), original_error=error)]
+            )
+
+    return list(await gather(*map(await_result, execution_results)))
+
+
+def format_execution_result(
+    execution_result: Optional[ExecutionResult],
+    format_error: Callable[[GraphQLError], Dict] = format_error_default,
+) -> FormattedResult:
+    """Format an execution result into a dictionary and a status code.
+
+    Works like `graphql_server.format_execution_result`, but keeps the
+    extensions of the execution result. Operations that timed out without
+    any data get the status code 504.
+    """
+    response, status_code = format_execution_result_default(
+        execution_result, format_error
+    )
+    if is_timed_out(execution_result):
+        status_code = 504
+    if response is not None and execution_result.extensions:  # type: ignore
+        response["extensions"] = execution_result.extensions  # type: ignore
+    return FormattedResult(response, status_code)
+
+
+def encode_execution_results(
+    execution_results: List[Optional[ExecutionResult]],
+    format_error: Callable[[GraphQLError], Dict] = format_error_default,
+    is_batch: bool = False,
+    encode: Callable[[Dict], Any] = json_encode,
+) -> ServerResponse:
+    """Serialize the ExecutionResults, including their extensions."""
+    results = [
+        format_execution_result(execution_result, format_error)
+        for execution_result in execution_results
+    ]
+    result, status_codes = zip(*results)
+    status_code = max(status_codes)
+
+    if not is_batch:
+        result = result[0]
+
+    return ServerResponse(encode(result), status_code)
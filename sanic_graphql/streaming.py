@@ -0,0 +1,100 @@
+"""Streaming encoding of GraphQL responses.
+
+Instead of encoding a whole response into one string before sending it,
+the JSON is produced piece by piece and written to a Sanic streaming response
+in chunks of bounded size. Only the first levels of the response (the envelope,
+`data` and its top-level fields) are taken apart, values below them (like the
+items of a top-level list) are encoded as a whole.
+"""
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sanic.response import StreamingHTTPResponse, stream
+
+from graphql.error import GraphQLError
+from graphql.execution import ExecutionResult
+
+from .compression import StreamCompressor
+from .runtime import format_execution_result
+
+__all__ = ["iter_encode", "stream_execution_results"]
+
+Dumps = Callable[[Any], bytes]
+
+
+def iter_encode(data: Any, dumps: Dumps, depth: int = 3) -> Iterator[bytes]:
+    """Yield the JSON encoding of the given data in pieces.
+
+    Dicts and lists are taken apart down to the given depth, all other values
+    are encoded with the given `dumps` function.
+    """
+    if depth and data and isinstance(data, dict):
+        separator = b"{"
+        for key, value in data.items():
+            yield separator + dumps(key) + b":"
+            yield from iter_encode(value, dumps, depth - 1)
+            separator = b","
+        yield b"}"
+    elif depth and data and isinstance(data, list):
+        separator = b"["
+        for item in data:
+            yield separator
+            yield from iter_encode(item, dumps, depth - 1)
+            separator = b","
+        yield b"]"
+    else:
+        yield dumps(data)
+
+
+def stream_execution_results(
+    execution_results: List[Optional[ExecutionResult]],
+    format_error: Callable[[GraphQLError], Dict],
+    dumps: Dumps,
+    is_batch: bool = False,
+    chunk_size: int = 65536,
+    compressor: Optional[StreamCompressor] = None,
+) -> StreamingHTTPResponse:
+    """Serialize the ExecutionResults into a streaming response.
+
+    This is the streaming counterpart of `encode_execution_results`.
+    The encoded response is written in chunks of at least `chunk_size` bytes,
+    compressed with the `compressor` if given.
+    """
+    results = [
+        format_execution_result(execution_result, format_error)
+        for execution_result in execution_results
+    ]
+    result, status_codes = zip(*results)
+    status_code = max(status_codes)
+
+    if is_batch:
+        pieces = iter_encode(list(result), dumps, depth=4)
+    else:
+        pieces = iter_encode(result[0], dumps)
+
+    async def write(response, chunk: bytes):
+        if compressor is not None:
+            chunk = compressor.compress(chunk)
+        if chunk:
+            await response.write(chunk)
+
+    async def write_pieces(response):
+        buffer = bytearray()
+        for piece in pieces:
+            buffer += piece
+            if len(buffer) >= chunk_size:
+                await write(response, bytes(buffer))
+                buffer.clear()
+        if buffer:
+            await write(response, bytes(buffer))
+        if compressor is not None:
+            await response.write(compressor.flush())
+
+    headers = None
+    if compressor is not None:
+        headers = {"Content-Encoding": compressor.encoding}
+    return stream(
+        write_pieces,
+        status=status_code,
+        headers=headers,
+        content_type="application/json",
+    )
@@ -0,0 +1,279 @@
+"""GraphQL over WebSocket, using the graphql-transport-ws protocol.
+
+See https://github.com/enisdenjo/graphql-ws/blob/master/PROTOCOL.md for the
+protocol. Every connection can run many operations at once, each in its own
+task. Events of a subscription are only pulled from its source after the
+previous event has been written to the socket, so slow consumers apply
+backpressure to their subscriptions instead of piling up messages in memory.
+"""
+import copy
+import json
+from asyncio import CancelledError, Task, ensure_future, sleep
+from collections.abc import MutableMapping
+from functools import partial
+from inspect import isawaitable
+from typing import Any, Dict, Optional
+
+from websockets.exceptions import ConnectionClosed
+
+from graphql.error import GraphQLError
+from graphql.error import format_error as format_error_default
+from graphql.execution import ExecutionResult, execute
+from graphql.language import OperationType
+from graphql.subscription import subscribe
+from graphql.type import GraphQLSchema
+from graphql.utilities import get_operation_ast
+from graphql.validation import specified_rules
+
+from .cache import parse_and_validate
+from .runtime import format_execution_result
+
+__all__ = ["GRAPHQL_TRANSPORT_WS_PROTOCOL", "GraphQLWSView"]
+
+GRAPHQL_TRANSPORT_WS_PROTOCOL = "graphql-transport-ws"
+
+
+class GraphQLWSView:
+    """Sanic websocket handler serving GraphQL operations and subscriptions.
+
+    Register it with the graphql-transport-ws subprotocol::
+
+        app.add_websocket_route(
+            GraphQLWSView.as_view(schema=schema),
+            "/subscriptions",
+            subprotocols=GraphQLWSView.subprotocols,
+        )
+    """
+
+    schema = None
+    root_value = None
+    context = None
+    document_cache = None
+    validation_rules = None
+    keep_alive_interval = 12.0
+    connection_init_wait_timeout = 3.0
+    max_operations = 100
+    on_connect = None
+
+    subprotocols = [GRAPHQL_TRANSPORT_WS_PROTOCOL]
+
+    format_error = staticmethod(format_error_default)
+
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            if hasattr(self, key):
+                setattr(self, key, value)
+
+        assert isinstance(
+            self.schema, GraphQLSchema
+        ), "A Schema is required to be provided to GraphQLWSView."
+
+        self.websocket = None
+        self.request = None
+        self.connection_params: Optional[Dict] = None
+        self.connection_init_received = False
+        self.connection_acknowledged = False
+        self.operations: Dict[str, Task] = {}
+
+    @classmethod
+    def as_view(cls, **kwargs):
+        """Return the Sanic websocket handler for the given options."""
+
+        async def view(request, ws):
+            return await cls(**kwargs).handle(request, ws)
+
+        view.view_class = cls
+        view.__doc__ = cls.__doc__
+        view.__module__ = cls.__module__
+        view.__name__ = cls.__name__
+        return view
+
+    def get_root_value(self):
+        return self.root_value
+
+    def get_context(self):
+        context = (
+            copy.copy(self.context)
+            if self.context and isinstance(self.context, MutableMapping)
+            else {}
+        )
+        context.setdefault("request", self.request)
+        context.setdefault("connection_params", self.connection_params)
+        return context
+
+    async def handle(self, request, ws):
+        self.request = request
+        self.websocket = ws
+        tasks = [ensure_future(self.close_on_init_timeout())]
+        if self.keep_alive_interval:
+            tasks.append(ensure_future(self.keep_alive()))
+        try:
+            while True:
+                await self.handle_message(await ws.recv())
+        except ConnectionClosed:
+            pass
+        finally:
+            for task in [*tasks, *self.operations.values()]:
+                task.cancel()
+            self.operations.clear()
+
+    async def close_on_init_timeout(self):
+        await sleep(self.connection_init_wait_timeout)
+        if not self.connection_acknowledged:
+            await self.websocket.close(4408, "Connection initialisation timeout")
+
+    async def keep_alive(self):
+        while True:
+            await sleep(self.keep_alive_interval)
+            await self.send({"type": "ping"})
+
+    async def send(self, message: Dict[str, Any]):
+        await self.websocket.send(json.dumps(message, separators=(",", ":")))
+
+    async def handle_message(self, raw_message):
+        try:
+            message = json.loads(raw_message)
+            message_type = message["type"]
+        except (ValueError, TypeError, KeyError):
+            return await self.websocket.close(4400, "Invalid message received")
+
+        if message_type == "connection_init":
+            await self.handle_connection_init(message)
+        elif message_type == "ping":
+            await self.send({"type": "pong"})
+        elif message_type == "pong":
+            pass
+        elif message_type == "subscribe":
+            await self.handle_subscribe(message)
+        elif message_type == "complete":
+            task = self.operations.pop(message.get("id"), None)
+            if task:
+                task.cancel()
+        else:
+            await self.websocket.close(
+                4400, f"Unexpected message type {message_type!r}"
+            )
+
+    async def handle_connection_init(self, message):
+        if self.connection_init_received:
+            return await self.websocket.close(4429, "Too many initialisation requests")
+        self.connection_init_received = True
+
+        payload = message.get("payload")
+        if payload is not None and not isinstance(payload, dict):
+            return await self.websocket.close(4400, "Invalid connection payload")
+        self.connection_params = payload
+
+        if self.on_connect:
+            accepted = self.on_connect(self.request, payload)
+            if isawaitable(accepted):
+                accepted = await accepted
+            if accepted is False:
+                return await self.websocket.close(4403, "Forbidden")
+
+        self.connection_acknowledged = True
+        await self.send({"type": "connection_ack"})
+
+    async def handle_subscribe(self, message):
+        if not self.connection_acknowledged:
+            return await self.websocket.close(4401, "Unauthorized")
+
+        operation_id = message.get("id")
+        payload = message.get("payload")
+        if not isinstance(operation_id, str) or not isinstance(payload, dict):
+            return await self.websocket.close(4400, "Invalid message received")
+        if operation_id in self.operations:
+            return await self.websocket.close(
+                4409, f"Subscriber for {operation_id} already exists"
+            )
+        if self.max_operations and len(self.operations) >= self.max_operations:
+            return await self.send_errors(
+                operation_id, [GraphQLError("Too many operations on this connection.")]
+            )
+
+        task = ensure_future(self.run_operation(operation_id, payload))
+        task.add_done_callback(partial(self.operation_done, operation_id))
+        self.operations[operation_id] = task
+
+    def operation_done(self, operation_id: str, task: Task):
+        if self.operations.get(operation_id) is task:
+            del self.operations[operation_id]
+
+    async def send_errors(self, operation_id, errors):
+        await self.send(
+            {
+                "id": operation_id,
+                "type": "error",
+                "payload": [self.format_error(error) for error in errors],
+            }
+        )
+
+    async def send_result(self, operation_id, result: ExecutionResult):
+        payload, _status_code = format_execution_result(result, self.format_error)
+        await self.send({"id": operation_id, "type": "next", "payload": payload})
+
+    async def run_operation(self, operation_id: str, payload: Dict[str, Any]):
+        try:
+            await self.execute_operation(operation_id, payload)
+        except (CancelledError, ConnectionClosed):
+            pass
+        except Exception as error:
+            # The client may reuse the id as soon as it gets the error. The
+            # id is only registered to this task while it is running.
+            self.operations.pop(operation_id, None)
+            if not isinstance(error, GraphQLError):
+                error = GraphQLError(str(error), original_error=error)
+            try:
+                await self.send_errors(operation_id, [error])
+            except ConnectionClosed:
+                pass
+
+    async def execute_operation(self, operation_id: str, payload: Dict[str, Any]):
+        query = payload.get("query")
+        variables = payload.get("variables")
+        operation_name = payload.get("operationName")
+        if not query or not isinstance(query, str):
+            return await self.send_errors(
+                operation_id, [GraphQLError("Must provide query string.")]
+            )
+
+        if self.document_cache is not None:
+            document, errors = self.document_cache.parse_and_validate(
+                self.schema, query, self.get_validation_rules()
+            )
+        else:
+            document, errors = parse_and_validate(
+                self.schema, query, self.get_validation_rules()
+            )
+        if document is None or errors:
+            return await self.send_errors(operation_id, errors)
+
+        operation = get_operation_ast(document, operation_name)
+        options = dict(
+            root_value=self.get_root_value(),
+            context_value=self.get_context(),
+            variable_values=variables,
+            operation_name=operation_name,
+        )
+
+        if operation and operation.operation == OperationType.SUBSCRIPTION:
+            result = await subscribe(self.schema, document, **options)
+            if isinstance(result, ExecutionResult):
+                return await self.send_errors(operation_id, result.errors or [])
+            try:
+                async for item in result:
+                    await self.send_result(operation_id, item)
+            finally:
+                await result.aclose()
+        else:
+            result = execute(self.schema, document, **options)
+            if isawaitable(result):
+                result = await result
+            await self.send_result(operation_id, result)
+
+        await self.send({"id": operation_id, "type": "complete"})
+
+    def get_validation_rules(self):
+        if not self.validation_rules:
+            return None
+        return [*specified_rules, *self.validation_rules]
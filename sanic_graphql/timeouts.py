@@ -0,0 +1,72 @@
+"""Execution timeouts of GraphQL operations.
+
+A `TimeoutMiddleware` gives every resolver of an operation the time that is
+left until the deadline of the operation. Awaitable results still pending at
+the deadline are cancelled, except for futures, which may be shared with other
+fields (like those of DataLoaders). Resolvers called after the deadline fail
+right away, so fields resolved in time are kept and the operation returns a
+partial result. Synchronous resolvers cannot be interrupted, they only fail
+when called after the deadline.
+"""
+from asyncio import TimeoutError, isfuture, shield, wait_for
+from inspect import isawaitable
+from time import monotonic
+from typing import Optional
+
+from graphql.execution import ExecutionResult
+
+__all__ = ["OperationTimeout", "TimeoutMiddleware", "is_timed_out"]
+
+
+class OperationTimeout(Exception):
+    """Error of the fields that could not be resolved before the deadline."""
+
+    extensions = {"code": "TIMEOUT"}
+
+    def __init__(self, timeout: float):
+        super().__init__(f"Operation timed out after {timeout:g} seconds.")
+        self.timeout = timeout
+
+
+class TimeoutMiddleware:
+    """graphql-core middleware failing the resolvers exceeding a deadline.
+
+    An instance times a single operation, starting when it is created.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.deadline = monotonic() + timeout
+        self.timed_out = False
+
+    def resolve(self, next_, root, info, **args):
+        if monotonic() >= self.deadline:
+            raise self.expire()
+        result = next_(root, info, **args)
+        if isawaitable(result):
+            return self.await_result(result)
+        return result
+
+    async def await_result(self, result):
+        if isfuture(result):
+            result = shield(result)
+        try:
+            return await wait_for(result, self.deadline - monotonic())
+        except TimeoutError:
+            raise self.expire()
+
+    def expire(self) -> OperationTimeout:
+        self.timed_out = True
+        return OperationTimeout(self.timeout)
+
+
+def is_timed_out(execution_result: Optional[ExecutionResult]) -> bool:
+    """Whether an execution result failed entirely because of a timeout."""
+    return (
+        execution_result is not None
+        and execution_result.data is None
+        and any(
+            isinstance(error.original_error, OperationTimeout)
+            for error in execution_result.errors or ()
+        )
+    )
@@ -0,0 +1,39 @@
+from threading import Lock
+from typing import Dict
+
+__all__ = ["RequestTimings"]
+
+
+class RequestTimings:
+    """Wall time spent in the phases of handling a GraphQL request.
+
+    The phases are `body` (parsing the request body), `parse` and `validate`
+    (of the GraphQL documents), `execute`, `encode` (of the JSON response) and
+    `render` (of GraphiQL). Times are in seconds and summed up over all
+    operations of a batch. Phases that did not happen are missing. `timeouts`
+    counts the operations that exceeded their execution timeout. Times may be
+    added from the threads of an executor.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.timeouts = 0
+        self._lock = Lock()
+
+    def add(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @property
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+    def server_timing_header(self) -> str:
+        """Format the timings as value of a `Server-Timing` header."""
+        return ", ".join(
+            f"{phase};dur={seconds * 1000:.3f}"
+            for phase, seconds in self.phases.items()
+        )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.phases!r})"
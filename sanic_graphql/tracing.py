@@ -0,0 +1,99 @@
+"""Resolver tracing in the Apollo tracing format.
+
+See https://github.com/apollographql/apollo-tracing for the format.
+"""
+from datetime import datetime, timezone
+from inspect import isawaitable
+from time import perf_counter, time
+from typing import Any, Dict, List, Optional, Tuple
+
+from graphql.pyutils import Path
+from graphql.type import GraphQLResolveInfo
+
+__all__ = ["TracingMiddleware"]
+
+
+class TracingMiddleware:
+    """graphql-core middleware recording the start and duration of every resolver.
+
+    An instance traces a single operation. Resolver timings are kept as tuples
+    in a list and only converted into the tracing format by `to_dict`.
+    """
+
+    def __init__(self):
+        self.start_time = time()
+        self.start = perf_counter()
+        self.end: Optional[float] = None
+        self.resolvers: List[Tuple[Path, str, str, str, float, float]] = []
+
+    def resolve(self, next_, root, info: GraphQLResolveInfo, **args):
+        start = perf_counter()
+        result = next_(root, info, **args)
+        if isawaitable(result):
+            return self.await_result(result, info, start)
+        self.record(info, start)
+        return result
+
+    async def await_result(self, result, info: GraphQLResolveInfo, start: float):
+        try:
+            return await result
+        finally:
+            self.record(info, start)
+
+    def record(self, info: GraphQLResolveInfo, start: float) -> None:
+        self.resolvers.append(
+            (
+                info.path,
+                info.parent_type.name,
+                info.field_name,
+                str(info.return_type),
+                start,
+                perf_counter(),
+            )
+        )
+
+    def finish(self) -> None:
+        """Mark the end of the traced operation."""
+        self.end = perf_counter()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the trace in the Apollo tracing format."""
+        end = self.end if self.end is not None else perf_counter()
+        return {
+            "version": 1,
+            "startTime": _format_time(self.start_time),
+            "endTime": _format_time(self.start_time + end - self.start),
+            "duration": _nanoseconds(end - self.start),
+            "execution": {
+                "resolvers": [
+                    {
+                        "path": path.as_list(),
+                        "parentType": parent_type,
+                        "fieldName": field_name,
+                        "returnType": return_type,
+                        "startOffset": _nanoseconds(start - self.start),
+                        "duration": _nanoseconds(end - start),
+                    }
+                    for (
+                        path,
+                        parent_type,
+                        field_name,
+                        return_type,
+                        start,
+                        end,
+                    ) in self.resolvers
+                ]
+            },
+        }
+
+
+def _format_time(timestamp: float) -> str:
+    return (
+        datetime.fromtimestamp(timestamp, timezone.utc)
+        .isoformat(timespec="milliseconds")
+        .replace("+00:00", "Z")
+    )
+
+
+def _nanoseconds(seconds: float) -> int:
+    return int(seconds * 1e9)
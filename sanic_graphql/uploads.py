@@ -0,0 +1,168 @@
+"""File uploads with the GraphQL multipart request specification.
+
+See https://github.com/jaydenseric/graphql-multipart-request-spec for the
+specification. Uploaded files are passed to resolvers as `Upload` objects,
+which read from the file the upload was received into. On routes added with
+`stream=True` that is a temporary file on disk for all but small files, so
+uploads are never loaded into memory as a whole.
+"""
+import cgi
+import json
+from asyncio import get_event_loop
+from collections.abc import Mapping
+from io import BytesIO
+from typing import IO, Any, AsyncIterator, Dict, List, Optional, Union
+
+from graphql_server import HttpQueryError
+
+from graphql.error import GraphQLError
+from graphql.type import GraphQLScalarType
+
+__all__ = ["Upload", "GraphQLUpload", "get_uploads", "parse_multipart_request"]
+
+
+class Upload:
+    """A file uploaded with a GraphQL multipart request.
+
+    The contents can be read with the `read` coroutine or by iterating over
+    the upload asynchronously, which reads the file in chunks. Files on disk
+    are read in the default executor, so reading does not block the loop.
+    The underlying binary file object is available as `file`.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(
+        self,
+        file: IO[bytes],
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+    ):
+        self.file = file
+        self.filename = filename
+        self.content_type = content_type
+        self._source: Any = None
+
+    @classmethod
+    def from_field_storage(cls, field: cgi.FieldStorage) -> "Upload":
+        upload = cls(field.file, field.filename, field.type)  # type: ignore
+        # The field storage closes the file when it is garbage collected
+        upload._source = field
+        return upload
+
+    def __repr__(self) -> str:
+        return f"<Upload filename={self.filename!r} content_type={self.content_type!r}>"
+
+    @property
+    def in_memory(self) -> bool:
+        return isinstance(self.file, BytesIO)
+
+    async def read(self, size: int = -1) -> bytes:
+        if self.in_memory:
+            return self.file.read(size)
+        return await get_event_loop().run_in_executor(None, self.file.read, size)
+
+    async def seek(self, offset: int) -> None:
+        self.file.seek(offset)
+
+    def close(self) -> None:
+        self.file.close()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        while True:
+            chunk = await self.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def _parse_upload_value(value: Any) -> Upload:
+    if not isinstance(value, Upload):
+        raise GraphQLError("Upload value must be a file of a multipart request.")
+    return value
+
+
+def _parse_upload_literal(*_args: Any) -> Upload:
+    raise GraphQLError("Upload literals are not supported.")
+
+
+def _serialize_upload(_value: Any) -> Any:
+    raise GraphQLError("Upload can only be used as an input type.")
+
+
+GraphQLUpload = GraphQLScalarType(
+    name="Upload",
+    description="A file uploaded with a GraphQL multipart request.",
+    serialize=_serialize_upload,
+    parse_value=_parse_upload_value,
+    parse_literal=_parse_upload_literal,
+)
+
+
+def get_uploads(form: Mapping, files: Optional[Mapping] = None) -> Dict[str, Upload]:
+    """Return the uploaded files of a multipart request by field name.
+
+    Files are taken from streamed multipart forms, where they are kept as
+    field storages, and from the `files` of buffered Sanic requests.
+    """
+    uploads = {
+        name: Upload.from_field_storage(value)
+        for name, value in form.items()
+        if isinstance(value, cgi.FieldStorage)
+    }
+    for name in files or ():
+        file = files.get(name)  # type: ignore
+        uploads[name] = Upload(BytesIO(file.body), file.name, file.type)
+    return uploads
+
+
+def _set_path(operations: Union[Dict, List], path: str, upload: Upload) -> None:
+    *parents, last = path.split(".")
+    target: Any = operations
+    try:
+        for key in parents:
+            target = target[int(key) if isinstance(target, list) else key]
+        if isinstance(target, list):
+            target[int(last)] = upload
+        elif isinstance(target, dict):
+            target[last] = upload
+        else:
+            raise TypeError
+    except (KeyError, IndexError, TypeError, ValueError):
+        raise HttpQueryError(
+            400, f"Path {path!r} of the multipart map is not in the operations."
+        )
+
+
+def parse_multipart_request(
+    form: Mapping, uploads: Dict[str, Upload]
+) -> Union[Mapping, Dict, List]:
+    """Return the operations of a multipart request with the uploads filled in.
+
+    Forms without `operations` are returned unchanged, so that plain form
+    requests keep working.
+    """
+    operations = form.get("operations")
+    if operations is None:
+        return form
+    try:
+        operations = json.loads(operations)
+        file_map = json.loads(form.get("map") or "{}")
+    except (TypeError, ValueError):
+        raise HttpQueryError(400, "Multipart request sent invalid JSON.")
+    if not isinstance(operations, (dict, list)) or not isinstance(file_map, dict):
+        raise HttpQueryError(400, "Multipart request sent invalid operations or map.")
+
+    for name, paths in file_map.items():
+        upload = uploads.get(name)
+        if upload is None:
+            raise HttpQueryError(
+                400, f"File {name!r} of the multipart map is missing."
+            )
+        if not isinstance(paths, list):
+            raise HttpQueryError(
+                400, "Multipart request sent invalid operations or map."
+            )
+        for path in paths:
+            _set_path(operations, str(path), upload)
+    return operations
@@ -0,0 +1,251 @@
+"""Validation rules limiting the size and cost of GraphQL operations.
+
+The rules are run by graphql-core together with the specified validation rules,
+so that operations over the limits are rejected before any resolver runs.
+"""
+from typing import (Any, Collection, Dict, FrozenSet, Mapping, NamedTuple,
+                    Optional, Type)
+
+from graphql.error import GraphQLError
+from graphql.language import (DocumentNode, FieldNode, FragmentDefinitionNode,
+                              FragmentSpreadNode, InlineFragmentNode,
+                              IntValueNode, OperationDefinitionNode,
+                              OperationType, SelectionSetNode, VariableNode)
+from graphql.language.visitor import SKIP
+from graphql.type import (GraphQLNamedType, GraphQLSchema, get_named_type,
+                          get_nullable_type, is_list_type)
+from graphql.validation import ValidationRule
+
+__all__ = ["QueryMetrics", "measure_operation", "query_limits_rule"]
+
+
+class QueryMetrics(NamedTuple):
+    """Depth, number of fields and weighted cost of an operation."""
+
+    depth: int = 0
+    fields: int = 0
+    cost: int = 0
+
+
+class QueryCostHints(NamedTuple):
+    field_costs: Dict[str, int]
+    default_field_cost: int
+    list_size_arguments: Collection[str]
+    default_list_size: int
+    variable_list_sizes: Dict[str, int]
+    variable_list_size: int
+
+
+def measure_operation(
+    schema: GraphQLSchema,
+    operation: OperationDefinitionNode,
+    fragments: Dict[str, FragmentDefinitionNode],
+    field_costs: Optional[Dict[str, int]] = None,
+    default_field_cost: int = 1,
+    list_size_arguments: Collection[str] = ("first", "last", "limit"),
+    default_list_size: int = 1,
+    max_list_size: Optional[int] = None,
+    variables: Optional[Mapping[str, Any]] = None,
+) -> QueryMetrics:
+    """Compute the metrics of the given operation.
+
+    The cost of a field is looked up in `field_costs` by its coordinate (like
+    `"Query.users"`) and defaults to `default_field_cost`. The cost of a list
+    field and its sub-selections is multiplied by the expected list size, which
+    is taken from the value of one of the `list_size_arguments` or defaults to
+    `default_list_size`. Arguments given as variables take their value from
+    `variables` or the default value of the variable, and otherwise count as
+    `max_list_size` (if set). Introspection fields are not counted.
+
+    Every fragment is measured once, so that the time taken only grows with
+    the size of the document, however often its fragments are spread.
+    """
+    root_type = {
+        OperationType.QUERY: schema.query_type,
+        OperationType.MUTATION: schema.mutation_type,
+        OperationType.SUBSCRIPTION: schema.subscription_type,
+    }[operation.operation]
+    hints = QueryCostHints(
+        field_costs or {},
+        default_field_cost,
+        list_size_arguments,
+        default_list_size,
+        _get_variable_list_sizes(operation, variables),
+        default_list_size if max_list_size is None else max_list_size,
+    )
+    return _measure_selection_set(
+        schema, operation.selection_set, root_type, fragments, hints, frozenset(), {}
+    )
+
+
+def _get_variable_list_sizes(
+    operation: OperationDefinitionNode, variables: Optional[Mapping[str, Any]]
+) -> Dict[str, int]:
+    sizes = {}
+    for definition in operation.variable_definitions or ():
+        name = definition.variable.name.value
+        value = variables.get(name) if variables else None
+        if isinstance(value, int) and not isinstance(value, bool):
+            sizes[name] = value
+        elif value is None and isinstance(definition.default_value, IntValueNode):
+            sizes[name] = int(definition.default_value.value)
+    return sizes
+
+
+def _measure_selection_set(
+    schema: GraphQLSchema,
+    selection_set: SelectionSetNode,
+    parent_type: Optional[GraphQLNamedType],
+    fragments: Dict[str, FragmentDefinitionNode],
+    hints: QueryCostHints,
+    visited_fragments: FrozenSet[str],
+    fragment_metrics: Dict[str, QueryMetrics],
+) -> QueryMetrics:
+    depth = fields = cost = 0
+
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            name = selection.name.value
+            if name.startswith("__"):
+                continue
+            parent_fields = getattr(parent_type, "fields", None) or {}
+            field_def = parent_fields.get(name)
+            field_type = field_def.type if field_def else None
+
+            if selection.selection_set:
+                sub = _measure_selection_set(
+                    schema,
+                    selection.selection_set,
+                    get_named_type(field_type),
+                    fragments,
+                    hints,
+                    visited_fragments,
+                    fragment_metrics,
+                )
+            else:
+                sub = QueryMetrics()
+
+            field_cost = hints.field_costs.get(
+                f"{getattr(parent_type, 'name', None)}.{name}", hints.default_field_cost
+            )
+            multiplier = (
+                _get_list_size(selection, hints)
+                if is_list_type(get_nullable_type(field_type))
+                else 1
+            )
+            depth = max(depth, sub.depth + 1)
+            fields += sub.fields + 1
+            cost += multiplier * (field_cost + sub.cost)
+            continue
+
+        if isinstance(selection, InlineFragmentNode):
+            sub = _measure_selection_set(
+                schema,
+                selection.selection_set,
+                schema.get_type(selection.type_condition.name.value)
+                if selection.type_condition
+                else parent_type,
+                fragments,
+                hints,
+                visited_fragments,
+                fragment_metrics,
+            )
+        elif isinstance(selection, FragmentSpreadNode):
+            name = selection.name.value
+            fragment = fragments.get(name)
+            if not fragment or name in visited_fragments:
+                continue
+            sub = fragment_metrics.get(name)  # type: ignore
+            if sub is None:
+                sub = fragment_metrics[name] = _measure_selection_set(
+                    schema,
+                    fragment.selection_set,
+                    schema.get_type(fragment.type_condition.name.value),
+                    fragments,
+                    hints,
+                    visited_fragments | {name},
+                    fragment_metrics,
+                )
+        else:  # pragma: no cover
+            continue
+
+        depth = max(depth, sub.depth)
+        fields += sub.fields
+        cost += sub.cost
+
+    return QueryMetrics(depth, fields, cost)
+
+
+def _get_list_size(node: FieldNode, hints: QueryCostHints) -> int:
+    for argument in node.arguments or ():
+        if argument.name.value not in hints.list_size_arguments:
+            continue
+        value = argument.value
+        if isinstance(value, IntValueNode):
+            return int(value.value)
+        if isinstance(value, VariableNode):
+            return hints.variable_list_sizes.get(
+                value.name.value, hints.variable_list_size
+            )
+    return hints.default_list_size
+
+
+def query_limits_rule(
+    max_depth: Optional[int] = None,
+    max_fields: Optional[int] = None,
+    max_cost: Optional[int] = None,
+    field_costs: Optional[Dict[str, int]] = None,
+    default_field_cost: int = 1,
+    list_size_arguments: Collection[str] = ("first", "last", "limit"),
+    default_list_size: int = 1,
+    max_list_size: Optional[int] = None,
+) -> Type[ValidationRule]:
+    """Create a validation rule limiting the depth, field count and cost of queries.
+
+    See `measure_operation` for how the cost of an operation is computed.
+    Validation does not see the variables of a request, so list sizes given
+    as variables without a default value count as `max_list_size`.
+    """
+
+    class QueryLimitsRule(ValidationRule):
+        def enter_document(self, node: DocumentNode, *_args: Any) -> Any:
+            fragments = {
+                definition.name.value: definition
+                for definition in node.definitions
+                if isinstance(definition, FragmentDefinitionNode)
+            }
+            for definition in node.definitions:
+                if isinstance(definition, OperationDefinitionNode):
+                    self.check_operation(definition, fragments)
+            return SKIP
+
+        def check_operation(
+            self,
+            operation: OperationDefinitionNode,
+            fragments: Dict[str, FragmentDefinitionNode],
+        ) -> None:
+            metrics = measure_operation(
+                self.context.schema,
+                operation,
+                fragments,
+                field_costs,
+                default_field_cost,
+                list_size_arguments,
+                default_list_size,
+                max_list_size,
+            )
+            for limit, value, description in (
+                (max_depth, metrics.depth, "depth"),
+                (max_fields, metrics.fields, "number of fields"),
+                (max_cost, metrics.cost, "cost"),
+            ):
+                if limit is not None and value > limit:
+                    self.report_error(
+                        GraphQLError(
+                            f"Operation {description} of {value}"
+                            f" exceeds the maximum of {limit}.",
+                            operation,
+                        )
+                    )
+
+    return QueryLimitsRule
@@ -41,7 +41,7 @@ setup(
         "License :: OSI Approved :: MIT License",
     ],
     keywords="api graphql protocol sanic",
-    packages=find_packages(exclude=["tests"]),
+    packages=find_packages(exclude=["tests", "tests.*", "benchmarks", "benchmarks.*"]),
     install_requires=install_requires,
     tests_require=tests_requires,
     extras_require={
@@ -8,12 +8,12 @@ from sanic_graphql import GraphQLView
 from .schema import Schema
 
 
-def create_app(path="/graphql", **kwargs):
+def create_app(path="/graphql", stream=False, **kwargs):
     app = Sanic(__name__)
     app.debug = True
 
     schema = kwargs.pop("schema", None) or Schema
-    app.add_route(GraphQLView.as_view(schema=schema, **kwargs), path)
+    app.add_route(GraphQLView.as_view(schema=schema, **kwargs), path, stream=stream)
 
     app.client = SanicTestClient(app)
     return app
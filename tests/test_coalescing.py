@@ -0,0 +1,142 @@
+import asyncio
+import json
+
+import pytest
+from sanic import Sanic
+from sanic.testing import SanicASGITestClient
+
+from graphql.type import (GraphQLField, GraphQLInt, GraphQLObjectType,
+                          GraphQLSchema)
+from sanic_graphql import GraphQLView
+from sanic_graphql.coalescing import InFlightOperations, is_query
+
+from .app import url_string
+from .schema import Schema
+
+calls = []
+
+
+async def resolve_counter(*_):
+    calls.append(None)
+    await asyncio.sleep(0.05)
+    return len(calls)
+
+
+CounterSchema = GraphQLSchema(
+    query=GraphQLObjectType(
+        name="Query",
+        fields={"counter": GraphQLField(GraphQLInt, resolve=resolve_counter)},
+    ),
+    mutation=GraphQLObjectType(
+        name="Mutation",
+        fields={"increment": GraphQLField(GraphQLInt, resolve=resolve_counter)},
+    ),
+)
+
+
+def create_client(**kwargs):
+    app = Sanic(__name__)
+    app.add_route(
+        GraphQLView.as_view(schema=CounterSchema, enable_async=True, **kwargs),
+        "/graphql",
+    )
+    return app, SanicASGITestClient(app)
+
+
+def post(client, query, **headers):
+    return client.post(
+        url_string(),
+        data=json.dumps({"query": query}),
+        headers={"content-type": "application/json", **headers},
+    )
+
+
+@pytest.mark.asyncio
+async def test_coalesces_identical_queries():
+    del calls[:]
+    app, client = create_client(coalesce_queries=True)
+
+    responses = await asyncio.gather(
+        *(post(client, "{ counter }") for _ in range(5))
+    )
+
+    assert len(calls) == 1
+    for _, response in responses:
+        assert response.status == 200
+        assert json.loads(response.body) == {"data": {"counter": 1}}
+    in_flight = app.router.routes_all["/graphql"].handler.in_flight_operations
+    assert in_flight.coalesced == 4
+    assert len(in_flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_never_coalesces_mutations():
+    del calls[:]
+    _, client = create_client(coalesce_queries=True, document_cache_size=10)
+
+    await asyncio.gather(*(post(client, "mutation { increment }") for _ in range(3)))
+
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_coalesces_queries_by_vary_key():
+    del calls[:]
+    _, client = create_client(
+        coalesce_queries=True,
+        coalesce_vary=lambda request: request.headers.get("x-user"),
+    )
+
+    await asyncio.gather(
+        post(client, "{ counter }", **{"x-user": "a"}),
+        post(client, "{ counter }", **{"x-user": "a"}),
+        post(client, "{ counter }", **{"x-user": "b"}),
+    )
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_does_not_coalesce_without_the_option():
+    del calls[:]
+    _, client = create_client()
+
+    await asyncio.gather(*(post(client, "{ counter }") for _ in range(3)))
+
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_cancels_execution_when_all_waiters_are_cancelled():
+    in_flight = InFlightOperations()
+    started = asyncio.Event()
+    cancelled = []
+
+    async def execute():
+        started.set()
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    first = asyncio.ensure_future(in_flight.run("key", execute))
+    second = asyncio.ensure_future(in_flight.run("key", execute))
+    await started.wait()
+
+    first.cancel()
+    await asyncio.sleep(0)
+    assert not cancelled
+    second.cancel()
+    await asyncio.sleep(0.01)
+    assert cancelled == [True]
+    assert len(in_flight) == 0
+
+
+def test_detects_queries():
+    assert is_query(Schema, "{ test }", None)
+    assert is_query(Schema, "query A { test } mutation B { writeTest }", "A")
+    assert not is_query(Schema, "query A { test } mutation B { writeTest }", "B")
+    assert not is_query(Schema, "mutation { writeTest { test } }", None)
+    assert not is_query(Schema, "{ test", None)
+    assert not is_query(Schema, None, None)
@@ -0,0 +1,169 @@
+import gzip
+import json
+
+import pytest
+
+from graphql.type import (GraphQLField, GraphQLList, GraphQLObjectType,
+                          GraphQLSchema, GraphQLString)
+from sanic_graphql.compression import (StreamCompressor, choose_encoding,
+                                       compress)
+
+from .app import create_app, url_string
+
+ItemsSchema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "items": GraphQLField(
+                GraphQLList(GraphQLString),
+                resolve=lambda *_: [f"item {i}" for i in range(1000)],
+            ),
+            "small": GraphQLField(GraphQLString, resolve=lambda *_: "small"),
+        },
+    )
+)
+
+ITEMS = {"data": {"items": [f"item {i}" for i in range(1000)]}}
+
+
+def response_json(response):
+    return json.loads(response.body.decode())
+
+
+@pytest.mark.parametrize(
+    "app", [create_app(schema=ItemsSchema, compress_responses=True)]
+)
+def test_compresses_large_responses(app):
+    _, response = app.client.get(
+        uri=url_string(query="{ items }"), headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert response.status == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert int(response.headers["Content-Length"]) < len(json.dumps(ITEMS)) / 4
+    assert response_json(response) == ITEMS
+
+
+@pytest.mark.parametrize(
+    "app", [create_app(schema=ItemsSchema, compress_responses=True)]
+)
+def test_does_not_compress_small_or_unaccepted_responses(app):
+    _, response = app.client.get(
+        uri=url_string(query="{ small }"), headers={"Accept-Encoding": "gzip"}
+    )
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["Vary"] == "Accept-Encoding"
+
+    _, response = app.client.get(
+        uri=url_string(query="{ items }"),
+        headers={"Accept-Encoding": "identity, gzip;q=0"},
+    )
+    assert "Content-Encoding" not in response.headers
+    assert response_json(response) == ITEMS
+
+
+@pytest.mark.parametrize(
+    "app",
+    [
+        create_app(
+            schema=ItemsSchema,
+            compress_responses=True,
+            compression_level=9,
+            compression_executor_min_size=0,
+        )
+    ],
+)
+def test_compresses_large_responses_in_the_executor(app):
+    _, response = app.client.get(
+        uri=url_string(query="{ items }"), headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response_json(response) == ITEMS
+
+
+@pytest.mark.parametrize(
+    "app",
+    [
+        create_app(
+            schema=ItemsSchema,
+            compress_responses=True,
+            stream_response=True,
+            stream_chunk_size=1024,
+        )
+    ],
+)
+def test_compresses_streamed_responses(app):
+    _, response = app.client.get(
+        uri=url_string(query="{ items }"), headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response_json(response) == ITEMS
+
+
+@pytest.mark.parametrize(
+    "app",
+    [create_app(schema=ItemsSchema, compress_responses=True, response_cache=True)],
+)
+def test_compresses_cached_responses_once(app):
+    _, response = app.client.get(
+        uri=url_string(query="{ items }"), headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.headers["Content-Encoding"] == "gzip"
+    etag = response.headers["ETag"]
+    assert etag.endswith('-gzip"')
+
+    store = app.router.routes_all["/graphql"].handler.response_cache_store
+    ((_expires, cached),) = store.cache._data.values()
+    assert gzip.decompress(cached.encoded["gzip"]) == cached.body
+
+    _, response = app.client.get(
+        uri=url_string(query="{ items }"),
+        headers={"Accept-Encoding": "gzip", "If-None-Match": etag},
+    )
+    assert response.status == 304
+
+    _, response = app.client.get(
+        uri=url_string(query="{ items }"),
+        headers={"Accept-Encoding": "identity", "If-None-Match": etag},
+    )
+    assert response.status == 200
+    assert response.headers["ETag"] == etag.replace("-gzip", "")
+
+
+def test_chooses_the_preferred_accepted_encoding():
+    assert choose_encoding("gzip, br", ["br", "gzip"]) == "br"
+    assert choose_encoding("br;q=0, gzip;q=0.5", ["br", "gzip"]) == "gzip"
+    assert choose_encoding("*", ["br", "gzip"]) == "br"
+    assert choose_encoding("*, br;q=0", ["br", "gzip"]) == "gzip"
+    assert choose_encoding("identity", ["br", "gzip"]) is None
+    assert choose_encoding("gzip;q=1, br;q=0.1", ["br", "gzip"]) == "gzip"
+    assert choose_encoding("br;q=0.5, gzip;q=0.5", ["br", "gzip"]) == "br"
+    assert choose_encoding("*;q=0.5, gzip", ["br", "gzip"]) == "gzip"
+    assert choose_encoding("identity, gzip;q=0.5", ["br", "gzip"]) is None
+    assert choose_encoding("identity;q=0.5, gzip", ["br", "gzip"]) == "gzip"
+    assert choose_encoding(None, ["br", "gzip"]) is None
+
+
+def test_stream_compressor_matches_compress():
+    body = json.dumps(ITEMS).encode()
+    compressor = StreamCompressor("gzip")
+    compressed = compressor.compress(body[:100]) + compressor.compress(body[100:])
+    compressed += compressor.flush()
+
+    assert gzip.decompress(compressed) == body
+    assert gzip.decompress(compress(body, "gzip")) == body
+
+
+def test_zstd_compression():
+    zstandard = pytest.importorskip("zstandard")
+    body = json.dumps(ITEMS).encode()
+    decompressor = zstandard.ZstdDecompressor()
+
+    assert decompressor.decompress(compress(body, "zstd", 30)) == body
+    compressor = StreamCompressor("zstd")
+    compressed = compressor.compress(body) + compressor.flush()
+    assert decompressor.decompressobj().decompress(compressed) == body
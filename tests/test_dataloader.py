@@ -0,0 +1,135 @@
+import asyncio
+import json
+
+import pytest
+
+from graphql.type import (GraphQLArgument, GraphQLField, GraphQLInt,
+                          GraphQLNonNull, GraphQLObjectType, GraphQLSchema,
+                          GraphQLString)
+from sanic_graphql.dataloader import DataLoader, DataLoaderRegistry
+
+from .app import create_app, url_string
+
+batches = []
+
+
+async def batch_load_names(keys):
+    batches.append(keys)
+    return [f"name {key}" if key > 0 else ValueError(f"No {key}") for key in keys]
+
+
+UserLoaderSchema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "name": GraphQLField(
+                GraphQLString,
+                args={"id": GraphQLArgument(GraphQLNonNull(GraphQLInt))},
+                resolve=lambda obj, info, id: info.context["loaders"]["names"].load(id),
+            ),
+        },
+    )
+)
+
+
+def response_json(response):
+    return json.loads(response.body.decode())
+
+
+@pytest.mark.parametrize(
+    "app",
+    [
+        create_app(
+            schema=UserLoaderSchema,
+            enable_async=True,
+            loaders={"names": batch_load_names},
+        )
+    ],
+)
+def test_loaders_batch_and_deduplicate_per_request(app):
+    batches.clear()
+    query = "{ a: name(id: 1), b: name(id: 2), c: name(id: 1) }"
+    for _ in range(2):
+        _, response = app.client.get(uri=url_string(query=query))
+
+        assert response.status == 200
+        assert response_json(response) == {
+            "data": {"a": "name 1", "b": "name 2", "c": "name 1"}
+        }
+
+    assert batches == [[1, 2], [1, 2]]
+
+
+@pytest.mark.parametrize(
+    "app",
+    [
+        create_app(
+            schema=UserLoaderSchema,
+            enable_async=True,
+            loaders={"names": batch_load_names},
+        )
+    ],
+)
+def test_loader_errors_are_field_errors(app):
+    _, response = app.client.get(
+        uri=url_string(query="{ a: name(id: 1), b: name(id: 0) }")
+    )
+
+    assert response.status == 200
+    result = response_json(response)
+    assert result["data"] == {"a": "name 1", "b": None}
+    assert result["errors"][0]["message"] == "No 0"
+
+
+@pytest.mark.asyncio
+async def test_loader_splits_batches():
+    calls = []
+
+    async def load(keys):
+        calls.append(keys)
+        return keys
+
+    loader = DataLoader(load, max_batch_size=2)
+
+    assert await loader.load_many([1, 2, 3]) == [1, 2, 3]
+    assert calls == [[1, 2], [3]]
+
+
+@pytest.mark.asyncio
+async def test_loader_rejects_wrong_number_of_values():
+    async def load(keys):
+        return []
+
+    loader = DataLoader(load)
+
+    with pytest.raises(TypeError):
+        await loader.load(1)
+    # failed keys are not cached
+    assert not loader._futures
+
+
+@pytest.mark.asyncio
+async def test_loader_prime_and_clear():
+    async def load(keys):
+        return [key * 2 for key in keys]
+
+    loader = DataLoader(load)
+    loader.prime(1, "primed")
+
+    assert await loader.load(1) == "primed"
+    loader.clear(1)
+    assert await loader.load(1) == 2
+
+
+@pytest.mark.asyncio
+async def test_registry_creates_loaders_on_first_use():
+    class DoubleLoader(DataLoader):
+        async def batch_load_fn(self, keys):
+            await asyncio.sleep(0)
+            return [key * 2 for key in keys]
+
+    registry = DataLoaderRegistry({"double": DoubleLoader})
+
+    assert "double" in registry
+    assert registry["double"] is registry["double"]
+    assert await registry["double"].load(2) == 4
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from .app import create_app, url_string
+
+
+def response_json(response):
+    return json.loads(response.body.decode())
+
+
+@pytest.mark.parametrize("app", [create_app(execution_plan_cache_size=10)])
+def test_reuses_execution_plans(app):
+    view = app.router.routes_all["/graphql"].handler
+    for _ in range(3):
+        _, response = app.client.get(uri=url_string(query='{test(who: "Dolly")}'))
+        assert response_json(response) == {"data": {"test": "Hello Dolly"}}
+
+    assert view.document_cache is not None
+    assert len(view.execution_plan_cache) == 1
+    assert view.execution_plan_cache.hits == 2
+
+
+@pytest.mark.parametrize(
+    "app", [create_app(execution_plan_cache_size=10, enable_async=True)]
+)
+def test_execution_plans_respect_variables(app):
+    query = (
+        "query Q($who: String, $skip: Boolean!) "
+        "{ test(who: $who) ... on QueryRoot @skip(if: $skip) { other: test } }"
+    )
+    for who, skip in [("Dolly", False), ("Bob", True), (None, False)]:
+        _, response = app.client.get(
+            uri=url_string(query=query, variables=json.dumps(dict(who=who, skip=skip)))
+        )
+        expected = {"test": f"Hello {who or 'World'}"}
+        if not skip:
+            expected["other"] = "Hello World"
+        assert response_json(response) == {"data": expected}
+
+
+@pytest.mark.parametrize("app", [create_app(execution_plan_cache_size=10)])
+def test_execution_plans_keep_field_errors(app):
+    for _ in range(2):
+        _, response = app.client.get(uri=url_string(query="{thrower}"))
+        assert response_json(response) == {
+            "data": None,
+            "errors": [
+                {
+                    "message": "Throws!",
+                    "locations": [{"line": 1, "column": 2}],
+                    "path": ["thrower"],
+                }
+            ],
+        }
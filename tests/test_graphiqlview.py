@@ -1,6 +1,8 @@
 import pytest
 from jinja2 import Environment
 
+from sanic_graphql.graphiql import GraphiQLPage
+
 from .app import create_app, url_string
 from .schema import AsyncSchema
 
@@ -86,3 +88,59 @@ def test_graphiql_asyncio_schema(app):
 
     assert response.status == 200
     assert expected_response in response.body.decode("utf-8")
+
+
+@pytest.mark.parametrize("app", [create_app(graphiql=True, graphiql_cache_size=10)])
+def test_graphiql_pages_are_cached(app, pretty_response):
+    for _ in range(2):
+        _, response = app.client.get(
+            uri=url_string(query="{test}"), headers={"Accept": "text/html"}
+        )
+        assert response.status == 200
+        assert pretty_response in response.body.decode("utf-8")
+        assert response.headers["Cache-Control"] == "no-cache"
+
+    cache = app.router.routes_all["/graphql"].handler.graphiql_cache
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.parametrize("app", [create_app(graphiql=True, graphiql_cache_size=10)])
+def test_cached_graphiql_pages_are_compressed(app):
+    _, response = app.client.get(
+        uri=url_string(), headers={"Accept": "text/html", "Accept-Encoding": "gzip"}
+    )
+
+    assert response.status == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers["Cache-Control"] == "max-age=86400"
+    assert "<title>GraphiQL</title>" in response.body.decode("utf-8")
+
+
+@pytest.mark.parametrize("app", [create_app(graphiql=True, graphiql_cache_size=10)])
+def test_graphiql_pages_are_compressed_for_accepted_encodings_only(app):
+    for _ in range(2):
+        _, response = app.client.get(
+            uri=url_string(query="{test}"),
+            headers={"Accept": "text/html", "Accept-Encoding": "gzip"},
+        )
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Hello World" in response.body.decode("utf-8")
+
+
+def test_graphiql_pages_are_not_compressed_up_front():
+    page = GraphiQLPage.from_source("<html></html>")
+    assert page.body == b"<html></html>"
+    assert page.encoded == {}
+
+
+@pytest.mark.parametrize("app", [create_app(graphiql=True, graphiql_cache_size=10)])
+def test_cached_graphiql_pages_are_revalidated(app):
+    _, response = app.client.get(uri=url_string(), headers={"Accept": "text/html"})
+    etag = response.headers["ETag"]
+
+    _, response = app.client.get(
+        uri=url_string(), headers={"Accept": "text/html", "If-None-Match": etag}
+    )
+    assert response.status == 304
+    assert response.headers["ETag"] == etag
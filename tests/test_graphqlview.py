@@ -1,10 +1,15 @@
+import asyncio
 import json
 from urllib.parse import urlencode
 
 import pytest
 
+from graphql.type import (GraphQLField, GraphQLObjectType, GraphQLSchema,
+                          GraphQLString)
+from sanic_graphql import DocumentCache, GraphQLView
+
 from .app import create_app, url_string
-from .schema import AsyncSchema
+from .schema import AsyncSchema, Schema
 
 
 def response_json(response):
@@ -467,6 +472,23 @@ def test_handles_poorly_formed_variables(app):
     }
 
 
+@pytest.mark.parametrize("app", [create_app()])
+def test_get_ignores_empty_variables(app):
+    _, response = app.client.get(uri="/graphql?query={test}&variables=")
+    assert response.status == 200
+    assert response_json(response) == {"data": {"test": "Hello World"}}
+
+
+@pytest.mark.parametrize("app", [create_app()])
+def test_get_uses_first_value_of_repeated_params(app):
+    _, response = app.client.get(
+        uri="/graphql?"
+        + urlencode([("query", "{test}"), ("query", "{ thrower }"), ("pretty", "1")])
+    )
+    assert response.status == 200
+    assert response.body.decode() == '{\n  "data": {\n    "test": "Hello World"\n  }\n}'
+
+
 @pytest.mark.parametrize("app", [create_app()])
 def test_handles_unsupported_http_methods(app):
     _, response = app.client.put(uri=url_string(query="{test}"))
@@ -600,6 +622,89 @@ def test_batch_allows_post_with_operation_name(app):
     ]
 
 
+@pytest.mark.parametrize(
+    "app", [create_app(schema=AsyncSchema, enable_async=True, batch=True)]
+)
+def test_batch_async_operations_keep_order(app):
+    _, response = app.client.post(
+        uri=url_string(),
+        data=json.dumps([dict(query="{b}"), dict(query="{a}"), dict(query="{c}")]),
+        headers={"content-type": "application/json"},
+    )
+
+    assert response.status == 200
+    assert response_json(response) == [
+        {"data": {"b": "hey2"}},
+        {"data": {"a": "hey"}},
+        {"data": {"c": "hey3"}},
+    ]
+
+
+@pytest.mark.parametrize(
+    "app", [create_app(schema=AsyncSchema, enable_async=True, batch=True)]
+)
+def test_batch_async_failing_operation_does_not_cancel_others(app):
+    _, response = app.client.post(
+        uri=url_string(),
+        data=json.dumps([dict(query="{a}"), dict(query="{unknown}")]),
+        headers={"content-type": "application/json"},
+    )
+
+    assert response.status == 400
+    result = response_json(response)
+    assert result[0] == {"data": {"a": "hey"}}
+    assert result[1]["errors"][0]["message"] == (
+        "Cannot query field 'unknown' on type 'AsyncQueryType'."
+    )
+
+
+running = {"now": 0, "max": 0}
+
+
+async def resolve_tracked(*_):
+    running["now"] += 1
+    running["max"] = max(running["max"], running["now"])
+    await asyncio.sleep(0.005)
+    running["now"] -= 1
+    return "done"
+
+
+TrackedSchema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={"tracked": GraphQLField(GraphQLString, resolve=resolve_tracked)},
+    )
+)
+
+
+@pytest.mark.parametrize(
+    "app,limit",
+    [
+        (create_app(schema=TrackedSchema, enable_async=True, batch=True), 5),
+        (
+            create_app(
+                schema=TrackedSchema,
+                enable_async=True,
+                batch=True,
+                batch_concurrency_limit=2,
+            ),
+            2,
+        ),
+    ],
+)
+def test_batch_async_operations_run_concurrently(app, limit):
+    running["max"] = 0
+    _, response = app.client.post(
+        uri=url_string(),
+        data=json.dumps([dict(query="{tracked}")] * 5),
+        headers={"content-type": "application/json"},
+    )
+
+    assert response.status == 200
+    assert response_json(response) == [{"data": {"tracked": "done"}}] * 5
+    assert running["max"] == limit
+
+
 @pytest.mark.parametrize("app", [create_app(schema=AsyncSchema, enable_async=True)])
 def test_async_schema(app):
     query = "{a,b,c}"
@@ -625,3 +730,110 @@ def test_preflight_incorrect_request(app):
     )
 
     assert response.status == 400
+
+
+document_cache = DocumentCache(maxsize=2)
+
+
+@pytest.mark.parametrize("app", [create_app(document_cache=document_cache)])
+def test_document_cache_reuses_parsed_documents(app):
+    document_cache.clear()
+    for _ in range(3):
+        _, response = app.client.get(uri=url_string(query="{test}"))
+        assert response.status == 200
+        assert response_json(response) == {"data": {"test": "Hello World"}}
+
+    assert document_cache.misses == 1
+    assert document_cache.hits == 2
+
+
+@pytest.mark.parametrize("app", [create_app(document_cache=document_cache)])
+def test_document_cache_keeps_validation_errors(app):
+    document_cache.clear()
+    for _ in range(2):
+        _, response = app.client.get(uri=url_string(query="{ unknownOne }"))
+        assert response.status == 400
+        assert response_json(response)["errors"][0]["message"] == (
+            "Cannot query field 'unknownOne' on type 'QueryRoot'."
+        )
+
+    assert document_cache.hits == 1
+
+
+@pytest.mark.parametrize("app", [create_app(document_cache=document_cache)])
+def test_document_cache_evicts_least_recently_used(app):
+    document_cache.clear()
+    for who in ("A", "B", "A", "C", "B"):
+        app.client.get(uri=url_string(query='{ test(who: "%s") }' % who))
+
+    assert len(document_cache) == 2
+    assert (document_cache.hits, document_cache.misses) == (1, 4)
+
+
+def test_document_cache_created_from_size():
+    view = GraphQLView.as_view(schema=Schema, document_cache_size=10)
+
+    assert isinstance(view.document_cache, DocumentCache)
+    assert view.document_cache.maxsize == 10
+
+
+@pytest.mark.parametrize("app", [create_app(server_timing=True)])
+def test_server_timing_header(app):
+    _, response = app.client.post(
+        uri=url_string(),
+        data=json_dump_kwarg(query="{test}"),
+        headers={"content-type": "application/json"},
+    )
+
+    assert response.status == 200
+    phases = [
+        entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")
+    ]
+    assert phases == ["body", "parse", "validate", "execute", "encode"]
+
+
+timings_reported = []
+
+
+async def resolve_sleeping(*_):
+    await asyncio.sleep(0.01)
+    return "slept"
+
+
+SleepingSchema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={"sleeping": GraphQLField(GraphQLString, resolve=resolve_sleeping)},
+    )
+)
+
+
+@pytest.mark.parametrize(
+    "app",
+    [
+        create_app(
+            schema=SleepingSchema,
+            enable_async=True,
+            timing_callback=lambda request, timings: timings_reported.append(timings),
+        )
+    ],
+)
+def test_timing_callback(app):
+    timings_reported.clear()
+    _, response = app.client.get(uri=url_string(query="{sleeping}"))
+
+    assert response.status == 200
+    assert "Server-Timing" not in response.headers
+    [timings] = timings_reported
+    assert set(timings.phases) == {"body", "parse", "validate", "execute", "encode"}
+    # the async resolver sleeps for 10 milliseconds
+    assert timings.phases["execute"] >= 0.005
+    assert timings.total >= timings.phases["execute"]
+
+
+@pytest.mark.parametrize("app", [create_app(server_timing=True)])
+def test_server_timing_header_on_errors(app):
+    _, response = app.client.get(uri=url_string())
+
+    assert response.status == 400
+    assert response.headers["Server-Timing"].startswith("body;dur=")
@@ -0,0 +1,258 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from graphql.type import (GraphQLField, GraphQLObjectType, GraphQLSchema,
+                          GraphQLString)
+
+from .app import create_app, url_string
+
+
+async def resolve_slow(*_):
+    await asyncio.sleep(0.01)
+    return "slow"
+
+
+async def resolve_slower(*_):
+    await asyncio.sleep(1)
+    return "slower"
+
+
+SlowSchema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "fast": GraphQLField(GraphQLString, resolve=lambda *_: "fast"),
+            "slow": GraphQLField(GraphQLString, resolve=resolve_slow),
+            "slower": GraphQLField(GraphQLString, resolve=resolve_slower),
+        },
+    )
+)
+
+ThreadSchema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "thread": GraphQLField(
+                GraphQLString, resolve=lambda *_: threading.current_thread().name
+            ),
+        },
+    )
+)
+
+MULTIPART = {"accept": "multipart/mixed, application/json"}
+
+
+def response_json(response):
+    return json.loads(response.body.decode())
+
+
+def response_parts(response):
+    assert response.headers["content-type"] == 'multipart/mixed; boundary="-"'
+    body = response.body.decode()
+    assert body.startswith("\r\n---") and body.endswith("\r\n-----\r\n")
+    parts = body[len("\r\n---") : -len("--\r\n")].split("\r\n---")[:-1]
+    payloads = []
+    for part in parts:
+        headers, payload = part.split("\r\n\r\n", 1)
+        assert headers == "\r\nContent-Type: application/json; charset=utf-8"
+        payloads.append(json.loads(payload))
+    return payloads
+
+
+@pytest.mark.parametrize(
+    "app",
+    [create_app(schema=SlowSchema, enable_async=True, incremental_delivery=True)],
+)
+def test_delivers_deferred_fragments_in_later_parts(app):
+    _, response = app.client.get(
+        uri=url_string(query='{ fast ... @defer(label: "later") { slow } }'),
+        headers=MULTIPART,
+    )
+
+    assert response.status == 200
+    assert response_parts(response) == [
+        {"data": {"fast": "fast"}, "hasNext": True},
+        {
+            "incremental": [{"data": {"slow": "slow"}, "path": [], "label": "later"}],
+            "hasNext": False,
+        },
+    ]
+
+
+@pytest.mark.parametrize(
+    "app",
+    [create_app(schema=SlowSchema, enable_async=True, incremental_delivery=True)],
+)
+def test_defers_named_fragments(app):
+    _, response = app.client.post(
+        uri=url_string(),
+        data=json.dumps(
+            dict(
+                query="query Q($d: Boolean!) { ...F @defer(if: $d) } "
+                "fragment F on Query { slow fast }",
+                variables={"d": True},
+            )
+        ),
+        headers=dict(MULTIPART, **{"content-type": "application/json"}),
+    )
+
+    first, second = response_parts(response)
+    assert first == {"data": {}, "hasNext": True}
+    assert second["incremental"][0]["data"] == {"slow": "slow", "fast": "fast"}
+
+
+@pytest.mark.parametrize(
+    "app",
+    [create_app(schema=SlowSchema, enable_async=True, incremental_delivery=True)],
+)
+def test_answers_with_json_when_nothing_is_deferred(app):
+    _, response = app.client.get(
+        uri=url_string(query="{ fast ... @defer(if: false) { slow } }"),
+        headers=MULTIPART,
+    )
+    assert response.headers["content-type"] == "application/json"
+    assert response_json(response) == {"data": {"fast": "fast", "slow": "slow"}}
+
+    _, response = app.client.get(
+        uri=url_string(query="{ fast ... @defer { slow } }"),
+    )
+    assert response.headers["content-type"] == "application/json"
+    assert response_json(response) == {"data": {"fast": "fast", "slow": "slow"}}
+
+
+@pytest.mark.parametrize(
+    "app",
+    [create_app(schema=SlowSchema, enable_async=True, incremental_delivery=True)],
+)
+def test_applies_variable_defaults_to_defer_if(app):
+    query = "query Q($d: Boolean = false) { fast ... @defer(if: $d) { slow } }"
+    _, response = app.client.get(uri=url_string(query=query), headers=MULTIPART)
+    assert response.headers["content-type"] == "application/json"
+    assert response_json(response) == {"data": {"fast": "fast", "slow": "slow"}}
+
+    _, response = app.client.get(
+        uri=url_string(query=query.replace("false", "true")), headers=MULTIPART
+    )
+    assert len(response_parts(response)) == 2
+
+    _, response = app.client.get(
+        uri=url_string(query=query, variables=json.dumps({"d": "yes"})),
+        headers=MULTIPART,
+    )
+    assert response.headers["content-type"] == "application/json"
+    assert response_json(response)["errors"][0]["message"].startswith(
+        "Variable '$d' got invalid value 'yes'"
+    )
+
+
+@pytest.mark.parametrize("app", [create_app(schema=SlowSchema, enable_async=True)])
+def test_defer_is_unknown_without_incremental_delivery(app):
+    _, response = app.client.get(
+        uri=url_string(query="{ fast ... @defer { slow } }"), headers=MULTIPART
+    )
+
+    assert response.status == 400
+    assert "Unknown directive" in response_json(response)["errors"][0]["message"]
+
+
+@pytest.mark.parametrize(
+    "app",
+    [
+        create_app(
+            schema=ThreadSchema,
+            executor=ThreadPoolExecutor(2),
+            incremental_delivery=True,
+        )
+    ],
+)
+def test_runs_deferred_fragments_in_the_executor(app):
+    _, response = app.client.get(
+        uri=url_string(query="{ thread ... @defer { other: thread } }"),
+        headers=MULTIPART,
+    )
+
+    first, second = response_parts(response)
+    assert first["data"]["thread"].startswith("ThreadPoolExecutor")
+    assert second["incremental"][0]["data"]["other"].startswith("ThreadPoolExecutor")
+
+
+@pytest.mark.parametrize(
+    "app",
+    [
+        create_app(
+            schema=SlowSchema,
+            enable_async=True,
+            incremental_delivery=True,
+            tracing=True,
+            execution_timeout=0.05,
+        )
+    ],
+)
+def test_traces_and_times_out_incremental_operations(app):
+    _, response = app.client.get(
+        uri=url_string(query="{ fast ... @defer { slower } }"), headers=MULTIPART
+    )
+
+    first, second = response_parts(response)
+    assert first["data"] == {"fast": "fast"}
+    assert first["extensions"]["tracing"]["version"] == 1
+    [incremental] = second["incremental"]
+    assert incremental["data"] == {"slower": None}
+    assert incremental["errors"][0]["message"] == (
+        "Operation timed out after 0.05 seconds."
+    )
+
+
+@pytest.mark.parametrize(
+    "app",
+    [
+        create_app(
+            schema=SlowSchema,
+            enable_async=True,
+            incremental_delivery=True,
+            execution_plan_cache_size=10,
+        )
+    ],
+)
+def test_reuses_execution_plans_of_deferred_documents(app):
+    query = "{ fast ... @defer { slow } }"
+    for _ in range(2):
+        _, response = app.client.get(uri=url_string(query=query), headers=MULTIPART)
+        assert len(response_parts(response)) == 2
+
+    plans = app.router.routes_all["/graphql"].handler.execution_plan_cache
+    # The plans of the query, of its initial and of its deferred part
+    assert len(plans) == 3
+    assert plans.hits >= 2
+
+
+timings_reported = []
+
+
+@pytest.mark.parametrize(
+    "app",
+    [
+        create_app(
+            schema=SlowSchema,
+            enable_async=True,
+            incremental_delivery=True,
+            execution_timeout=0.05,
+            timing_callback=lambda request, timings: timings_reported.append(timings),
+        )
+    ],
+)
+def test_reports_timings_after_deferred_fragments(app):
+    timings_reported.clear()
+    _, response = app.client.get(
+        uri=url_string(query="{ fast ... @defer { slow } ... @defer { slower } }"),
+        headers=MULTIPART,
+    )
+
+    assert len(response_parts(response)) == 3
+    [timings] = timings_reported
+    assert timings.phases["execute"] >= 0.01
+    assert timings.timeouts == 1
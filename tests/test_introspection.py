@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from graphql.language import parse
+from graphql.utilities import get_introspection_query
+from sanic_graphql import GraphQLView
+from sanic_graphql.introspection import (IntrospectionCache,
+                                         is_introspection_query)
+
+from .app import create_app, url_string
+from .schema import AsyncSchema, Schema
+
+INTROSPECTION_QUERY = get_introspection_query()
+
+
+def response_json(response):
+    return json.loads(response.body.decode())
+
+
+def post_query(app, query):
+    return app.client.post(
+        uri=url_string(),
+        data=json.dumps({"query": query}),
+        headers={"content-type": "application/json"},
+    )
+
+
+def get_cache(app):
+    return app.router.routes_all["/graphql"].handler.introspection_cache
+
+
+@pytest.mark.parametrize("app", [create_app(introspection_cache_size=10)])
+def test_caches_introspection_results(app):
+    _, response = post_query(app, INTROSPECTION_QUERY)
+    assert response.status == 200
+    first = response.body
+
+    _, response = post_query(app, INTROSPECTION_QUERY)
+    assert response.status == 200
+    assert response.body == first
+    assert response_json(response)["data"]["__schema"]["queryType"] == {
+        "name": "QueryRoot"
+    }
+    cache = get_cache(app)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.parametrize("app", [create_app(introspection_cache_size=10)])
+def test_does_not_cache_other_queries(app):
+    _, response = post_query(app, "{ __schema { queryType { name } } test }")
+    assert response_json(response)["data"]["test"] == "Hello World"
+    _, response = post_query(app, "{ test }")
+    assert response.status == 200
+
+    assert len(get_cache(app)) == 0
+
+
+def test_caches_results_per_schema():
+    cache = IntrospectionCache(10)
+    query = "{ __schema { queryType { name } } }"
+    names = []
+    for schema in (Schema, AsyncSchema):
+        app = create_app(schema=schema, introspection_cache=cache)
+        _, response = post_query(app, query)
+        query_type = response_json(response)["data"]["__schema"]["queryType"]
+        names.append(query_type["name"])
+
+    assert names == ["QueryRoot", "AsyncQueryType"]
+
+
+@pytest.mark.parametrize("app", [create_app(introspection=False)])
+def test_introspection_can_be_disabled(app):
+    _, response = post_query(app, INTROSPECTION_QUERY)
+    assert response.status == 400
+    assert "introspection" in response_json(response)["errors"][0]["message"]
+
+    _, response = post_query(app, "{ __typename test }")
+    assert response_json(response) == {
+        "data": {"__typename": "QueryRoot", "test": "Hello World"}
+    }
+
+
+def test_introspection_cache_is_exposed_on_the_view():
+    view = GraphQLView.as_view(schema=Schema, introspection_cache_size=1)
+    assert isinstance(view.introspection_cache, IntrospectionCache)
+
+
+def test_detects_introspection_queries():
+    assert is_introspection_query(parse(INTROSPECTION_QUERY))
+    assert is_introspection_query(
+        parse(
+            "query { ...F } "
+            'fragment F on QueryRoot { __type(name: "A") { name } }'
+        )
+    )
+    assert is_introspection_query(
+        parse("query A { __schema { types { name } } } query B { test }"), "A"
+    )
+    assert not is_introspection_query(
+        parse("query A { __schema { types { name } } } query B { test }"), "B"
+    )
+    assert not is_introspection_query(parse("{ __typename }"))
+    assert not is_introspection_query(parse("{ __typename ... on QueryRoot { test } }"))
+    assert not is_introspection_query(
+        parse("mutation { __schema { types { name } } }")
+    )
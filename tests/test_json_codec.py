@@ -0,0 +1,82 @@
+import json
+
+import pytest
+from graphql_server import json_encode
+
+from sanic_graphql.json_codec import (OrjsonCodec, StdlibJSONCodec, UJSONCodec,
+                                      get_default_json_codec)
+
+from .app import create_app, url_string
+
+
+def available_codecs():
+    codecs = [StdlibJSONCodec()]
+    for codec_class in (UJSONCodec, OrjsonCodec):
+        try:
+            codecs.append(codec_class())
+        except ImportError:
+            pass
+    return codecs
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+def test_codec_encodes_to_bytes(codec):
+    data = {"data": {"test": "Hello / World", "list": [1, None]}}
+
+    assert codec.dumps(data) == (
+        b'{"data":{"test":"Hello / World","list":[1,null]}}'
+    )
+    assert codec.dumps(data, pretty=True) == json.dumps(data, indent=2).encode()
+    assert codec.loads(codec.dumps(data)) == data
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+def test_codec_decodes_bytes(codec):
+    assert codec.loads('{"query": "{test}"}'.encode()) == {"query": "{test}"}
+
+
+@pytest.mark.parametrize("pretty", [False, True])
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"data": {"test": "Hello World"}},
+        {"data": None, "errors": [{"message": "Failed", "path": ["a", 0]}]},
+        {"data": {"text": "Caf\u00e9 \u2603 / \"quoted\"\n", "n": [0, -1, 1.5]}},
+        [{"data": {}}, {"data": {"empty": []}}],
+    ],
+)
+def test_stdlib_codec_matches_json_encode(data, pretty):
+    assert StdlibJSONCodec().dumps(data, pretty=pretty) == (
+        json_encode(data, pretty=pretty).encode()
+    )
+
+
+def test_default_codec_is_available():
+    assert get_default_json_codec().loads(b"[1]") == [1]
+
+
+@pytest.mark.parametrize(
+    "app", [create_app(json_codec=codec) for codec in available_codecs()]
+)
+def test_view_uses_codec(app):
+    _, response = app.client.post(
+        uri=url_string(),
+        data=json.dumps(dict(query="{test}")),
+        headers={"content-type": "application/json"},
+    )
+
+    assert response.status == 200
+    assert response.body == b'{"data":{"test":"Hello World"}}'
+
+
+@pytest.mark.parametrize(
+    "app",
+    [create_app(encode=lambda data, pretty=False: json.dumps(data, indent=4))],
+)
+def test_custom_encode_takes_precedence(app):
+    _, response = app.client.get(uri=url_string(query="{test}"))
+
+    assert response.status == 200
+    assert response.body.decode() == json.dumps(
+        {"data": {"test": "Hello World"}}, indent=4
+    )
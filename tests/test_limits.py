@@ -0,0 +1,163 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from sanic_graphql.limits import (RequestTooLarge, read_streamed_body,
+                                  spool_streamed_body)
+
+from .app import create_app, url_string
+
+
+def response_json(response):
+    return json.loads(response.body.decode())
+
+
+def post_json(app, data):
+    return app.client.post(
+        uri=url_string(),
+        data=json.dumps(data),
+        headers={"content-type": "application/json"},
+    )
+
+
+@pytest.mark.parametrize(
+    "app",
+    [create_app(max_body_size=100), create_app(max_body_size=100, stream=True)],
+)
+def test_rejects_large_bodies(app):
+    _, response = post_json(app, dict(query="{test}"))
+    assert response.status == 200
+    assert response_json(response) == {"data": {"test": "Hello World"}}
+
+    _, response = post_json(app, dict(query="{test}", variables={"a": "x" * 100}))
+    assert response.status == 413
+    assert response_json(response) == {
+        "errors": [
+            {
+                "message": "Request body is larger than 100 bytes.",
+                "locations": None,
+                "path": None,
+            }
+        ]
+    }
+
+
+@pytest.mark.parametrize("app", [create_app(stream=True, max_body_size=1000)])
+def test_parses_streamed_multipart_forms(app):
+    _, response = app.client.post(
+        uri=url_string(),
+        files={"query": (None, "query helloWho($who: String){ test(who: $who) }")},
+        data={"variables": json.dumps({"who": "Dolly"})},
+    )
+
+    assert response.status == 200
+    assert response_json(response) == {"data": {"test": "Hello Dolly"}}
+
+
+@pytest.mark.parametrize("app", [create_app(stream=True, multipart_max_fields=2)])
+def test_rejects_streamed_multipart_forms_with_many_fields(app):
+    _, response = app.client.post(
+        uri=url_string(),
+        files={"query": (None, "{test}")},
+        data={"variables": "{}", "operationName": "", "extra": ""},
+    )
+
+    assert response.status == 413
+    assert response_json(response)["errors"][0]["message"] == (
+        "Form contains more than 2 fields."
+    )
+
+
+@pytest.mark.parametrize("app", [create_app(stream=True)])
+def test_streamed_route_answers_get_requests(app):
+    _, response = app.client.get(uri=url_string(query="{test}"))
+
+    assert response.status == 200
+    assert response_json(response) == {"data": {"test": "Hello World"}}
+
+
+@pytest.mark.parametrize("app", [create_app(batch=True, max_batch_size=2)])
+def test_rejects_large_batches(app):
+    _, response = post_json(app, [dict(query="{test}")] * 2)
+    assert response.status == 200
+
+    _, response = post_json(app, [dict(query="{test}")] * 3)
+    assert response.status == 413
+    assert response_json(response)["errors"][0]["message"] == (
+        "Batch request contains more than 2 operations."
+    )
+
+
+@pytest.mark.parametrize(
+    "app", [create_app(max_query_length=10, max_variables_size=20)]
+)
+def test_rejects_long_queries_and_variables(app):
+    _, response = app.client.get(uri=url_string(query="{ test test2: test }"))
+    assert response.status == 413
+    assert response_json(response)["errors"][0]["message"] == (
+        "Query is longer than 10 characters."
+    )
+
+    _, response = post_json(
+        app, dict(query="{test}", variables={"who": "a long variable value"})
+    )
+    assert response.status == 413
+    assert response_json(response)["errors"][0]["message"] == (
+        "Variables are larger than 20 bytes."
+    )
+
+
+class FakeStream:
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+
+    async def read(self):
+        return self.chunks.pop(0) if self.chunks else None
+
+
+class FakeRequest:
+    def __init__(self, chunks):
+        self.stream = FakeStream(chunks)
+
+
+@pytest.mark.asyncio
+async def test_stops_reading_streamed_body_at_limit():
+    chunks = [b"a" * 10, b"b" * 10, b"c" * 10]
+    assert await read_streamed_body(FakeRequest(chunks), 30) == b"".join(chunks)
+
+    request = FakeRequest(chunks)
+    with pytest.raises(RequestTooLarge):
+        await read_streamed_body(request, 15)
+    assert request.stream.chunks == [b"c" * 10]
+
+
+class RecordingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(1)
+        self.calls = 0
+
+    def submit(self, *args, **kwargs):
+        self.calls += 1
+        return super().submit(*args, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_spools_large_bodies_to_disk_in_executor():
+    chunks = [b"a" * 10, b"b" * 10, b"c" * 10, b"d" * 5, b"e" * 5]
+    executor = RecordingExecutor()
+    file = await spool_streamed_body(FakeRequest(chunks), 100, 15, executor)
+    try:
+        assert file.read() == b"".join(chunks)
+    finally:
+        file.close()
+    # Two writes of at least 15 bytes and the rest after the rollover
+    assert executor.calls == 3
+
+    executor = RecordingExecutor()
+    file = await spool_streamed_body(FakeRequest([b"a" * 10]), 100, 15, executor)
+    try:
+        assert file.read() == b"a" * 10
+    finally:
+        file.close()
+    assert executor.calls == 0
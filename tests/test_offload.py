@@ -0,0 +1,158 @@
+import json
+import sys
+import threading
+import time
+from asyncio import TimeoutError, wait_for
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+import pytest
+
+from graphql.type import (GraphQLField, GraphQLList, GraphQLObjectType,
+                          GraphQLSchema, GraphQLString)
+from sanic_graphql import GraphQLView
+from sanic_graphql.cache import LRUCache
+from sanic_graphql.offload import CancellationMiddleware, ExecutorQueue
+from sanic_graphql.timing import RequestTimings
+
+from .app import create_app, url_string
+
+executor = ThreadPoolExecutor(2)
+
+
+def resolve_items(*_):
+    time.sleep(0.05)
+    return ["a", "b"]
+
+
+ThreadSchema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "thread": GraphQLField(
+                GraphQLString, resolve=lambda *_: threading.current_thread().name
+            ),
+            "items": GraphQLField(GraphQLList(GraphQLString), resolve=resolve_items),
+        },
+    )
+)
+
+
+def response_json(response):
+    return json.loads(response.body.decode())
+
+
+@pytest.mark.parametrize("app", [create_app(schema=ThreadSchema, executor=executor)])
+def test_runs_sync_operations_in_the_executor(app):
+    _, response = app.client.get(uri=url_string(query="{ thread }"))
+
+    assert response.status == 200
+    thread = response_json(response)["data"]["thread"]
+    assert thread != threading.current_thread().name
+    assert thread.startswith("ThreadPoolExecutor")
+
+
+@pytest.mark.parametrize(
+    "app", [create_app(schema=ThreadSchema, executor=executor, batch=True)]
+)
+def test_runs_batched_operations_in_the_executor(app):
+    _, response = app.client.post(
+        uri=url_string(),
+        data=json.dumps([dict(query="{ items }"), dict(query="{ nothing }")]),
+        headers={"content-type": "application/json"},
+    )
+
+    assert response.status == 400
+    first, second = response_json(response)
+    assert first == {"data": {"items": ["a", "b"]}}
+    assert "Cannot query field 'nothing'" in second["errors"][0]["message"]
+
+
+@pytest.mark.parametrize(
+    "app", [create_app(schema=ThreadSchema, executor=executor, executor_max_pending=0)]
+)
+def test_rejects_operations_when_the_queue_is_full(app):
+    _, response = app.client.get(uri=url_string(query="{ thread }"))
+
+    assert response.status == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response_json(response)["errors"][0]["message"] == (
+        "Too many operations waiting for execution."
+    )
+
+
+def test_queue_is_exposed_on_the_view():
+    view = GraphQLView.as_view(schema=ThreadSchema, executor=executor)
+    assert view.executor_queue.executor is executor
+    assert GraphQLView.as_view(schema=ThreadSchema).executor_queue is None
+
+
+def test_process_pools_are_rejected():
+    with ProcessPoolExecutor(1) as pool:
+        with pytest.raises(TypeError):
+            ExecutorQueue(pool)
+
+
+@pytest.mark.asyncio
+async def test_cancelling_stops_the_running_operation():
+    queue = ExecutorQueue(ThreadPoolExecutor(1), max_pending=1)
+    started = threading.Event()
+    resolved = []
+    cancellation = CancellationMiddleware()
+
+    def resolve(name):
+        started.set()
+        time.sleep(0.05)
+        cancellation.resolve(lambda *_: resolved.append(name), None, None)
+
+    def operation():
+        resolve("first")
+        resolve("second")
+
+    with pytest.raises(TimeoutError):
+        await wait_for(queue.run([(operation, cancellation)]), 0.01)
+
+    assert started.is_set()
+    assert cancellation.cancelled.is_set()
+    queue.executor.shutdown()
+    assert resolved == []
+    assert queue.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelling_drops_operations_that_have_not_started():
+    queue = ExecutorQueue(ThreadPoolExecutor(1))
+    calls = []
+    slow = (partial(time.sleep, 0.05), CancellationMiddleware())
+    waiting = (partial(calls.append, "waiting"), CancellationMiddleware())
+
+    with pytest.raises(TimeoutError):
+        await wait_for(queue.run([slow, waiting]), 0.01)
+
+    queue.executor.shutdown()
+    assert calls == []
+    assert queue.pending == 0
+
+
+def test_caches_and_timings_can_be_shared_between_threads():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    cache = LRUCache(4)
+    timings = RequestTimings()
+
+    def use_cache(offset):
+        for i in range(5000):
+            cache.set((offset + i) % 8, i)
+            cache.get((offset + i + 1) % 8)
+            timings.add("execute", 1)
+
+    try:
+        with ThreadPoolExecutor(4) as pool:
+            for future in [pool.submit(use_cache, offset) for offset in range(4)]:
+                future.result()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert len(cache) == 4
+    assert cache.hits + cache.misses == 20000
+    assert timings.phases["execute"] == 20000
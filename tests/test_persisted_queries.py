@@ -0,0 +1,134 @@
+import json
+from hashlib import sha256
+
+import pytest
+
+from sanic_graphql.persisted_queries import (MemoryPersistedQueryStore,
+                                             PersistedQueryStore)
+
+from .app import create_app, url_string
+
+QUERY = "{test}"
+QUERY_HASH = sha256(QUERY.encode("utf8")).hexdigest()
+
+
+def response_json(response):
+    return json.loads(response.body.decode())
+
+
+def persisted_query_extensions(sha256_hash=QUERY_HASH, version=1):
+    return {"persistedQuery": {"version": version, "sha256Hash": sha256_hash}}
+
+
+@pytest.mark.parametrize("app", [create_app(persisted_queries=True)])
+def test_unknown_hash_returns_persisted_query_not_found(app):
+    _, response = app.client.get(
+        uri=url_string(extensions=json.dumps(persisted_query_extensions()))
+    )
+
+    assert response.status == 200
+    assert response_json(response) == {
+        "errors": [
+            {
+                "message": "PersistedQueryNotFound",
+                "locations": None,
+                "path": None,
+                "extensions": {"code": "PERSISTED_QUERY_NOT_FOUND"},
+            }
+        ]
+    }
+
+
+@pytest.mark.parametrize("app", [create_app(persisted_queries=True)])
+def test_registers_query_and_serves_it_by_hash(app):
+    _, response = app.client.post(
+        uri=url_string(),
+        data=json.dumps(dict(query=QUERY, extensions=persisted_query_extensions())),
+        headers={"content-type": "application/json"},
+    )
+    assert response.status == 200
+    assert response_json(response) == {"data": {"test": "Hello World"}}
+
+    _, response = app.client.get(
+        uri=url_string(extensions=json.dumps(persisted_query_extensions()))
+    )
+    assert response.status == 200
+    assert response_json(response) == {"data": {"test": "Hello World"}}
+
+
+@pytest.mark.parametrize("app", [create_app(persisted_queries=True)])
+def test_persisted_query_uses_request_variables(app):
+    query = "query helloWho($who: String){ test(who: $who) }"
+    extensions = persisted_query_extensions(
+        sha256(query.encode("utf8")).hexdigest()
+    )
+    app.client.post(
+        uri=url_string(),
+        data=json.dumps(dict(query=query, extensions=extensions)),
+        headers={"content-type": "application/json"},
+    )
+
+    _, response = app.client.get(
+        uri=url_string(
+            extensions=json.dumps(extensions), variables=json.dumps({"who": "Dolly"})
+        )
+    )
+    assert response.status == 200
+    assert response_json(response) == {"data": {"test": "Hello Dolly"}}
+
+
+@pytest.mark.parametrize("app", [create_app(persisted_queries=True)])
+def test_rejects_hash_not_matching_query(app):
+    _, response = app.client.post(
+        uri=url_string(),
+        data=json.dumps(
+            dict(query="{ test }", extensions=persisted_query_extensions("abc"))
+        ),
+        headers={"content-type": "application/json"},
+    )
+
+    assert response.status == 400
+    assert response_json(response)["errors"][0]["message"] == (
+        "Provided sha256Hash does not match query."
+    )
+
+
+@pytest.mark.parametrize("app", [create_app(persisted_queries=True)])
+def test_rejects_unsupported_persisted_query_version(app):
+    _, response = app.client.get(
+        uri=url_string(extensions=json.dumps(persisted_query_extensions(version=2)))
+    )
+
+    assert response.status == 400
+
+
+class PrefilledStore(PersistedQueryStore):
+    async def get(self, sha256_hash):
+        return {QUERY_HASH: QUERY}.get(sha256_hash)
+
+    async def set(self, sha256_hash, query):
+        raise AssertionError("Query should not be stored.")
+
+
+@pytest.mark.parametrize(
+    "app", [create_app(batch=True, persisted_query_store=PrefilledStore())]
+)
+def test_custom_store_in_batch(app):
+    _, response = app.client.post(
+        uri=url_string(),
+        data=json.dumps([dict(extensions=persisted_query_extensions())]),
+        headers={"content-type": "application/json"},
+    )
+
+    assert response.status == 200
+    assert response_json(response) == [{"data": {"test": "Hello World"}}]
+
+
+@pytest.mark.asyncio
+async def test_memory_store_evicts_least_recently_used():
+    store = MemoryPersistedQueryStore(maxsize=1)
+    await store.set("a", "{a}")
+    await store.set("b", "{b}")
+
+    assert await store.get("a") is None
+    assert await store.get("b") == "{b}"
@@ -0,0 +1,164 @@
+import json
+
+import pytest
+
+from graphql.language import parse
+from graphql.type import (GraphQLArgument, GraphQLField, GraphQLInt,
+                          GraphQLList, GraphQLObjectType, GraphQLSchema,
+                          GraphQLString)
+from sanic_graphql.rate_limit import MemoryRateLimitStore, operation_cost
+
+from .app import create_app, url_string
+
+UserType = GraphQLObjectType(
+    name="User",
+    fields=lambda: {
+        "name": GraphQLField(GraphQLString),
+        "friends": GraphQLField(GraphQLList(UserType)),
+    },
+)
+
+UserSchema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "user": GraphQLField(UserType),
+            "users": GraphQLField(
+                GraphQLList(UserType), args={"first": GraphQLArgument(GraphQLInt)}
+            ),
+        },
+    )
+)
+
+
+def response_json(response):
+    return json.loads(response.body.decode())
+
+
+def get_query(app, query, **headers):
+    return app.client.get(uri=url_string(query=query), headers=headers)
+
+
+@pytest.mark.parametrize("app", [create_app(rate_limit=0.01, rate_limit_burst=2)])
+def test_rejects_requests_over_the_rate_limit(app):
+    for _ in range(2):
+        _, response = get_query(app, "{ test }")
+        assert response.status == 200
+
+    _, response = get_query(app, "{ test }")
+    assert response.status == 429
+    assert response.headers["Retry-After"] == "100"
+    error = response_json(response)["errors"][0]
+    assert error["message"] == "Rate limit exceeded, retry in 100 seconds."
+    assert error["extensions"] == {"code": "RATE_LIMITED"}
+
+
+@pytest.mark.parametrize(
+    "app",
+    [
+        create_app(
+            rate_limit=0.01,
+            rate_limit_burst=1,
+            rate_limit_key=lambda request: request.headers.get("x-api-key"),
+        )
+    ],
+)
+def test_rate_limits_clients_by_key(app):
+    _, response = get_query(app, "{ test }", **{"x-api-key": "a"})
+    assert response.status == 200
+    _, response = get_query(app, "{ test }", **{"x-api-key": "b"})
+    assert response.status == 200
+    _, response = get_query(app, "{ test }", **{"x-api-key": "a"})
+    assert response.status == 429
+
+    # Clients without a key are not rate limited
+    for _ in range(2):
+        _, response = get_query(app, "{ test }")
+        assert response.status == 200
+
+
+@pytest.mark.parametrize(
+    "app", [create_app(rate_limit=0.01, rate_limit_burst=3, batch=True)]
+)
+def test_charges_every_operation_of_a_batch(app):
+    for status in (200, 429):
+        _, response = app.client.post(
+            uri=url_string(),
+            data=json.dumps([{"query": "{ test }"}] * 2),
+            headers={"content-type": "application/json"},
+        )
+        assert response.status == status
+
+
+@pytest.mark.parametrize(
+    "app",
+    [
+        create_app(
+            rate_limit=0.01,
+            rate_limit_burst=10,
+            rate_limit_cost=operation_cost(field_costs={"QueryRoot.test": 4}),
+        )
+    ],
+)
+def test_charges_the_cost_of_operations(app):
+    for _ in range(2):
+        _, response = get_query(app, "{ test }")
+        assert response.status == 200
+
+    _, response = get_query(app, "{ a: test b: test }")
+    assert response.status == 429
+    # Only the first token was taken
+    _, response = get_query(app, "{ test }")
+    assert response.status == 429
+
+
+@pytest.mark.asyncio
+async def test_memory_store_refills_buckets(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("sanic_graphql.rate_limit.monotonic", lambda: now[0])
+    store = MemoryRateLimitStore()
+
+    assert await store.consume("a", 2, rate=1, capacity=2) == 0
+    assert await store.consume("a", 1, rate=1, capacity=2) == 1
+    now[0] += 0.5
+    assert await store.consume("a", 1, rate=1, capacity=2) == 0.5
+    now[0] += 10
+    assert await store.consume("a", 5, rate=1, capacity=2) == 0
+    assert await store.consume("a", 1, rate=1, capacity=2) == 1
+
+
+@pytest.mark.parametrize(
+    "app",
+    [
+        create_app(
+            rate_limit=0.01,
+            rate_limit_burst=5,
+            rate_limit_cost=operation_cost(field_costs={"QueryRoot.test": 100}),
+            incremental_delivery=True,
+        )
+    ],
+)
+def test_charges_the_cost_of_deferred_operations(app):
+    _, response = app.client.get(
+        uri=url_string(query="{ ... @defer { test } }"),
+        headers={"accept": "multipart/mixed"},
+    )
+    assert response.status == 429
+
+
+def test_charges_list_sizes_given_as_variables():
+    cost = operation_cost(list_size_arguments=("first",))
+    document = parse("query ($n: Int) { users(first: $n) { name } }")
+    assert cost(UserSchema, document, None, {"n": 7}) == 7 * 2
+
+
+def test_measures_deeply_nested_fragments_quickly():
+    cost = operation_cost()
+    fragments = "".join(
+        f"fragment F{i} on User {{ friends {{ ...F{i + 1} ...F{i + 1} }} }} "
+        for i in range(40)
+    )
+    document = parse(
+        "{ user { ...F0 } } " + fragments + "fragment F40 on User { name }"
+    )
+    assert cost(UserSchema, document, None) == 2 ** 41
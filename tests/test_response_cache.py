@@ -0,0 +1,160 @@
+import json
+
+import pytest
+
+from graphql.type import (GraphQLField, GraphQLInt, GraphQLObjectType,
+                          GraphQLSchema)
+from sanic_graphql.response_cache import CachedResponse, MemoryResponseCache
+
+from .app import create_app, url_string
+
+counter = {"count": 0}
+
+
+def resolve_count(*_):
+    counter["count"] += 1
+    return counter["count"]
+
+
+def resolve_raises(*_):
+    raise ValueError("Throws!")
+
+
+CounterSchema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "count": GraphQLField(GraphQLInt, resolve=resolve_count),
+            "thrower": GraphQLField(GraphQLInt, resolve=resolve_raises),
+        },
+    ),
+    GraphQLObjectType(
+        name="Mutation",
+        fields={"count": GraphQLField(GraphQLInt, resolve=resolve_count)},
+    ),
+)
+
+
+def response_json(response):
+    return json.loads(response.body.decode())
+
+
+@pytest.mark.parametrize(
+    "app", [create_app(schema=CounterSchema, response_cache=True)]
+)
+def test_caches_get_responses(app):
+    counter["count"] = 0
+    _, first = app.client.get(uri=url_string(query="{count}"))
+    _, second = app.client.get(uri=url_string(query="{count}"))
+
+    assert first.status == second.status == 200
+    assert response_json(first) == response_json(second) == {"data": {"count": 1}}
+    assert first.headers["ETag"] == second.headers["ETag"]
+    assert first.headers["Cache-Control"] == "max-age=60"
+
+
+@pytest.mark.parametrize(
+    "app", [create_app(schema=CounterSchema, response_cache=True)]
+)
+def test_answers_if_none_match_with_not_modified(app):
+    counter["count"] = 0
+    _, response = app.client.get(uri=url_string(query="{ count }"))
+    etag = response.headers["ETag"]
+
+    _, response = app.client.get(
+        uri=url_string(query="{ count }"), headers={"If-None-Match": etag}
+    )
+
+    assert response.status == 304
+    assert response.body == b""
+    assert response.headers["ETag"] == etag
+    assert counter["count"] == 1
+
+
+@pytest.mark.parametrize(
+    "app",
+    [
+        create_app(
+            schema=CounterSchema,
+            response_cache=True,
+            response_cache_vary=lambda request: request.headers.get("Authorization"),
+            cache_control="private, max-age=5",
+        )
+    ],
+)
+def test_response_cache_varies_on_request(app):
+    counter["count"] = 0
+    _, first = app.client.get(
+        uri=url_string(query="{count}"), headers={"Authorization": "a"}
+    )
+    _, second = app.client.get(
+        uri=url_string(query="{count}"), headers={"Authorization": "b"}
+    )
+
+    assert response_json(first) == {"data": {"count": 1}}
+    assert response_json(second) == {"data": {"count": 2}}
+    assert second.headers["Cache-Control"] == "private, max-age=5"
+
+
+@pytest.mark.parametrize(
+    "app",
+    [
+        create_app(
+            schema=CounterSchema,
+            response_cache=True,
+            response_cache_ttl=30,
+            response_cache_vary=lambda request: request.headers.get("Authorization"),
+        )
+    ],
+)
+def test_responses_varying_on_request_are_private(app):
+    _, response = app.client.get(
+        uri=url_string(query="{count}"), headers={"Authorization": "a"}
+    )
+
+    assert response.headers["Cache-Control"] == "private, max-age=30"
+
+
+@pytest.mark.parametrize(
+    "app", [create_app(schema=CounterSchema, response_cache=True)]
+)
+def test_does_not_cache_post_requests_and_errors(app):
+    counter["count"] = 0
+    for _ in range(2):
+        _, response = app.client.post(
+            uri=url_string(),
+            data=json.dumps(dict(query="{count}")),
+            headers={"content-type": "application/json"},
+        )
+        assert "ETag" not in response.headers
+
+        _, response = app.client.get(uri=url_string(query="{unknown}"))
+        assert response.status == 400
+        assert "ETag" not in response.headers
+
+    assert counter["count"] == 2
+
+
+@pytest.mark.parametrize(
+    "app", [create_app(schema=CounterSchema, response_cache=True)]
+)
+def test_does_not_cache_results_with_field_errors(app):
+    counter["count"] = 0
+    for count in (1, 2):
+        _, response = app.client.get(uri=url_string(query="{ count thrower }"))
+        assert response.status == 200
+        assert response_json(response)["data"] == {"count": count, "thrower": None}
+        assert "ETag" not in response.headers
+        assert "Cache-Control" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_memory_response_cache_expires_entries():
+    cache = MemoryResponseCache()
+    response = CachedResponse(b"{}", '"etag"')
+    await cache.set("fresh", response, ttl=60)
+    await cache.set("stale", response, ttl=0)
+
+    assert await cache.get("fresh") == response
+    assert await cache.get("stale") is None
+    assert len(cache.cache) == 1
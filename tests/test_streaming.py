@@ -0,0 +1,113 @@
+import json
+
+import pytest
+
+from graphql.type import (GraphQLArgument, GraphQLField, GraphQLInt,
+                          GraphQLList, GraphQLObjectType, GraphQLSchema,
+                          GraphQLString)
+from sanic_graphql.streaming import iter_encode
+
+from .app import create_app, url_string
+
+RowType = GraphQLObjectType(
+    name="Row",
+    fields={"id": GraphQLField(GraphQLInt), "name": GraphQLField(GraphQLString)},
+)
+
+ListSchema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "rows": GraphQLField(
+                GraphQLList(RowType),
+                args={"count": GraphQLArgument(GraphQLInt)},
+                resolve=lambda obj, info, count: [
+                    {"id": i, "name": f"row {i}"} for i in range(count)
+                ],
+            ),
+            "test": GraphQLField(GraphQLString, resolve=lambda *_: "Hello World"),
+        },
+    )
+)
+
+
+def response_json(response):
+    return json.loads(response.body.decode())
+
+
+def dumps(data):
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"data": {"rows": [{"id": 1}, {"id": 2, "tags": ["a"]}], "empty": []}},
+        {"data": None, "errors": [{"message": "Error", "path": None}]},
+        {"data": {"nested": {"deeper": {"deepest": [1, 2]}}}},
+    ],
+)
+def test_iter_encode_produces_valid_json(data):
+    assert b"".join(iter_encode(data, dumps)) == dumps(data)
+
+
+def test_iter_encode_splits_top_level_lists():
+    pieces = list(iter_encode({"data": {"rows": [{"id": 1}, {"id": 2}]}}, dumps))
+
+    assert b'{"id":1}' in pieces
+    assert b'{"id":2}' in pieces
+
+
+@pytest.mark.parametrize(
+    "app",
+    [create_app(schema=ListSchema, stream_response=True, stream_chunk_size=100)],
+)
+def test_streams_large_list(app):
+    _, response = app.client.get(
+        uri=url_string(query="{ rows(count: 1000) { id name } }")
+    )
+
+    assert response.status == 200
+    assert response.headers["Content-Type"] == "application/json"
+    assert response_json(response) == {
+        "data": {"rows": [{"id": i, "name": f"row {i}"} for i in range(1000)]}
+    }
+
+
+@pytest.mark.parametrize(
+    "app", [create_app(schema=ListSchema, stream_response=True, batch=True)]
+)
+def test_streams_batch(app):
+    _, response = app.client.post(
+        uri=url_string(),
+        data=json.dumps(
+            [dict(query="{ rows(count: 2) { id } }"), dict(query="{test}")]
+        ),
+        headers={"content-type": "application/json"},
+    )
+
+    assert response.status == 200
+    assert response_json(response) == [
+        {"data": {"rows": [{"id": 0}, {"id": 1}]}},
+        {"data": {"test": "Hello World"}},
+    ]
+
+
+@pytest.mark.parametrize("app", [create_app(schema=ListSchema, stream_response=True)])
+def test_streams_errors_with_status(app):
+    _, response = app.client.get(uri=url_string(query="{ unknown }"))
+
+    assert response.status == 400
+    assert response_json(response)["errors"][0]["message"] == (
+        "Cannot query field 'unknown' on type 'Query'."
+    )
+
+
+@pytest.mark.parametrize("app", [create_app(schema=ListSchema, stream_response=True)])
+def test_does_not_stream_pretty_responses(app):
+    _, response = app.client.get(uri=url_string(query="{test}", pretty="1"))
+
+    assert response.status == 200
+    assert response.body.decode() == (
+        "{\n" '  "data": {\n' '    "test": "Hello World"\n' "  }\n" "}"
+    )
@@ -0,0 +1,246 @@
+import json
+from asyncio import Queue, ensure_future, sleep, wait_for
+
+import pytest
+from websockets.exceptions import ConnectionClosed
+
+from graphql.type import (GraphQLArgument, GraphQLField, GraphQLInt,
+                          GraphQLObjectType, GraphQLSchema, GraphQLString)
+from sanic_graphql import GraphQLWSView
+
+
+async def count_to(_root, _info, to=3):
+    for i in range(1, to + 1):
+        yield i
+
+
+async def fail_after_one(_root, _info):
+    yield 1
+    raise ValueError("Source failed")
+
+
+CountSchema = GraphQLSchema(
+    query=GraphQLObjectType(
+        name="Query",
+        fields={"hello": GraphQLField(GraphQLString, resolve=lambda *_: "world")},
+    ),
+    subscription=GraphQLObjectType(
+        name="Subscription",
+        fields={
+            "count": GraphQLField(
+                GraphQLInt,
+                args={"to": GraphQLArgument(GraphQLInt)},
+                subscribe=count_to,
+                resolve=lambda value, _info, **_args: value,
+            ),
+            "forever": GraphQLField(
+                GraphQLInt,
+                subscribe=lambda *_: forever(),
+                resolve=lambda value, _info: value,
+            ),
+            "failing": GraphQLField(
+                GraphQLInt,
+                subscribe=fail_after_one,
+                resolve=lambda value, _info: value,
+            ),
+        },
+    ),
+)
+
+
+async def forever():
+    while True:
+        await sleep(0.01)
+        yield 1
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.incoming = Queue()
+        self.outgoing = Queue()
+        self.close_code = None
+
+    async def recv(self):
+        message = await self.incoming.get()
+        if message is None:
+            raise ConnectionClosed(self.close_code or 1000, "")
+        return message
+
+    async def send(self, message):
+        await self.outgoing.put(json.loads(message))
+
+    async def close(self, code=1000, reason=""):
+        self.close_code = code
+        await self.incoming.put(None)
+
+    def push(self, message):
+        self.incoming.put_nowait(json.dumps(message))
+
+    async def receive(self):
+        return await wait_for(self.outgoing.get(), 1)
+
+
+@pytest.fixture
+async def ws():
+    ws = FakeWebSocket()
+    view = GraphQLWSView.as_view(schema=CountSchema, keep_alive_interval=0)
+    task = ensure_future(view(None, ws))
+    yield ws
+    await ws.close()
+    await wait_for(task, 1)
+
+
+async def acknowledge(ws):
+    ws.push({"type": "connection_init"})
+    assert await ws.receive() == {"type": "connection_ack"}
+
+
+@pytest.mark.asyncio
+async def test_acknowledges_connection_and_answers_pings(ws):
+    await acknowledge(ws)
+    ws.push({"type": "ping"})
+    assert await ws.receive() == {"type": "pong"}
+
+
+@pytest.mark.asyncio
+async def test_streams_subscription_events(ws):
+    await acknowledge(ws)
+    ws.push(
+        {
+            "id": "1",
+            "type": "subscribe",
+            "payload": {"query": "subscription { count(to: 2) }"},
+        }
+    )
+
+    assert await ws.receive() == {
+        "id": "1",
+        "type": "next",
+        "payload": {"data": {"count": 1}},
+    }
+    assert await ws.receive() == {
+        "id": "1",
+        "type": "next",
+        "payload": {"data": {"count": 2}},
+    }
+    assert await ws.receive() == {"id": "1", "type": "complete"}
+
+
+@pytest.mark.asyncio
+async def test_executes_queries(ws):
+    await acknowledge(ws)
+    ws.push({"id": "q", "type": "subscribe", "payload": {"query": "{ hello }"}})
+
+    assert await ws.receive() == {
+        "id": "q",
+        "type": "next",
+        "payload": {"data": {"hello": "world"}},
+    }
+    assert await ws.receive() == {"id": "q", "type": "complete"}
+
+
+@pytest.mark.asyncio
+async def test_sends_validation_errors(ws):
+    await acknowledge(ws)
+    ws.push({"id": "e", "type": "subscribe", "payload": {"query": "{ unknown }"}})
+
+    message = await ws.receive()
+    assert message["id"] == "e"
+    assert message["type"] == "error"
+    assert "unknown" in message["payload"][0]["message"]
+
+
+@pytest.mark.asyncio
+async def test_sends_errors_of_failing_source_streams(ws):
+    await acknowledge(ws)
+    subscribe = {
+        "id": "x",
+        "type": "subscribe",
+        "payload": {"query": "subscription { failing }"},
+    }
+    for _ in range(2):
+        ws.push(subscribe)
+        assert await ws.receive() == {
+            "id": "x",
+            "type": "next",
+            "payload": {"data": {"failing": 1}},
+        }
+        assert await ws.receive() == {
+            "id": "x",
+            "type": "error",
+            "payload": [
+                {"message": "Source failed", "locations": None, "path": None}
+            ],
+        }
+
+    assert ws.close_code is None
+
+
+@pytest.mark.asyncio
+async def test_client_can_complete_subscription(ws):
+    await acknowledge(ws)
+    ws.push(
+        {
+            "id": "f",
+            "type": "subscribe",
+            "payload": {"query": "subscription { forever }"},
+        }
+    )
+    assert (await ws.receive())["type"] == "next"
+
+    ws.push({"id": "f", "type": "complete"})
+    ws.push({"type": "ping"})
+    while True:
+        message = await ws.receive()
+        if message["type"] == "pong":
+            break
+        assert message["type"] == "next"
+
+    await sleep(0.05)
+    assert ws.outgoing.empty()
+
+
+@pytest.mark.asyncio
+async def test_closes_on_subscribe_before_acknowledgement(ws):
+    ws.push({"id": "1", "type": "subscribe", "payload": {"query": "{ hello }"}})
+    await sleep(0.01)
+
+    assert ws.close_code == 4401
+
+
+@pytest.mark.asyncio
+async def test_closes_on_duplicate_operation_id(ws):
+    await acknowledge(ws)
+    message = {
+        "id": "1",
+        "type": "subscribe",
+        "payload": {"query": "subscription { forever }"},
+    }
+    ws.push(message)
+    ws.push(message)
+    await sleep(0.01)
+
+    assert ws.close_code == 4409
+
+
+@pytest.mark.asyncio
+async def test_closes_on_invalid_message(ws):
+    ws.incoming.put_nowait("not json")
+    await sleep(0.01)
+
+    assert ws.close_code == 4400
+
+
+@pytest.mark.asyncio
+async def test_on_connect_can_reject_connection():
+    ws = FakeWebSocket()
+    view = GraphQLWSView.as_view(
+        schema=CountSchema,
+        keep_alive_interval=0,
+        on_connect=lambda request, payload: payload.get("token") == "secret",
+    )
+    task = ensure_future(view(None, ws))
+    ws.push({"type": "connection_init", "payload": {"token": "wrong"}})
+    await wait_for(task, 1)
+
+    assert ws.close_code == 4403
@@ -0,0 +1,225 @@
+import asyncio
+import json
+import socket
+
+import pytest
+from sanic import Sanic
+from sanic.testing import SanicTestClient
+
+from graphql.execution import MiddlewareManager
+from graphql.type import (GraphQLArgument, GraphQLField, GraphQLInt,
+                          GraphQLNonNull, GraphQLObjectType, GraphQLSchema,
+                          GraphQLString)
+from sanic_graphql import GraphQLView
+
+from .app import create_app, url_string
+
+timings = []
+cancelled = []
+
+
+async def resolve_slow(*_):
+    try:
+        await asyncio.sleep(1)
+    except asyncio.CancelledError:
+        cancelled.append(True)
+        raise
+    return "slow"
+
+
+SlowSchema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "fast": GraphQLField(GraphQLString, resolve=lambda *_: "fast"),
+            "slow": GraphQLField(GraphQLString, resolve=resolve_slow),
+            "required": GraphQLField(
+                GraphQLNonNull(GraphQLString), resolve=resolve_slow
+            ),
+        },
+    )
+)
+
+
+async def batch_load_slowly(keys):
+    await asyncio.sleep(1)
+    return [f"name {key}" for key in keys]
+
+
+async def resolve_name_later(obj, info, id):
+    return await info.context["loaders"]["names"].load(id)
+
+
+LoaderSchema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "name": GraphQLField(
+                GraphQLString,
+                args={"id": GraphQLArgument(GraphQLInt)},
+                resolve=lambda obj, info, id: info.context["loaders"]["names"].load(
+                    id
+                ),
+            ),
+            "nameLater": GraphQLField(
+                GraphQLString,
+                args={"id": GraphQLArgument(GraphQLInt)},
+                resolve=resolve_name_later,
+            ),
+        },
+    )
+)
+
+
+def response_json(response):
+    return json.loads(response.body.decode())
+
+
+@pytest.mark.parametrize(
+    "app",
+    [create_app(schema=SlowSchema, enable_async=True, execution_timeout=0.05)],
+)
+def test_returns_partial_results_of_timed_out_operations(app):
+    del cancelled[:]
+    _, response = app.client.get(uri=url_string(query="{ fast slow }"))
+
+    assert response.status == 200
+    assert response_json(response) == {
+        "data": {"fast": "fast", "slow": None},
+        "errors": [
+            {
+                "message": "Operation timed out after 0.05 seconds.",
+                "locations": [{"line": 1, "column": 8}],
+                "path": ["slow"],
+                "extensions": {"code": "TIMEOUT"},
+            }
+        ],
+    }
+    assert cancelled == [True]
+
+
+def upper_middleware(next_, root, info, **args):
+    result = next_(root, info, **args)
+    return result.upper() if isinstance(result, str) else result
+
+
+@pytest.mark.parametrize(
+    "app",
+    [
+        create_app(
+            schema=SlowSchema,
+            enable_async=True,
+            execution_timeout=0.05,
+            middleware=MiddlewareManager(upper_middleware),
+        )
+    ],
+)
+def test_adds_timeouts_to_middleware_managers(app):
+    _, response = app.client.get(uri=url_string(query="{ fast slow }"))
+
+    assert response.status == 200
+    assert response_json(response)["data"] == {"fast": "FAST", "slow": None}
+    assert response_json(response)["errors"][0]["extensions"] == {"code": "TIMEOUT"}
+
+
+@pytest.mark.parametrize(
+    "app",
+    [
+        create_app(
+            schema=SlowSchema,
+            enable_async=True,
+            execution_timeout=0.05,
+            timing_callback=lambda request, request_timings: timings.append(
+                request_timings
+            ),
+        )
+    ],
+)
+def test_answers_with_504_when_nothing_was_resolved_in_time(app):
+    del timings[:]
+    _, response = app.client.get(uri=url_string(query="{ fast required }"))
+
+    assert response.status == 504
+    assert response_json(response)["data"] is None
+    assert response_json(response)["errors"][0]["extensions"] == {"code": "TIMEOUT"}
+    assert timings[0].timeouts == 1
+
+
+@pytest.mark.parametrize(
+    "app",
+    [
+        create_app(
+            schema=LoaderSchema,
+            enable_async=True,
+            execution_timeout=0.05,
+            loaders={"names": batch_load_slowly},
+        )
+    ],
+)
+def test_times_out_fields_sharing_a_loader_key(app):
+    _, response = app.client.get(
+        uri=url_string(
+            query="{ a: name(id: 1) b: name(id: 1) c: nameLater(id: 1) }"
+        )
+    )
+
+    assert response.status == 200
+    result = response_json(response)
+    assert result["data"] == {"a": None, "b": None, "c": None}
+    assert [error["path"] for error in result["errors"]] == [["a"], ["b"], ["c"]]
+    assert {error["message"] for error in result["errors"]} == {
+        "Operation timed out after 0.05 seconds."
+    }
+
+
+class ReportView(GraphQLView):
+    def get_execution_timeout(self, request, params):
+        if params.operation_name == "Report":
+            return None
+        return super().get_execution_timeout(request, params)
+
+
+def test_execution_timeout_can_be_overridden_per_operation():
+    app = Sanic(__name__)
+    app.add_route(
+        ReportView.as_view(
+            schema=SlowSchema, enable_async=True, execution_timeout=0.01
+        ),
+        "/graphql",
+    )
+    client = SanicTestClient(app)
+
+    _, response = client.get(
+        uri=url_string(query="query Report { slow }", operationName="Report")
+    )
+    assert response_json(response) == {"data": {"slow": "slow"}}
+
+    _, response = client.get(
+        uri=url_string(query="query Other { slow }", operationName="Other")
+    )
+    assert response_json(response)["data"] == {"slow": None}
+
+
+@pytest.mark.asyncio
+async def test_cancels_execution_when_the_client_disconnects():
+    del cancelled[:]
+    app = create_app(schema=SlowSchema, enable_async=True)
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = await app.create_server(sock=sock, return_asyncio_server=True)
+    try:
+        host, port = sock.getsockname()
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(
+            f"GET {url_string(query='{ slow }')} HTTP/1.1\r\n"
+            f"Host: {host}\r\n\r\n".encode()
+        )
+        await writer.drain()
+        await asyncio.sleep(0.1)
+        writer.close()
+        await asyncio.sleep(0.1)
+
+        assert cancelled == [True]
+    finally:
+        server.close()
+        await server.wait_closed()
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from .app import create_app, url_string
+from .schema import AsyncSchema
+
+
+def response_json(response):
+    return json.loads(response.body.decode())
+
+
+@pytest.mark.parametrize(
+    "app",
+    [create_app(tracing=True), create_app(tracing=True, enable_async=True)],
+)
+def test_adds_tracing_extension(app):
+    _, response = app.client.get(uri=url_string(query="{test}"))
+
+    assert response.status == 200
+    result = response_json(response)
+    assert result["data"] == {"test": "Hello World"}
+
+    tracing = result["extensions"]["tracing"]
+    assert tracing["version"] == 1
+    assert tracing["startTime"].endswith("Z")
+    assert tracing["duration"] >= 0
+    [resolver] = tracing["execution"]["resolvers"]
+    assert resolver["path"] == ["test"]
+    assert resolver["parentType"] == "QueryRoot"
+    assert resolver["fieldName"] == "test"
+    assert resolver["returnType"] == "String"
+    assert 0 <= resolver["startOffset"] <= tracing["duration"]
+
+
+@pytest.mark.parametrize(
+    "app", [create_app(schema=AsyncSchema, enable_async=True, tracing=True)]
+)
+def test_traces_async_resolvers(app):
+    _, response = app.client.get(uri=url_string(query="{a,b,c}"))
+
+    assert response.status == 200
+    resolvers = {
+        resolver["fieldName"]: resolver
+        for resolver in response_json(response)["extensions"]["tracing"]["execution"][
+            "resolvers"
+        ]
+    }
+    assert set(resolvers) == {"a", "b", "c"}
+    # resolver b sleeps for 3 milliseconds
+    assert resolvers["b"]["duration"] >= 3_000_000
+
+
+@pytest.mark.parametrize("app", [create_app(tracing=True, batch=True)])
+def test_traces_every_operation_of_a_batch(app):
+    _, response = app.client.post(
+        uri=url_string(),
+        data=json.dumps([dict(query="{test}"), dict(query="{a: test, b: test}")]),
+        headers={"content-type": "application/json"},
+    )
+
+    assert response.status == 200
+    first, second = response_json(response)
+    assert len(first["extensions"]["tracing"]["execution"]["resolvers"]) == 1
+    assert len(second["extensions"]["tracing"]["execution"]["resolvers"]) == 2
+
+
+traces = []
+
+
+@pytest.mark.parametrize("app", [create_app(tracing_sink=traces.append)])
+def test_sends_traces_to_sink(app):
+    traces.clear()
+    _, response = app.client.get(uri=url_string(query="{test}"))
+
+    assert response.status == 200
+    assert "extensions" not in response_json(response)
+    [trace] = traces
+    assert trace["execution"]["resolvers"][0]["path"] == ["test"]
+
+
+@pytest.mark.parametrize(
+    "app", [create_app(tracing_sink=traces.append, tracing_sample_rate=0)]
+)
+def test_samples_traces(app):
+    traces.clear()
+    app.client.get(uri=url_string(query="{test}"))
+
+    assert traces == []
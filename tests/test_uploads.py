@@ -0,0 +1,182 @@
+import json
+from io import BytesIO
+
+import pytest
+
+from graphql.type import (GraphQLArgument, GraphQLField, GraphQLList,
+                          GraphQLNonNull, GraphQLObjectType, GraphQLSchema,
+                          GraphQLString)
+from sanic_graphql import GraphQLUpload
+
+from .app import create_app, url_string
+
+
+async def resolve_upload(_root, _info, file):
+    content = await file.read()
+    return f"{file.filename} ({file.content_type}): {content.decode()}"
+
+
+async def resolve_uploads(_root, _info, files):
+    sizes = []
+    for file in files:
+        size = 0
+        async for chunk in file:
+            size += len(chunk)
+        sizes.append(str(size))
+    return ",".join(sizes)
+
+
+UploadSchema = GraphQLSchema(
+    query=GraphQLObjectType(
+        name="Query", fields={"ok": GraphQLField(GraphQLString)}
+    ),
+    mutation=GraphQLObjectType(
+        name="Mutation",
+        fields={
+            "upload": GraphQLField(
+                GraphQLString,
+                args={"file": GraphQLArgument(GraphQLNonNull(GraphQLUpload))},
+                resolve=resolve_upload,
+            ),
+            "uploads": GraphQLField(
+                GraphQLString,
+                args={
+                    "files": GraphQLArgument(
+                        GraphQLList(GraphQLNonNull(GraphQLUpload))
+                    )
+                },
+                resolve=resolve_uploads,
+            ),
+        },
+    ),
+)
+
+
+def response_json(response):
+    return json.loads(response.body.decode())
+
+
+def post_multipart(app, operations, file_map, files):
+    return app.client.post(
+        uri=url_string(),
+        data={"operations": json.dumps(operations), "map": json.dumps(file_map)},
+        files={
+            name: (filename, BytesIO(content), *content_type)
+            for name, (filename, content, *content_type) in files.items()
+        },
+    )
+
+
+upload_apps = [
+    create_app(schema=UploadSchema, enable_async=True),
+    create_app(schema=UploadSchema, enable_async=True, stream=True),
+]
+
+
+@pytest.mark.parametrize("app", upload_apps)
+def test_uploads_single_file(app):
+    _, response = post_multipart(
+        app,
+        {
+            "query": "mutation($file: Upload!) { upload(file: $file) }",
+            "variables": {"file": None},
+        },
+        {"0": ["variables.file"]},
+        {"0": ("a.txt", b"Hello upload", "text/plain")},
+    )
+
+    assert response.status == 200
+    assert response_json(response) == {
+        "data": {"upload": "a.txt (text/plain): Hello upload"}
+    }
+
+
+@pytest.mark.parametrize(
+    "app", [create_app(schema=UploadSchema, enable_async=True, max_variables_size=40)]
+)
+def test_limits_the_size_of_variables_with_uploads(app):
+    query = "mutation($file: Upload!) { upload(file: $file) }"
+    files = {"0": ("a.txt", b"Hello upload", "text/plain")}
+
+    _, response = post_multipart(
+        app,
+        {"query": query, "variables": {"file": None}},
+        {"0": ["variables.file"]},
+        files,
+    )
+    assert response.status == 200
+
+    _, response = post_multipart(
+        app,
+        {"query": query, "variables": {"file": None, "padding": "x" * 40}},
+        {"0": ["variables.file"]},
+        files,
+    )
+    assert response.status == 413
+    assert response_json(response)["errors"][0]["message"] == (
+        "Variables are larger than 40 bytes."
+    )
+
+
+@pytest.mark.parametrize("app", upload_apps)
+def test_uploads_file_lists(app):
+    _, response = post_multipart(
+        app,
+        {
+            "query": "mutation($files: [Upload!]) { uploads(files: $files) }",
+            "variables": {"files": [None, None]},
+        },
+        {"a": ["variables.files.0"], "b": ["variables.files.1"]},
+        {"a": ("a.bin", b"x" * 200_000), "b": ("b.bin", b"y" * 10)},
+    )
+
+    assert response.status == 200
+    assert response_json(response) == {"data": {"uploads": "200000,10"}}
+
+
+@pytest.mark.parametrize(
+    "app", [create_app(schema=UploadSchema, enable_async=True, batch=True)]
+)
+def test_uploads_files_in_batches(app):
+    operation = {
+        "query": "mutation($file: Upload!) { upload(file: $file) }",
+        "variables": {"file": None},
+    }
+    _, response = post_multipart(
+        app,
+        [operation, operation],
+        {"0": ["0.variables.file"], "1": ["1.variables.file"]},
+        {
+            "0": ("a.txt", b"first", "text/plain"),
+            "1": ("b.txt", b"second", "text/plain"),
+        },
+    )
+
+    assert response.status == 200
+    assert response_json(response) == [
+        {"data": {"upload": "a.txt (text/plain): first"}},
+        {"data": {"upload": "b.txt (text/plain): second"}},
+    ]
+
+
+@pytest.mark.parametrize("app", upload_apps)
+def test_rejects_invalid_multipart_map(app):
+    operations = {
+        "query": "mutation($file: Upload!) { upload(file: $file) }",
+        "variables": {"file": None},
+    }
+    _, response = post_multipart(
+        app, operations, {"1": ["variables.file"]}, {"0": ("a.txt", b"a")}
+    )
+    assert response.status == 400
+    assert response_json(response)["errors"][0]["message"] == (
+        "File '1' of the multipart map is missing."
+    )
+
+    _, response = post_multipart(
+        app, operations, {"0": ["variables.other.file"]}, {"0": ("a.txt", b"a")}
+    )
+    assert response.status == 400
+    assert response_json(response)["errors"][0]["message"] == (
+        "Path 'variables.other.file' of the multipart map is not in the operations."
+    )
@@ -0,0 +1,210 @@
+import json
+
+import pytest
+
+from graphql.language import parse
+from graphql.type import (GraphQLArgument, GraphQLField, GraphQLInt,
+                          GraphQLList, GraphQLObjectType, GraphQLSchema,
+                          GraphQLString)
+from sanic_graphql.validation import measure_operation, query_limits_rule
+
+from .app import create_app, url_string
+
+resolved = []
+
+
+def resolve_user(obj, info, **_args):
+    resolved.append(info.field_name)
+    return {"name": "user"}
+
+
+UserType = GraphQLObjectType(
+    name="User",
+    fields=lambda: {
+        "name": GraphQLField(GraphQLString),
+        "friends": GraphQLField(
+            GraphQLList(UserType),
+            args={"first": GraphQLArgument(GraphQLInt)},
+            resolve=lambda *_, **__: [{"name": "friend"}],
+        ),
+    },
+)
+
+UserSchema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "user": GraphQLField(UserType, resolve=resolve_user),
+            "users": GraphQLField(
+                GraphQLList(UserType),
+                args={"first": GraphQLArgument(GraphQLInt)},
+                resolve=lambda *_, **__: [],
+            ),
+        },
+    )
+)
+
+
+def response_json(response):
+    return json.loads(response.body.decode())
+
+
+def measure(query, **kwargs):
+    document = parse(query)
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions[1:]
+    }
+    return measure_operation(UserSchema, document.definitions[0], fragments, **kwargs)
+
+
+def test_measures_depth_and_fields():
+    metrics = measure("{ user { name friends { name friends { name } } } }")
+
+    assert metrics.depth == 4
+    assert metrics.fields == 6
+
+
+def test_measures_fragments_and_skips_introspection():
+    metrics = measure(
+        """
+        { user { ...Names, __typename, ... on User { friends { name } } } }
+        fragment Names on User { name }
+        """
+    )
+
+    assert metrics.depth == 3
+    assert metrics.fields == 4
+
+
+def test_survives_fragment_cycles():
+    metrics = measure(
+        """
+        { user { ...A } }
+        fragment A on User { friends { ...A } }
+        """
+    )
+
+    assert metrics.depth == 2
+
+
+def test_measures_cost_with_list_sizes_and_field_costs():
+    metrics = measure(
+        "{ users(first: 10) { name friends(first: 5) { name } } }",
+        field_costs={"User.name": 2},
+    )
+
+    # 10 * (users 1 + name 2 + 5 * (friends 1 + name 2))
+    assert metrics.cost == 180
+
+
+def test_measures_cost_with_default_list_size():
+    metrics = measure("{ users { name } }", default_list_size=20)
+
+    assert metrics.cost == 40
+
+
+@pytest.mark.parametrize(
+    "app",
+    [
+        create_app(
+            schema=UserSchema,
+            validation_rules=[query_limits_rule(max_depth=3, max_cost=100)],
+        )
+    ],
+)
+def test_allows_queries_within_limits(app):
+    _, response = app.client.get(uri=url_string(query="{ user { name } }"))
+
+    assert response.status == 200
+    assert response_json(response) == {"data": {"user": {"name": "user"}}}
+
+
+@pytest.mark.parametrize(
+    "app",
+    [create_app(schema=UserSchema, validation_rules=[query_limits_rule(max_depth=2)])],
+)
+def test_rejects_too_deep_queries_before_execution(app):
+    resolved.clear()
+    _, response = app.client.get(
+        uri=url_string(query="{ user { friends { friends { name } } } }")
+    )
+
+    assert response.status == 400
+    assert response_json(response) == {
+        "errors": [
+            {
+                "message": "Operation depth of 4 exceeds the maximum of 2.",
+                "locations": [{"line": 1, "column": 1}],
+                "path": None,
+            }
+        ]
+    }
+    assert resolved == []
+
+
+@pytest.mark.parametrize(
+    "app",
+    [
+        create_app(
+            schema=UserSchema,
+            validation_rules=[query_limits_rule(max_fields=2, max_cost=50)],
+        )
+    ],
+)
+def test_rejects_too_expensive_queries(app):
+    _, response = app.client.get(
+        uri=url_string(query="{ users(first: 100) { name } }")
+    )
+
+    assert response.status == 400
+    assert [error["message"] for error in response_json(response)["errors"]] == [
+        "Operation cost of 200 exceeds the maximum of 50.",
+    ]
+
+
+def test_measures_list_sizes_given_as_variables():
+    query = (
+        "query ($n: Int, $m: Int = 3)"
+        " { users(first: $n) { friends(first: $m) { name } } }"
+    )
+
+    assert measure(query).cost == 1 * (1 + 3 * 2)
+    assert measure(query, max_list_size=50).cost == 50 * (1 + 3 * 2)
+    assert measure(query, variables={"n": 4, "m": 2}).cost == 4 * (1 + 2 * 2)
+
+
+def test_measures_every_fragment_once():
+    fragments = "".join(
+        f"fragment F{i} on User {{ friends {{ ...F{i + 1} ...F{i + 1} }} }} "
+        for i in range(30)
+    )
+    metrics = measure(
+        "{ user { ...F0 } } " + fragments + "fragment F30 on User { name }"
+    )
+
+    assert metrics.depth == 32
+    assert metrics.fields == 2 ** 31
+
+
+@pytest.mark.parametrize(
+    "app",
+    [
+        create_app(
+            schema=UserSchema,
+            validation_rules=[query_limits_rule(max_cost=50, max_list_size=100)],
+        )
+    ],
+)
+def test_rejects_list_sizes_given_as_variables(app):
+    _, response = app.client.get(
+        uri=url_string(
+            query="query ($n: Int) { users(first: $n) { name } }",
+            variables=json.dumps({"n": 1}),
+        )
+    )
+
+    assert response.status == 400
+    assert [error["message"] for error in response_json(response)["errors"]] == [
+        "Operation cost of 200 exceeds the maximum of 50.",
+    ]